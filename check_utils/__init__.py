@@ -15,13 +15,22 @@
 #
 
 # PUBLIC
+from .cache import DiscoveryCache
+from .checkpoint import Checkpoint
+from .compression import get_compression, open_compressed, with_compression
 from .config import Config
-from .junitxml import JUnitXML
+from .diff import ReportDiff
+from .engine import AsyncEngine
+from .events import EventSink
+from .history import DurationStats, TimingHistory
+from .jobserver import Jobserver
+from .junitxml import JUnitXML, JUnitXMLStream
+from .results import CaseStatus, ResultStore
 from .definitions import IllegalArgumentError, InvalidSubprocessResultError,\
                 CheckExit, BUILD_DIR, START_DIR, PROJECT_DIR, PACKAGE_CONFIG,\
                 PROJECT_CONFIG
 from .test import GenericTest, TestGenerator, BinaryTest, ProjectTest,\
-        TestJobset, TestMeta
+        TestJobset, BinaryTestJobset, ProjectTestJobset, TestMeta, JobSlots
 from .system_spec import SystemSpec
 from .jtype.skipped import Skipped, SkippedCase, SkippedSuite
 from .jtype.failed import FailedCase, FailedSuite
@@ -31,7 +40,7 @@ from .jtype.passed import PassedCase, PassedSuite
 from .plugin.html import output_html, show_html
 
 # PRIVATE
-from .framework.gtest import GTest
+from .framework.gtest import GTest, GTestBatch, GTestShard
 from .framework.catch2test import Catch2Test
 from .framework.pytest import PyTest
 from .framework.mesontest import MesonTest
@@ -51,7 +60,21 @@ TEST_FRAMEWORK_BUILTINS: Final[TestGenerator] = [
 
 __all__ = [
         'Config',
+        'ReportDiff',
+        'AsyncEngine',
+        'EventSink',
+        'DiscoveryCache',
+        'Checkpoint',
+        'get_compression',
+        'open_compressed',
+        'with_compression',
+        'DurationStats',
+        'TimingHistory',
+        'Jobserver',
         'JUnitXML',
+        'JUnitXMLStream',
+        'CaseStatus',
+        'ResultStore',
         'IllegalArgumentError',
         'InvalidSubprocessResultError',
         'CheckExit',
@@ -66,7 +89,10 @@ __all__ = [
         'BinaryTest',
         'ProjectTest',
         'TestJobset',
+        'BinaryTestJobset',
+        'ProjectTestJobset',
         'TestMeta',
+        'JobSlots',
         'SystemSpec',
         'Skipped',
         'SkippedCase',
@@ -0,0 +1,143 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Provides an on-disk cache for the results of test discovery.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+import time
+from typing import Final, Optional
+
+class DiscoveryCache:
+    """
+    Caches the test list of a binary, keyed by the path, size and mtime of the
+    binary, and optionally by a hash of its contents.
+
+    Each binary is stored in its own file so that entries can be read and
+    written concurrently.
+    """
+    VERSION: Final[int] = 1
+    # Binaries modified this recently may still be modified within the same
+    # mtime tick, so their listings are not stored unless hashing is enabled.
+    RACY_SECONDS: Final[float] = 2.0
+
+    path: Path
+    use_hash: bool
+
+    def __init__(self, path: str, use_hash: bool = False):
+        self.path = Path(path)
+        self.use_hash = use_hash
+
+    # --- PUBLIC ---
+    def get(self, namespace: str, binary: str) -> Optional[list]:
+        """
+        Returns the cached listing of a binary, or None if there is no valid
+        entry.
+
+        @param namespace: Name distinguishing different listings of a binary.
+        @param binary: Path to the binary.
+        """
+        entry_path = self._entry_path(namespace, binary)
+        try:
+            with entry_path.open('r') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning('Ignoring unreadable discovery cache entry %s: %s',
+                            entry_path, e)
+            return None
+
+        try:
+            stat = os.stat(binary)
+        except OSError:
+            return None
+
+        if entry.get('version') != self.VERSION \
+                or entry.get('binary') != str(Path(binary).absolute()) \
+                or entry.get('size') != stat.st_size:
+            return None
+
+        if self.use_hash:
+            if entry.get('sha256') != self._hash(binary):
+                return None
+        elif entry.get('mtime_ns') != stat.st_mtime_ns:
+            return None
+
+        logging.debug('Using cached listing of %s.', binary)
+        return entry.get('listing')
+
+    def put(self, namespace: str, binary: str, listing: list,
+            stat: os.stat_result) -> None:
+        """
+        Stores the listing of a binary.
+
+        @param namespace: Name distinguishing different listings of a binary.
+        @param binary: Path to the binary.
+        @param listing: JSON serializable listing of the binary.
+        @param stat: Status of the binary, taken before it was listed.
+        """
+        # The binary was replaced while it was being listed.
+        try:
+            if os.stat(binary).st_mtime_ns != stat.st_mtime_ns:
+                return
+        except OSError:
+            return
+
+        entry = {
+                'version': self.VERSION,
+                'binary': str(Path(binary).absolute()),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'listing': listing,
+                }
+        if self.use_hash:
+            entry['sha256'] = self._hash(binary)
+        elif time.time() - stat.st_mtime < self.RACY_SECONDS:
+            return
+
+        entry_path = self._entry_path(namespace, binary)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write atomically so that a concurrent or interrupted run never
+            # sees a partial entry.
+            f, tmp_path = tempfile.mkstemp(dir=entry_path.parent,
+                                           suffix='.tmp')
+            with os.fdopen(f, 'w') as tmp:
+                json.dump(entry, tmp)
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            logging.warning('Could not write discovery cache entry %s: %s',
+                            entry_path, e)
+
+    # --- PRIVATE ---
+    def _entry_path(self, namespace: str, binary: str) -> Path:
+        key = hashlib.sha1(f'{namespace}:{Path(binary).absolute()}'.encode())
+        return self.path.joinpath(f'{key.hexdigest()}.json')
+
+    @classmethod
+    def _hash(cls, binary: str) -> str:
+        h = hashlib.sha256()
+        with open(binary, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                h.update(chunk)
+        return h.hexdigest()
@@ -0,0 +1,159 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Provides a checkpoint of the tests finished so far, from which an interrupted
+run can be resumed.
+"""
+
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Final, Generator, Set
+
+from . import xmlbackend
+from .junitxml import JUnitXML
+
+class Checkpoint:
+    """
+    Records the report of every finished test in a file, one JSON line per
+    test, e.g.,
+
+    {"key": ["googletest", "build/test/foo", [["Suite", "Case"]]],
+     "report": "<testsuites>...</testsuites>"}
+
+    Tests are identified by their framework, label and cases. Lines are
+    written as tests finish and synced to disk at most every interval
+    seconds, so a killed run loses at most the test being written, and a
+    rebooted target at most interval seconds of tests.
+    """
+    INTERVAL: Final[float] = 30.0
+
+    path: Path
+    interval: float
+
+    def __init__(self, path: str, resume: bool = False,
+                 interval: float = INTERVAL):
+        """
+        @param path: File of the checkpoint.
+        @param resume: Keep the tests of an existing checkpoint, rather than
+                       starting a new one.
+        @param interval: Seconds between syncs to disk.
+        """
+        self.path = Path(path)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._done: Set[str] = set()
+        # Size of the checkpoint being resumed.
+        self._resumed_size = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and self.path.exists():
+            self._load()
+        self._f = open(self.path, 'ab' if resume else 'wb')
+        self._synced = time.monotonic()
+
+    # --- PUBLIC ---
+    def is_done(self, test) -> bool:
+        """
+        @return True if the test finished in the run being resumed.
+        """
+        return Checkpoint._make_key(test) in self._done
+
+    def get_num_done(self) -> int:
+        return len(self._done)
+
+    def get_reports(self) -> Generator[JUnitXML, None, None]:
+        """
+        Generates the reports of the tests of the run being resumed.
+        """
+        size = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                # Later lines are tests of this run.
+                size += len(line)
+                if size > self._resumed_size:
+                    break
+                report = json.loads(line)['report']
+                yield JUnitXML(tree=xmlbackend.ET.ElementTree(
+                        xmlbackend.fromstring(report.encode('us-ascii'))))
+
+    def add(self, test, report: JUnitXML) -> None:
+        """
+        Record the report of a finished test.
+        """
+        suites = b''.join(xmlbackend.tostring(test_suite)
+                          for test_suite, _
+                          in report.iter_suites_with_counts())
+        line = json.dumps({
+                'key': json.loads(Checkpoint._make_key(test)),
+                'report': (b'<testsuites>' + suites
+                           + b'</testsuites>').decode('us-ascii'),
+                }).encode('utf-8') + b'\n'
+
+        with self._lock:
+            if self._f is None:
+                return
+            self._f.write(line)
+            self._f.flush()
+            if time.monotonic() - self._synced >= self.interval:
+                os.fsync(self._f.fileno())
+                self._synced = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._f is not None:
+                self._f.flush()
+                os.fsync(self._f.fileno())
+                self._f.close()
+                self._f = None
+
+    def remove(self) -> None:
+        """
+        Delete the checkpoint once the run is complete, so that it can't be
+        resumed again.
+        """
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    # --- PRIVATE ---
+    def _load(self) -> None:
+        """
+        Read the tests of the checkpoint, dropping the last line if it was
+        being written when the run was interrupted.
+        """
+        size = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('Incomplete line')
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self._done.add(json.dumps(entry['key']))
+                size += len(line)
+        os.truncate(self.path, size)
+        self._resumed_size = size
+
+    @classmethod
+    def _make_key(cls, test) -> str:
+        cases = test.get_cases()
+        return json.dumps([test.get_name_framework(), test.get_label(),
+                           [list(case) for case in cases]
+                           if cases is not None else None])
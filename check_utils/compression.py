@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Provides compressed reports and logs. Files are compressed according to their
+extension when written, and decompressed according to their contents when
+read.
+"""
+
+import gzip
+import os
+from typing import Dict, Final, Optional
+try:
+    import zstandard
+except ImportError:
+    pass
+
+from .definitions import IllegalArgumentError
+
+# Extension of the files of each compression.
+EXTENSIONS: Final[Dict[str, str]] = {
+        'gzip': '.gz',
+        'zstd': '.zst',
+        }
+# First bytes of the files of each compression.
+_MAGIC: Final[Dict[str, bytes]] = {
+        'gzip': b'\x1f\x8b',
+        'zstd': b'\x28\xb5\x2f\xfd',
+        }
+
+# --- PUBLIC ---
+def with_compression(file: str, compression: Optional[str]) -> str:
+    """
+    Add the extension of a compression to a file name.
+
+    @param file: Name of the file.
+    @param compression: One of EXTENSIONS, or None or "none" for no
+                        compression.
+    @return Name of the compressed file.
+    """
+    if compression is None or compression == 'none':
+        return file
+    if compression not in EXTENSIONS:
+        raise IllegalArgumentError(f'Unknown compression {compression}.')
+    return file + EXTENSIONS[compression]
+
+def get_compression(file) -> Optional[str]:
+    """
+    @return Compression of a file to write, from its extension, or None.
+    """
+    name = os.fspath(file)
+    for compression, extension in EXTENSIONS.items():
+        if name.endswith(extension):
+            return compression
+    return None
+
+def detect_compression(file) -> Optional[str]:
+    """
+    @return Compression of an existing file, from its contents, or None.
+    """
+    with open(file, 'rb') as f:
+        magic = f.read(max(len(m) for m in _MAGIC.values()))
+    for compression, m in _MAGIC.items():
+        if magic.startswith(m):
+            return compression
+    return None
+
+def open_compressed(file, mode: str = 'rb',
+                    compression: Optional[str] = None):
+    """
+    Open a file as open() does, compressing or decompressing it as needed.
+    Data is compressed and decompressed as it is written and read.
+
+    Files made of several compressed members, or frames, are read as one.
+
+    @param file: Path of the file.
+    @param mode: Mode of open(), without '+'.
+    @param compression: Compression to write, rather than the one of the
+                        extension.
+    """
+    if 'r' in mode:
+        compression = detect_compression(file)
+    elif compression is None:
+        compression = get_compression(file)
+
+    if compression is None:
+        return open(file, mode)
+    if compression == 'gzip':
+        # The default of zlib, much faster than the 9 of gzip for little
+        # difference in size.
+        return gzip.open(file, mode, compresslevel=6)
+    if 'zstandard' not in globals():
+        raise IllegalArgumentError('(pip) zstandard is required for '
+                                   f'{file}.')
+    return zstandard.open(file, mode)
@@ -0,0 +1,213 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Provides the differences between the test cases of two reports.
+"""
+
+from collections import deque
+import heapq
+import math
+import pyexpat
+from typing import Dict, Final, Generator, Iterable, List, Self, Tuple
+
+from . import compression
+from .junitxml import JUnitXML
+from .results import CaseStatus
+
+# Suite and name of a test case.
+CaseKey = Tuple[str, str]
+
+class ReportDiff:
+    """
+    Changes of the test cases of a new report from an old report. Cases are
+    identified by their suite and name, and repeated cases are matched in
+    the order in which they occur.
+    """
+    # Bytes of a report file parsed at a time.
+    CHUNK_SIZE: Final[int] = 1 << 20
+
+    # Cases whose status changed to each status, by status.
+    changed: Dict[CaseStatus, List[CaseKey]]
+    # Cases only in the new report.
+    appeared: List[CaseKey]
+    # Cases only in the old report.
+    disappeared: List[CaseKey]
+    # Largest changes of duration, as (case, old time, new time).
+    durations: List[Tuple[CaseKey, float, float]]
+
+    def __init__(self):
+        self.changed = {status: [] for status in CaseStatus}
+        self.appeared = []
+        self.disappeared = []
+        self.durations = []
+
+    # --- PUBLIC ---
+    @classmethod
+    def make_from_files(cls, old, new, num_durations: int = 10) -> Self:
+        """
+        Compare two report files. The old report is indexed, then the new
+        report is compared with it as it is parsed. Neither is kept in
+        memory.
+
+        @param old: Report of the earlier run.
+        @param new: Report of the later run.
+        @param num_durations: Number of largest changes of duration to keep.
+        """
+        return cls._make(ReportDiff._iter_file_cases(old),
+                         ReportDiff._iter_file_cases(new),
+                         num_durations)
+
+    @classmethod
+    def make_from_reports(cls, old: JUnitXML, new: JUnitXML,
+                          num_durations: int = 10) -> Self:
+        """
+        Compare two reports in memory.
+        """
+        return cls._make(ReportDiff._iter_cases(old),
+                         ReportDiff._iter_cases(new),
+                         num_durations)
+
+    def get_newly(self, status: CaseStatus) -> List[CaseKey]:
+        """
+        @return Cases present in both reports whose status changed to status.
+        """
+        return self.changed[status]
+
+    def is_regression(self) -> bool:
+        """
+        @return True if any case newly failed or errored, False otherwise.
+        """
+        return len(self.changed[CaseStatus.FAILED]) != 0 \
+                or len(self.changed[CaseStatus.ERRORED]) != 0
+
+    # --- PRIVATE ---
+    @classmethod
+    def _make(cls,
+              old_cases: Iterable[Tuple[CaseKey, CaseStatus, float]],
+              new_cases: Iterable[Tuple[CaseKey, CaseStatus, float]],
+              num_durations: int) -> Self:
+        diff = cls()
+        # Occurrences of each key in order, as suites and cases may repeat.
+        old_index: Dict[CaseKey, deque] = {}
+        for key, status, time in old_cases:
+            old_index.setdefault(key, deque()).append((status, time))
+
+        # Min-heap of the largest changes of duration so far.
+        durations = []
+        for key, status, time in new_cases:
+            occurrences = old_index.get(key)
+            if not occurrences:
+                diff.appeared.append(key)
+                continue
+
+            old_status, old_time = occurrences.popleft()
+            if old_status != status:
+                diff.changed[status].append(key)
+
+            # NaN when either time is unknown, which never compares larger.
+            delta = abs(time - old_time)
+            if len(durations) < num_durations:
+                if not math.isnan(delta):
+                    heapq.heappush(durations, (delta, key, old_time, time))
+            elif durations and delta > durations[0][0]:
+                heapq.heapreplace(durations, (delta, key, old_time, time))
+
+        diff.disappeared = [key for key, occurrences in old_index.items()
+                            for _ in occurrences]
+        diff.durations = [(key, old_time, time)
+                          for _, key, old_time, time
+                          in sorted(durations, reverse=True)]
+        return diff
+
+    @classmethod
+    def _iter_cases(cls, report: JUnitXML) -> Generator[
+            Tuple[CaseKey, CaseStatus, float], None, None]:
+        """
+        Generates the key, status and time of every case of a report.
+        """
+        for suite in report.tree.getroot().iter('testsuite'):
+            suite_name = suite.get('name', '')
+            for case in suite.iterfind('testcase'):
+                status = CaseStatus.PASSED
+                for child in case:
+                    status = ReportDiff._get_status(status, child.tag)
+                yield ((suite_name, case.get('name', '')), status,
+                       ReportDiff._to_time(case.get('time', '')))
+
+    @classmethod
+    def _iter_file_cases(cls, file) -> Generator[
+            Tuple[CaseKey, CaseStatus, float], None, None]:
+        """
+        Generates the key, status and time of every case of a report file as
+        it is parsed. Elements are never built: expat reports the tags and
+        attributes, which is much faster on large reports.
+        """
+        cases = []
+        suite_names = ['']
+        name = ''
+        status = CaseStatus.PASSED
+        time = ''
+
+        def start(tag: str, attrib: Dict[str, str]) -> None:
+            nonlocal name, status, time
+            if tag == 'testcase':
+                name = attrib.get('name', '')
+                status = CaseStatus.PASSED
+                time = attrib.get('time', '')
+            elif tag == 'testsuite':
+                suite_names.append(attrib.get('name', ''))
+            elif tag == 'error' or tag == 'failure' or tag == 'skipped':
+                status = ReportDiff._get_status(status, tag)
+
+        def end(tag: str) -> None:
+            if tag == 'testcase':
+                cases.append(((suite_names[-1], name), status,
+                              ReportDiff._to_time(time)))
+            elif tag == 'testsuite':
+                suite_names.pop()
+
+        parser = pyexpat.ParserCreate()
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        with compression.open_compressed(file, 'rb') as f:
+            while chunk := f.read(ReportDiff.CHUNK_SIZE):
+                parser.Parse(chunk, False)
+                yield from cases
+                cases.clear()
+            parser.Parse(b'', True)
+        yield from cases
+
+    @classmethod
+    def _get_status(cls, status: CaseStatus, tag: str) -> CaseStatus:
+        """
+        @return Status of a case of the given status with a child of the
+                given tag.
+        """
+        if tag == 'error':
+            return CaseStatus.ERRORED
+        if tag == 'failure' and status != CaseStatus.ERRORED:
+            return CaseStatus.FAILED
+        if tag == 'skipped' and status == CaseStatus.PASSED:
+            return CaseStatus.SKIPPED
+        return status
+
+    @classmethod
+    def _to_time(cls, time: str) -> float:
+        try:
+            return float(time)
+        except ValueError:
+            return math.nan
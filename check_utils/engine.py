@@ -0,0 +1,90 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Provides an asyncio based engine for running test processes.
+"""
+
+import asyncio
+import subprocess
+import threading
+from typing import List, Optional
+
+class AsyncEngine:
+    """
+    Runs test processes with asyncio.create_subprocess_exec on a single event
+    loop, which supervises every process from a thread of its own.
+
+    Processes are started from an argument list, without a shell.
+    """
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name='AsyncEngine', daemon=True)
+        self._thread.start()
+
+    # --- PUBLIC ---
+    def run(self,
+            args: List[str],
+            timeout: Optional[float] = None,
+            capture_output: bool = False,
+            env: Optional[dict] = None,
+            cwd: Optional[str] = None) -> subprocess.CompletedProcess:
+        """
+        Run a process to completion, blocking the calling thread. Behaves like
+        subprocess.run() with check=False.
+
+        @raise subprocess.TimeoutExpired: The process was killed after
+                                          running for timeout seconds.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+                self._run(args, timeout, capture_output, env, cwd),
+                self._loop)
+        return future.result()
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    # --- PRIVATE ---
+    @classmethod
+    async def _run(cls,
+                   args: List[str],
+                   timeout: Optional[float],
+                   capture_output: bool,
+                   env: Optional[dict],
+                   cwd: Optional[str]) -> subprocess.CompletedProcess:
+        pipe = asyncio.subprocess.PIPE if capture_output else None
+        proc = await asyncio.create_subprocess_exec(*args,
+                                                    stdout=pipe,
+                                                    stderr=pipe,
+                                                    env=env,
+                                                    cwd=cwd)
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(),
+                                                    timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            stdout, stderr = await proc.communicate()
+            raise subprocess.TimeoutExpired(args, timeout, stdout, stderr)
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+
+        return subprocess.CompletedProcess(args, proc.returncode, stdout,
+                                           stderr)
@@ -23,12 +23,13 @@ import argparse
 import datetime
 #from functools import cache
 import logging
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
 from rich.console import Console
 from rich.logging import RichHandler
 from rich.theme import Theme
 import sys
-from typing import Generator
+from typing import Dict, Generator, List, Optional, Union
 
 import check_utils
 
@@ -38,14 +39,17 @@ class Main:
     """
     verbose: int = 0
     html: bool = False
+    resume: bool = False
 
     start_time: str = ''
+    # Totals of the report of the last run, or None.
+    totals: Optional[Dict[str, Union[int, float]]] = None
     # Get package name from cwd if none is provided.
     # Get tmp dir from os.getenv if none is provided.
     config_obj: check_utils.Config = None
 
     def __init__(self, config: str, project_config: str, verbose: int,
-                 html: bool) -> None:
+                 html: bool, resume: bool = False) -> None:
         """
         Initialize Main.
 
@@ -53,8 +57,10 @@ class Main:
         @param project_config: Name of the project-level config file.
         @param verbose: Verbosity level.
         @param html: Create html report.
+        @param resume: Skip the tests which finished in an interrupted run.
         """
         self.verbose = verbose
+        self.resume = resume
 
         custom_theme = Theme(check_utils.GenericTest.THEME_EXTENSIONS)
         console = Console(theme=custom_theme)
@@ -94,6 +100,20 @@ class Main:
             extension = '.' + extension
         return '_'.join(args) + extension
 
+    def _get_report(self) -> str:
+        """
+        Get the path of the report of a run.
+
+        @return path of the report.
+        """
+        return self.config_obj['out_dir'] + '/' \
+                + check_utils.with_compression(
+                        self._generate_outfile_name(
+                            self.config_obj['package'],
+                            extension='.xml'
+                            ),
+                        self.config_obj.get('compression', None))
+
     def _generate_test_jobsets(
             self,
             ) -> Generator[check_utils.TestJobset, None, None]:
@@ -112,15 +132,49 @@ class Main:
             if jobset is not None:
                 yield jobset
 
+    def _run_concurrently(
+            self,
+            jobsets: List[check_utils.TestJobset],
+            num_jobs: int,
+            ) -> List[check_utils.JUnitXML]:
+        """
+        Run all jobsets at the same time, sharing the jobs between them.
+
+        @return the reports of the jobsets, in the order of the jobsets.
+        """
+        logging.info('Running %d frameworks concurrently.', len(jobsets))
+        with ThreadPool(processes=len(jobsets)) as pool:
+            results = [pool.apply_async(jobset.run, (num_jobs,))
+                       for jobset in jobsets]
+            return [result.get() for result in results]
+
+    def _log_summary(self, totals: Dict[str, Union[int, float]]) -> None:
+        summary = ('%d tests, %d failures, %d errors, %d skipped.',
+                   totals['tests'], totals['failures'], totals['errors'],
+                   totals['skipped'])
+        if totals['failures'] != 0 or totals['errors'] != 0:
+            logging.warning(*summary)
+        else:
+            logging.info(*summary)
+
     # --- PUBLIC ---
-    def is_success(self, report: str) -> bool:
+    def is_success(self, report: Optional[str] = None) -> bool:
         """
         Check if testing succeeded based on the generated report.
 
+        @param report: Report to read. Defaults to the totals of the last run,
+                       without reading its report back, or to the report
+                       of the configured package if nothing ran.
         @return True if there were no failures or errors,
                 False otherwise.
         """
-        return check_utils.JUnitXML(report).is_success()
+        if report is None and self.totals is not None:
+            totals = self.totals
+        else:
+            totals = check_utils.JUnitXML(
+                    report if report is not None else self._get_report()
+                    ).get_totals()
+        return totals['failures'] == 0 and totals['errors'] == 0
 
     def setup(self) -> None:
         """
@@ -137,11 +191,7 @@ class Main:
         self.setup()
 
         html_report: str = ''
-        report: str = self.config_obj['out_dir'] + '/' \
-                + self._generate_outfile_name(
-                        self.config_obj['package'],
-                        extension='.xml'
-                        )
+        report: str = self._get_report()
         # TODO: Pass the outfile name to a log handler.
         #output: str = self.config_obj['out_dir'] + '/' \
         #        + self._generate_outfile_name(
@@ -159,24 +209,119 @@ class Main:
         #logging.info('Reporting output in %s.', output)
         logging.info('Using %d jobs.', num_jobs)
 
+        history = None
+        if self.config_obj.get('history', True):
+            history = check_utils.TimingHistory(
+                    Path(self.config_obj['out_dir']).joinpath('.cache',
+                                                              'history.db'))
+
+        # Record finished tests, so that an interrupted run can be resumed.
+        checkpoint = None
+        if self.config_obj.get('checkpoint', False):
+            checkpoint = check_utils.Checkpoint(
+                    Path(self.config_obj['out_dir']).joinpath(
+                        '.cache', 'checkpoint.ndjson'),
+                    resume=self.resume,
+                    interval=self.config_obj.get(
+                        'checkpoint_interval',
+                        check_utils.Checkpoint.INTERVAL))
+            if self.resume:
+                logging.info('Resuming after %d finished tests.',
+                             checkpoint.get_num_done())
+        elif self.resume:
+            logging.warning('Can not resume without a checkpoint. Set '
+                            'checkpoint = true to record one.')
+
+        # Every runner takes its jobs from the same pool, which also takes
+        # them from make when run from a parallel make.
+        jobserver = None
+        if self.config_obj.get('jobserver', True):
+            jobserver = check_utils.Jobserver.from_makeflags()
+            if jobserver is not None:
+                logging.info('Sharing jobs with the make jobserver.')
+        job_slots = check_utils.JobSlots(num_jobs, jobserver)
+
+        engine = None
+        if self.config_obj.get('engine', 'subprocess') == 'asyncio':
+            logging.info('Running tests with the asyncio engine.')
+            engine = check_utils.AsyncEngine()
+
+        # Write the suites of finished tests to the report as they come,
+        # rather than keeping the whole report in memory.
+        report_sink = None
+        if self.config_obj.get('stream_report', False):
+            report_sink = check_utils.JUnitXMLStream(report)
+
+        # Write live events for dashboards. May be a FIFO or a Unix socket.
+        event_sink = None
+        if self.config_obj.get('events', None) is not None:
+            event_sink = check_utils.EventSink(self.config_obj['events'])
+
+        jobsets = list(self._generate_test_jobsets())
+        is_empty = len(jobsets) == 0
+        for jobset in jobsets:
+            jobset.set_history(history)
+            jobset.set_job_slots(job_slots)
+            jobset.set_engine(engine)
+            jobset.set_report_sink(report_sink)
+            jobset.set_event_sink(event_sink)
+            jobset.set_checkpoint(checkpoint)
+
         combined_report_obj = check_utils.JUnitXML.make_from_passed([])
-        is_empty = True
-        for test in self._generate_test_jobsets():
-            is_empty = False
-            combined_report_obj += test.run(num_jobs)
+        if checkpoint is not None:
+            for report_obj in checkpoint.get_reports():
+                if report_sink is not None:
+                    report_sink.add(report_obj)
+                else:
+                    combined_report_obj.move_from(report_obj)
+        if self.config_obj.get('parallel_frameworks', False) \
+                and len(jobsets) > 1:
+            for report_obj in self._run_concurrently(jobsets, num_jobs):
+                combined_report_obj.move_from(report_obj)
+        else:
+            for jobset in jobsets:
+                combined_report_obj.move_from(jobset.run(num_jobs))
+
+        if engine is not None:
+            engine.close()
+
+        if event_sink is not None:
+            event_sink.close()
+
+        if jobserver is not None:
+            jobserver.close()
+
+        if history is not None:
+            history.commit()
+            history.close()
 
         logging.debug('Compiling the report.')
-        combined_report_obj.write(report)
+        if report_sink is not None:
+            report_sink.add(combined_report_obj)
+            report_sink.close()
+            self.totals = report_sink.get_totals()
+        else:
+            combined_report_obj.write(report)
+            self.totals = combined_report_obj.get_totals()
+
+        # The run is complete, there is nothing left to resume.
+        if checkpoint is not None:
+            checkpoint.remove()
 
         if is_empty:
             logging.warning("No tests were run!")
             return check_utils.CheckExit.EXIT_SUCCESS
 
         if self.html:
-            if check_utils.output_html(report, html_report):
+            if check_utils.get_compression(report) is not None:
+                logging.error('Compressed reports can not be shown in html.')
+            elif check_utils.output_html(report, html_report):
                 check_utils.show_html(html_report)
 
-        if self.is_success(report):
+        # Decided from the counts kept while merging, without reading the
+        # report back.
+        self._log_summary(self.totals)
+        if self.is_success():
             return check_utils.CheckExit.EXIT_SUCCESS
 
         return check_utils.CheckExit.EXIT_FAILURE
@@ -216,10 +361,16 @@ def main():
             action='store_true',
             help="Show the report in html.",
             )
+    parser.add_argument(
+            '-r', '--resume',
+            action='store_true',
+            help="Skip the tests which finished in an interrupted run, "
+            "and report them from its checkpoint.",
+            )
     args = parser.parse_args()
 
     m = Main(args.config, args.project_config,
-             0 if args.quiet else args.verbose+1, args.html)
+             0 if args.quiet else args.verbose+1, args.html, args.resume)
 
     sys.exit(m.main())
 
@@ -0,0 +1,79 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Compare the test cases of two JUnitXML reports.
+"""
+
+import argparse
+import sys
+from typing import List
+
+import check_utils as cu
+from check_utils.diff import CaseKey
+
+def _print_cases(title: str, cases: List[CaseKey]) -> None:
+    if len(cases) == 0:
+        return
+    print(f'{title} ({len(cases)}):')
+    for suite, case in cases:
+        print(f'  {suite}.{case}')
+
+def main():
+    parser = argparse.ArgumentParser(
+            prog='cudiff',
+            description='Compares the test cases of two reports. Exits with '
+            '1 if any case newly failed or errored.',
+            )
+
+    parser.add_argument(
+            'old',
+            type=str,
+            help='Report of the earlier run. May be compressed.',
+            )
+    parser.add_argument(
+            'new',
+            type=str,
+            help='Report of the later run. May be compressed.',
+            )
+    parser.add_argument(
+            '-n', '--durations',
+            type=int,
+            default=10,
+            help='Number of largest changes of duration to show.',
+            )
+    args = parser.parse_args()
+
+    diff = cu.ReportDiff.make_from_files(args.old, args.new, args.durations)
+
+    _print_cases('Newly failing', diff.get_newly(cu.CaseStatus.FAILED))
+    _print_cases('Newly errored', diff.get_newly(cu.CaseStatus.ERRORED))
+    _print_cases('Newly passing', diff.get_newly(cu.CaseStatus.PASSED))
+    _print_cases('Newly skipped', diff.get_newly(cu.CaseStatus.SKIPPED))
+    _print_cases('Appeared', diff.appeared)
+    _print_cases('Disappeared', diff.disappeared)
+    if len(diff.durations) != 0:
+        print('Largest changes of duration:')
+        for (suite, case), old_time, new_time in diff.durations:
+            print(f'  {new_time - old_time:+.3f}s '
+                  f'({old_time:.3f}s -> {new_time:.3f}s) {suite}.{case}')
+
+    if diff.is_regression():
+        sys.exit(cu.CheckExit.EXIT_FAILURE)
+    sys.exit(cu.CheckExit.EXIT_SUCCESS)
+
+if __name__ == '__main__':
+    main()
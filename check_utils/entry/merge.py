@@ -0,0 +1,275 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Merge JUnitXML reports into one. Reports are split into shards which are
+parsed and merged by worker processes, each into a file of its own. The
+shards are then copied into the merged report, in order, without being
+parsed again.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import datetime
+import logging
+import os
+from pathlib import Path
+import tempfile
+from typing import Dict, List, Optional, Tuple, Union
+
+import check_utils as cu
+from check_utils import xmlbackend
+from check_utils.xmlbackend import ET
+
+# Shards per worker, so that workers given large reports don't hold up the
+# others for long.
+SHARDS_PER_JOB = 4
+# Bytes copied from a shard at a time.
+CHUNK_SIZE = 1 << 20
+# Attributes counted from the cases of suites.
+COUNTS = ('tests', 'failures', 'skipped', 'errors', 'assertions', 'time')
+
+# Attributes, text and tail of a suite of a shard, and the offset and size of
+# its serialized cases in the file of the shard.
+SuiteEntry = Tuple[Dict[str, str], Optional[str], Optional[str], int, int]
+
+def _make_shards(files: List[str], num_shards: int) -> List[List[str]]:
+    """
+    Split reports into consecutive shards of about the same total size.
+    Shards are consecutive so that merging them in order gives the same
+    report as merging every report in order.
+    """
+    sizes = [Path(file).stat().st_size for file in files]
+    target = sum(sizes) / num_shards
+    shards = [[]]
+    size = 0
+    for file, file_size in zip(files, sizes):
+        if shards[-1] and size + file_size / 2 > target * len(shards):
+            shards.append([])
+        shards[-1].append(file)
+        size += file_size
+    return shards
+
+def _merge_shard(files: List[str], max_text: Optional[int],
+                 out_file: str) -> Tuple[Dict[str, str], List[SuiteEntry]]:
+    """
+    Merge a shard of reports, writing the serialized cases of each suite to
+    out_file one after the other.
+
+    @return The attributes of the merged 'testsuites' element, and the
+            entry of each suite.
+    """
+    report = cu.JUnitXML()
+    for file in files:
+        report.move_from(cu.JUnitXML(file=file, max_text=max_text))
+    root = report.get_tree().getroot()
+
+    suites = []
+    offset = 0
+    with open(out_file, 'wb') as f:
+        for suite in root.iterfind('testsuite'):
+            data = b''.join(xmlbackend.tostring(elem) for elem in suite)
+            f.write(data)
+            suites.append((dict(suite.attrib), suite.text, suite.tail,
+                           offset, len(data)))
+            offset += len(data)
+    return dict(root.attrib), suites
+
+def _add_counts(attrib: Dict[str, str], other: Dict[str, str]) -> None:
+    """
+    Add the counts of a suite or report to those of another.
+    """
+    for name in COUNTS:
+        number = float if name == 'time' else int
+        attrib[name] = str(number(attrib.get(name, '0'))
+                           + number(other.get(name, '0')))
+
+def _to_timestamp(iso: str) -> float:
+    """
+    Convert the timestamp of a suite to a UTC timestamp, as JUnitXML does.
+    """
+    iso_date = datetime.datetime.fromisoformat(
+            iso if len(iso) != 0 else cu.JUnitXML.ZERO_TIMESTAMP)
+    return iso_date.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+def _split_tags(elem: ET.Element) -> Tuple[bytes, bytes]:
+    """
+    Serialize an element without children.
+
+    @return Its start tag and text, and its end tag and tail.
+    """
+    # Attributes and text are escaped, so the placeholder is found once.
+    ET.SubElement(elem, 'placeholder')
+    start, end = xmlbackend.tostring(elem).split(b'<placeholder />')
+    return start, end
+
+def _write_merged(output: str, shards: List[Tuple[str, Tuple]],
+                  merge_suites: bool) -> Dict[str, Union[int, float]]:
+    """
+    Write the merged report from the files of the shards. The totals head
+    the report, so they are added up from the entries of the suites first.
+
+    @param shards: File of each shard, with the result of _merge_shard().
+    @param merge_suites: Merge suites of the same name from different
+                         shards.
+    """
+    root = cu.JUnitXML.create_empty_testsuites()
+    # Attributes, text and tail of each suite of the merged report, with the
+    # (shard, offset, size) of its cases.
+    suites: List[Tuple[Dict[str, str], Optional[str], Optional[str],
+                       List[Tuple[int, int, int]]]] = []
+    index = {}
+    for i, (_, (shard_attrib, shard_suites)) in enumerate(shards):
+        _add_counts(root.attrib, shard_attrib)
+        for attrib, text, tail, offset, size in shard_suites:
+            suite = index.get(attrib.get('name', '')) if merge_suites \
+                    else None
+            if suite is None:
+                suite = (attrib, text, tail, [])
+                suites.append(suite)
+                index.setdefault(attrib.get('name', ''), suite)
+            else:
+                _add_counts(suite[0], attrib)
+            suite[3].append((i, offset, size))
+    # The latest timestamp of the suites, as JUnitXML finds it.
+    timestamp = max([_to_timestamp('')]
+                    + [_to_timestamp(attrib.get('timestamp', ''))
+                       for attrib, _, _, _ in suites])
+    root.set('timestamp',
+             datetime.datetime.fromtimestamp(timestamp).isoformat())
+    totals = {name: float(root.get(name)) if name == 'time'
+              else int(root.get(name)) for name in COUNTS}
+
+    files = [open(file, 'rb') for file, _ in shards]
+    try:
+        with cu.open_compressed(output, 'wb') as f:
+            if len(suites) == 0:
+                f.write(xmlbackend.tostring(root))
+                return totals
+            root_start, root_end = _split_tags(root)
+            f.write(root_start)
+            for attrib, text, tail, parts in suites:
+                suite = ET.Element('testsuite', attrib=attrib)
+                suite.text = text
+                suite.tail = tail
+                start, end = _split_tags(suite)
+                f.write(start)
+                for i, offset, size in parts:
+                    files[i].seek(offset)
+                    while size > 0:
+                        chunk = files[i].read(min(size, CHUNK_SIZE))
+                        f.write(chunk)
+                        size -= len(chunk)
+                f.write(end)
+            f.write(root_end)
+    finally:
+        for file in files:
+            file.close()
+    return totals
+
+def merge_reports(files: List[str],
+                  output: str,
+                  num_jobs: int,
+                  max_text: Optional[int] = None,
+                  merge_suites: bool = True) -> Dict[str, Union[int, float]]:
+    """
+    Merge reports into output, which is compressed according to its
+    extension.
+
+    @param files: Reports to merge.
+    @param output: Merged report.
+    @param num_jobs: Number of worker processes.
+    @param max_text: Truncate output and messages longer than max_text
+                     characters while loading.
+    @param merge_suites: Merge suites of the same name from different
+                         shards, as merging every report in order does.
+    @return Totals of the merged report, by attribute name.
+    """
+    if len(files) == 0:
+        report = cu.JUnitXML()
+        report.write(output)
+        return report.get_totals()
+
+    shards = _make_shards(files, min(len(files), num_jobs * SHARDS_PER_JOB))
+    with tempfile.TemporaryDirectory(dir=Path(output).parent) as tmp_dir:
+        out_files = [os.path.join(tmp_dir, f'{i}.shard')
+                     for i in range(len(shards))]
+        args = (shards, [max_text] * len(shards), out_files)
+        if num_jobs <= 1:
+            results = list(map(_merge_shard, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=num_jobs) as executor:
+                results = list(executor.map(_merge_shard, *args))
+        return _write_merged(output, list(zip(out_files, results)),
+                             merge_suites)
+
+def main():
+    parser = argparse.ArgumentParser(
+            prog='cumerge',
+            description='Merges JUnitXML reports into one.',
+            )
+
+    parser.add_argument(
+            'reports',
+            type=str,
+            nargs='+',
+            help='Reports to merge, in order. May be compressed.',
+            )
+    parser.add_argument(
+            '-o', '--output',
+            type=str,
+            required=True,
+            help='Merged report. Compressed if it ends in .gz or .zst.',
+            )
+    parser.add_argument(
+            '-j', '--jobs',
+            type=int,
+            default=os.cpu_count(),
+            help='Number of worker processes. Defaults to the number of '
+            'CPUs.',
+            )
+    parser.add_argument(
+            '-s', '--stream',
+            action='store_true',
+            help='Copy the suites of each shard as they are, without merging '
+            'suites of the same name from different shards.',
+            )
+    parser.add_argument(
+            '--max-text',
+            type=int,
+            default=None,
+            help='Truncate output and messages longer than this many '
+            'characters.',
+            )
+    parser.add_argument(
+            '-v', '--verbose',
+            action='store_true',
+            help='Verbose output.',
+            )
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(message)s',
+                        level=logging.INFO if args.verbose else logging.WARN)
+
+    totals = merge_reports(args.reports, args.output, args.jobs,
+                           args.max_text, merge_suites=not args.stream)
+
+    logging.info('Merged %d reports: %d tests, %d failures, %d errors, '
+                 '%d skipped.', len(args.reports), totals['tests'],
+                 totals['failures'], totals['errors'], totals['skipped'])
+
+if __name__ == '__main__':
+    main()
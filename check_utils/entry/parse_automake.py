@@ -18,7 +18,6 @@ import datetime
 from pathlib import Path
 import re
 import sys
-from typing import List
 
 import check_utils as cu
 
@@ -36,18 +35,14 @@ def main():
 
     timestamp = datetime.datetime.now().isoformat()
 
-    passed_suites = []
-    failed_suites = []
-    errored_suites = []
-
-    passed_cases: List[cu.PassedCase] = []
-    failed_cases: List[cu.FailedCase] = []
+    results = cu.ResultStore()
 
     skipped_suites = [skipped_obj
                       for skipped_config in config_obj.get('custom', dict()).get('skipped', dict()).get('suites', [])
                       if (skipped_obj := cu.SkippedSuite.make_from_dict(skipped_config).filter_tests(cu.SystemSpec.from_uname())) is not None]
 
-    with open(config_obj['out_dir'] + '/' + config_obj['package'] + '.txt', 'w') as out:
+    compression = config_obj.get('compression', None)
+    with cu.open_compressed(config_obj['out_dir'] + '/' + cu.with_compression(config_obj['package'] + '.txt', compression), 'wt') as out:
         for line in sys.stdin:
             if (match := re.match(p_pattern, line)):
                 suite = match.group(2).strip()
@@ -57,7 +52,7 @@ def main():
                         for skipped_suite in skipped_suites
                         for case_name in skipped_suite.get_case_names()
                         if skipped_suite.get_name() == suite and case_name == suite]) == 0:
-                    passed_suites.append(cu.PassedSuite(suite, '', timestamp, [cu.PassedCase(case, '', '', '')]))
+                    results.add(cu.CaseStatus.PASSED, suite, case, timestamp=timestamp)
             elif (match := re.match(f_pattern, line)):
                 suite = match.group(1).strip()
                 case = suite
@@ -66,7 +61,7 @@ def main():
                         for skipped_suite in skipped_suites
                         for case_name in skipped_suite.get_case_names()
                         if skipped_suite.get_name() == suite and case_name == case]) == 0:
-                    failed_suites.append(cu.FailedSuite(suite, '', timestamp, [cu.FailedCase(case, '', '', '', '', '')]))
+                    results.add(cu.CaseStatus.FAILED, suite, case, timestamp=timestamp, message='')
             elif (match := re.match(e_pattern, line)):
                 suite = match.group(1).strip()
                 case = suite
@@ -75,7 +70,7 @@ def main():
                         for skipped_suite in skipped_suites
                         for case_name in skipped_suite.get_case_names()
                         if skipped_suite.get_name() == suite and case_name == case]) == 0:
-                    errored_suites.append(cu.ErroredSuite(suite, '', timestamp, [cu.ErroredCase(case, '', '', '', '', '')]))
+                    results.add(cu.CaseStatus.ERRORED, suite, case, timestamp=timestamp, message='')
             elif (match := re.match(s_pattern, line)):
                 suite = match.group(1).strip()
                 case = suite
@@ -88,14 +83,11 @@ def main():
 
             out.write(line)
 
-    xml_report = cu.JUnitXML.make_from_passed(passed_suites)
-    xml_report += cu.JUnitXML.make_from_failed(failed_suites)
-    xml_report += cu.JUnitXML.make_from_errored(errored_suites)
-    xml_report += cu.JUnitXML.make_from_skipped(skipped_suites)
+    results.add_suites(cu.CaseStatus.SKIPPED, skipped_suites)
 
-    xml_report.write(Path(config_obj['out_dir']).joinpath(config_obj['package'] + '.xml'))
+    results.write(Path(config_obj['out_dir']).joinpath(cu.with_compression(config_obj['package'] + '.xml', compression)))
 
-    if xml_report.is_success():
+    if results.is_success():
         exit(cu.CheckExit.EXIT_SUCCESS)
 
     exit(cu.CheckExit.EXIT_FAILURE)
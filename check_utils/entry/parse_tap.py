@@ -46,12 +46,11 @@ def main():
 
     timestamp = datetime.datetime.now().isoformat()
 
-    passed_suites = []
-    failed_suites = []
-    errored_suites = []
+    results = cu.ResultStore()
 
-    passed_cases: List[cu.PassedCase] = []
-    failed_cases: List[cu.FailedCase] = []
+    # Names of the cases of the current suite.
+    passed_cases: List[str] = []
+    failed_cases: List[str] = []
 
     skipped_suites = [skipped_obj
                       for skipped_config in config_obj.get('custom', dict()).get('skipped', dict()).get('suites', [])
@@ -59,14 +58,15 @@ def main():
 
     suite = None
     length = None
-    with open(config_obj['out_dir'] + '/' + config_obj['package'] + '.txt', 'w') as out:
+    compression = config_obj.get('compression', None)
+    with cu.open_compressed(config_obj['out_dir'] + '/' + cu.with_compression(config_obj['package'] + '.txt', compression), 'wt') as out:
         for line in sys.stdin:
             if (match := re.match(suite_pattern, line)):
                 if suite is not None:
-                    if len(passed_cases) != 0:
-                        passed_suites.append(cu.PassedSuite(suite, '', timestamp, passed_cases))
-                    if len(failed_cases) != 0:
-                        failed_suites.append(cu.FailedSuite(suite, '', timestamp, failed_cases))
+                    for case in passed_cases:
+                        results.add(cu.CaseStatus.PASSED, suite, case, timestamp=timestamp)
+                    for case in failed_cases:
+                        results.add(cu.CaseStatus.FAILED, suite, case, timestamp=timestamp, message='')
 
                     passed_cases = []
                     failed_cases = []
@@ -88,9 +88,9 @@ def main():
                                 or ((len(passed_cases) + len(failed_cases)) >= length):
                     pass
                 elif status == 'ok':
-                    passed_cases.append(cu.PassedCase(case, '', '', ''))
+                    passed_cases.append(case)
                 else:
-                    failed_cases.append(cu.FailedCase(case, '', '', '', '', ''))
+                    failed_cases.append(case)
             elif (match := re.match(e_pattern, line)):
                 esuite = match.group(1)
                 message = match.group(2)
@@ -99,26 +99,22 @@ def main():
                         for skipped_suite in skipped_suites
                         for case_name in skipped_suite.get_case_names()
                         if skipped_suite.get_name() == esuite and case_name == esuite]) == 0:
-                    errored_suites.append(cu.ErroredSuite(esuite, '', timestamp, [cu.ErroredCase(esuite, '', '', '', message, '')]))
+                    results.add(cu.CaseStatus.ERRORED, esuite, esuite, timestamp=timestamp, message=message)
 
             out.write(line)
 
     if suite is None:
         suite = 'test'
 
-    if len(passed_cases) != 0:
-        passed_suites.append(cu.PassedSuite(suite, '', timestamp, passed_cases))
-    if len(failed_cases) != 0:
-        failed_suites.append(cu.FailedSuite(suite, '', timestamp, failed_cases))
+    for case in passed_cases:
+        results.add(cu.CaseStatus.PASSED, suite, case, timestamp=timestamp)
+    for case in failed_cases:
+        results.add(cu.CaseStatus.FAILED, suite, case, timestamp=timestamp, message='')
+    results.add_suites(cu.CaseStatus.SKIPPED, skipped_suites)
 
-    xml_report = cu.JUnitXML.make_from_passed(passed_suites)
-    xml_report += cu.JUnitXML.make_from_failed(failed_suites)
-    xml_report += cu.JUnitXML.make_from_errored(errored_suites)
-    xml_report += cu.JUnitXML.make_from_skipped(skipped_suites)
+    results.write(Path(config_obj['out_dir']).joinpath(cu.with_compression(config_obj['package'] + '.xml', compression)))
 
-    xml_report.write(Path(config_obj['out_dir']).joinpath(config_obj['package'] + '.xml'))
-
-    if xml_report.is_success():
+    if results.is_success():
         exit(cu.CheckExit.EXIT_SUCCESS)
 
     exit(cu.CheckExit.EXIT_FAILURE)
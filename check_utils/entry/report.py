@@ -0,0 +1,144 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Query a JUnitXML report for its failures, slowest cases or counts per suite.
+The report is read one suite at a time, never as a whole.
+"""
+
+import argparse
+import heapq
+from typing import Iterable, List, Tuple
+
+import check_utils as cu
+from check_utils.xmlbackend import ET
+
+def print_failures(suites: Iterable[ET.Element]) -> int:
+    """
+    Print the failed and errored cases with their messages.
+
+    @return Number of cases printed.
+    """
+    num_cases = 0
+    for suite in suites:
+        for case in suite.iterfind('testcase'):
+            for child in case:
+                if child.tag != 'failure' and child.tag != 'error':
+                    continue
+                num_cases += 1
+                print(f'[{child.tag.upper()}] {suite.get("name", "")}.'
+                      f'{case.get("name", "")}')
+                message = child.get('message', '') or (child.text or '')
+                for line in message.strip().splitlines():
+                    print(f'  {line}')
+                break
+    return num_cases
+
+def get_slowest(suites: Iterable[ET.Element],
+                num_cases: int) -> List[Tuple[float, str, str]]:
+    """
+    @return The num_cases slowest cases as (time, suite, case), slowest
+            first.
+    """
+    # Min-heap of the slowest cases so far.
+    slowest = []
+    for suite in suites:
+        suite_name = suite.get('name', '')
+        for case in suite.iterfind('testcase'):
+            try:
+                time = float(case.get('time', ''))
+            except ValueError:
+                continue
+            if len(slowest) < num_cases:
+                heapq.heappush(slowest, (time, suite_name,
+                                         case.get('name', '')))
+            elif slowest and time > slowest[0][0]:
+                heapq.heapreplace(slowest, (time, suite_name,
+                                            case.get('name', '')))
+    return sorted(slowest, reverse=True)
+
+def count_suites(suites: Iterable[ET.Element]) \
+        -> List[Tuple[str, int, int, int, int]]:
+    """
+    @return (name, tests, failures, errors, skipped) of every suite, counted
+            from its cases.
+    """
+    counts = []
+    for suite in suites:
+        tests = failures = errors = skipped = 0
+        for case in suite.iterfind('testcase'):
+            tests += 1
+            tags = {child.tag for child in case}
+            if 'error' in tags:
+                errors += 1
+            elif 'failure' in tags:
+                failures += 1
+            elif 'skipped' in tags:
+                skipped += 1
+        counts.append((suite.get('name', ''), tests, failures, errors,
+                       skipped))
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(
+            prog='cureport',
+            description='Queries a report without loading it whole.',
+            )
+
+    parser.add_argument(
+            'report',
+            type=str,
+            help='Report to query. May be compressed.',
+            )
+    query = parser.add_mutually_exclusive_group()
+    query.add_argument(
+            '-f', '--failures',
+            action='store_true',
+            help='Print the failed and errored cases. The default.',
+            )
+    query.add_argument(
+            '-n', '--slowest',
+            type=int,
+            metavar='N',
+            help='Print the N slowest cases.',
+            )
+    query.add_argument(
+            '-s', '--suites',
+            action='store_true',
+            help='Print the counts of cases of each suite.',
+            )
+    parser.add_argument(
+            '--max-text',
+            type=int,
+            default=4096,
+            help='Truncate messages longer than this many characters.',
+            )
+    args = parser.parse_args()
+
+    suites = cu.JUnitXML.iter_suites(args.report, args.max_text)
+    if args.slowest is not None:
+        for time, suite, case in get_slowest(suites, args.slowest):
+            print(f'{time:10.3f}s {suite}.{case}')
+    elif args.suites:
+        print(f'{"tests":>8} {"failures":>8} {"errors":>8} {"skipped":>8} '
+              'suite')
+        for name, tests, failures, errors, skipped in count_suites(suites):
+            print(f'{tests:8} {failures:8} {errors:8} {skipped:8} {name}')
+    else:
+        print(f'{print_failures(suites)} failed or errored cases.')
+
+if __name__ == '__main__':
+    main()
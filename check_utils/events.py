@@ -0,0 +1,206 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Provides a live stream of test events, one JSON object per line.
+"""
+
+import datetime
+import errno
+import json
+import logging
+import os
+from pathlib import Path
+import socket
+import stat
+import threading
+from typing import Any, Dict, Final, Optional
+
+from .junitxml import JUnitXML
+
+class EventSink:
+    """
+    Writes an event when each test starts and finishes, to a file, a FIFO or
+    a Unix socket. Every event is a JSON object on a line of its own, e.g.,
+
+    {"event": "start", "binary": "build/test/foo", "framework": "googletest",
+     "cases": null, "timestamp": "2025-01-01T00:00:00"}
+    {"event": "finish", "binary": "build/test/foo", "framework": "googletest",
+     "cases": null, "timestamp": "2025-01-01T00:00:01", "status": "failed",
+     "duration": 1.0, "tests": 10, "failures": 1, "errors": 0, "skipped": 0}
+
+    The status is one of "passed", "failed", "errored" or "skipped". A test
+    which raised is "errored" with no counts.
+
+    Events are written as tests start and finish, from any thread, and
+    never wait for the reader of a FIFO or socket. Events the reader hasn't
+    taken yet are held, up to MAX_PENDING bytes, beyond which further events
+    are dropped and counted in num_dropped. If the reader goes away, events
+    are dropped rather than failing the run.
+    """
+    # Bytes of events held for a slow reader.
+    MAX_PENDING: Final[int] = 1 << 20
+
+    path: str
+    # Events dropped because the reader didn't keep up.
+    num_dropped: int = 0
+
+    def __init__(self, path: str):
+        """
+        @param path: File to write, or an existing FIFO or Unix socket.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = None
+        self._socket = None
+        # Events, or the rest of an event, which the reader hasn't taken yet.
+        self._pending = bytearray()
+
+        mode = os.stat(path).st_mode if Path(path).exists() else 0
+        try:
+            if stat.S_ISSOCK(mode):
+                self._socket = socket.socket(socket.AF_UNIX,
+                                             socket.SOCK_STREAM)
+                self._socket.connect(path)
+                self._socket.setblocking(False)
+                self._fd = self._socket.fileno()
+            elif stat.S_ISFIFO(mode):
+                self._fd = EventSink._open_fifo(path)
+            else:
+                self._fd = os.open(path,
+                                   os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                                   0o666)
+        except OSError as e:
+            logging.warning('Not writing events to %s: %s', path, e)
+            self.close()
+
+    # --- PUBLIC ---
+    def start(self, test) -> None:
+        """
+        Write the event of a test starting.
+        """
+        self._write(EventSink._make_event('start', test))
+
+    def finish(self, test, report: Optional[JUnitXML],
+               duration: float) -> None:
+        """
+        Write the event of a test finishing.
+
+        @param report: Report of the test, or None if it raised.
+        @param duration: Time the test took to run, in seconds.
+        """
+        event = EventSink._make_event('finish', test)
+        event['duration'] = round(duration, 6)
+        if report is None:
+            event['status'] = 'errored'
+        else:
+            totals = report.get_totals()
+            event['status'] = EventSink._get_status(totals)
+            for key in ['tests', 'failures', 'errors', 'skipped']:
+                event[key] = totals[key]
+        self._write(event)
+
+    def close(self) -> None:
+        """
+        Write the events held for the reader if it can take them now, and
+        drop the rest.
+        """
+        with self._lock:
+            if self._fd is not None:
+                try:
+                    self._flush()
+                except OSError:
+                    pass
+                self.num_dropped += self._pending.count(b'\n')
+                self._pending.clear()
+                if self.num_dropped != 0:
+                    logging.warning('Dropped %d events for %s, whose reader '
+                                    'did not keep up.', self.num_dropped,
+                                    self.path)
+            self._close_fd()
+
+    # --- PRIVATE ---
+    def _write(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event).encode('utf-8') + b'\n'
+        with self._lock:
+            if self._fd is None:
+                return
+            if len(self._pending) + len(line) > self.MAX_PENDING:
+                self.num_dropped += 1
+                return
+            self._pending += line
+            try:
+                self._flush()
+            except OSError as e:
+                # The reader went away.
+                logging.warning('Stopped writing events to %s: %s',
+                                self.path, e)
+                self._pending.clear()
+                self._close_fd()
+
+    def _flush(self) -> None:
+        """
+        Write as much of the pending events as the reader takes, without
+        waiting for it. Events are only ever held whole or in part, in order,
+        so lines are never interleaved.
+        """
+        while len(self._pending) != 0:
+            try:
+                written = os.write(self._fd, self._pending)
+            except BlockingIOError:
+                return
+            del self._pending[:written]
+
+    def _close_fd(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        elif self._fd is not None:
+            os.close(self._fd)
+        self._fd = None
+
+    @classmethod
+    def _open_fifo(cls, path: str) -> int:
+        """
+        Open a FIFO without waiting for a reader, which may never come.
+        Writes never wait either, so a slow reader can't hold up the run.
+        """
+        try:
+            return os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                raise OSError(e.errno, 'FIFO has no reader') from e
+            raise
+
+    @classmethod
+    def _make_event(cls, event: str, test) -> Dict[str, Any]:
+        return {
+                'event': event,
+                'binary': test.get_label(),
+                'framework': test.get_name_framework(),
+                'cases': test.get_cases(),
+                'timestamp': datetime.datetime.now().isoformat(),
+                }
+
+    @classmethod
+    def _get_status(cls, totals: Dict[str, Any]) -> str:
+        if totals['errors'] != 0:
+            return 'errored'
+        if totals['failures'] != 0:
+            return 'failed'
+        if totals['tests'] != 0 and totals['skipped'] == totals['tests']:
+            return 'skipped'
+        return 'passed'
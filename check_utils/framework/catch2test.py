@@ -21,7 +21,6 @@ Provides definitions for running catch2 tests.
 import logging
 import os
 from pathlib import Path
-import subprocess
 import tempfile
 from typing import List
 
@@ -49,14 +48,12 @@ class Catch2Test(BinaryTest):
                           for case_name in skipped.get_case_names()))
 
         self._info_cmd(command)
-        res = subprocess.run(
-                args=command,
+        res = self._execute(
+                command,
                 timeout=self.timeout,
                 capture_output=True \
                         if logging.getLogger().isEnabledFor(logging.INFO) \
                         else False,
-                check=False,
-                shell=True,
         )
         self._info_result(command, res)
 
@@ -21,7 +21,6 @@ Provides definitions for running ctest tests.
 import logging
 import os
 from pathlib import Path
-import subprocess
 import tempfile
 
 from ..junitxml import JUnitXML
@@ -46,19 +45,18 @@ class CTest(ProjectTest):
                           for case in s.get_case_names()]
             command += '--exclude-regex "(' + '|'.join(case_names) + ')" '
         self._info_cmd(command)
-        res = subprocess.run(
-                args=command,
+        res = self._execute(
+                command,
                 timeout=self.timeout,
                 capture_output=True \
                         if logging.getLogger().isEnabledFor(logging.INFO) \
                         else False,
-                check=False,
-                shell=True,
                 cwd=p,
         )
         self._info_result(command, res)
 
-        report_xml = JUnitXML(file=tmp_report)
+        report_xml = JUnitXML(file=tmp_report,
+                              max_text=self.meta.get_option('max_text', None))
         Path(tmp_report).unlink()
         return report_xml
 
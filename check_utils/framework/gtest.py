@@ -24,8 +24,9 @@ import os
 from pathlib import Path
 import subprocess
 import tempfile
-from typing import Generator, List, Optional
+from typing import Generator, List, Optional, Tuple
 
+from ..cache import DiscoveryCache
 from ..test import BinaryTest, GenericTest, TestMeta
 from ..jtype.errored import ErroredCase, ErroredSuite
 from ..junitxml import JUnitXML
@@ -55,8 +56,67 @@ class GTest(BinaryTest):
             skipped_tests += [suite.get_name() + '.' + case_name
                               for case_name in suite.get_case_names()]
 
-        # Run test cases individually so we can catch an error.
-        #
+        # Split the binary across processes with googletest's native sharding.
+        num_shards = int(meta.get_option('shards', 0))
+        if num_shards > 1:
+            # A shard runs every case that isn't excluded or disabled.
+            run_disabled = '--gtest_also_run_disabled_tests' in opts
+            runnable = [(suite, case)
+                        for suite, case in cls._list_tests(binary, meta.get_discovery_cache())
+                        if suite + '.' + case not in skipped_tests
+                        and (run_disabled
+                             or not (cls._is_disabled(suite)
+                                     or cls._is_disabled(case)))]
+            for index in range(num_shards):
+                # Googletest assigns runnable cases to shards round-robin.
+                cases = runnable[index::num_shards]
+                if len(cases) != 0:
+                    yield GTestShard(binary, index, num_shards, cases,
+                                     skipped_tests, opts, meta, timeout)
+            return
+
+        # Run test cases individually so we can catch an error, unless the
+        # configuration allows several cases to share a process.
+        batch_size = int(meta.get_option('batch_size', 1))
+        batch: List[Tuple[str, str]] = []
+        for suite, case in cls._list_tests(binary, meta.get_discovery_cache()):
+            if suite + '.' + case in skipped_tests:
+                continue
+
+            if batch_size <= 1:
+                yield cls(binary, suite, case, opts, meta, timeout)
+                continue
+
+            batch.append((suite, case))
+            if len(batch) == batch_size:
+                yield GTestBatch(binary, batch, opts, meta, timeout)
+                batch = []
+
+        if len(batch) != 0:
+            yield GTestBatch(binary, batch, opts, meta, timeout)
+
+    @classmethod
+    def _list_tests(cls, binary: str,
+                    cache: Optional[DiscoveryCache] = None) -> List[
+                            Tuple[str, str]]:
+        """
+        List the (suite, case) pairs contained in a googletest binary.
+
+        @param binary: Path to the binary.
+        @param cache: Cache to reuse the listing of an unchanged binary from.
+        """
+        if cache is not None:
+            try:
+                stat = os.stat(binary)
+            except OSError:
+                # Let the listing command report the problem.
+                cache = None
+
+        if cache is not None:
+            cached = cache.get(cls.get_name_framework(), binary)
+            if cached is not None:
+                return [(suite, case) for suite, case in cached]
+
         # FIXME: Do this in a more reliable way. EXIT_FAILURE can occur without
         # a bad output from --gtest_list_tests.
         command = f'./{binary} --gtest_list_tests'
@@ -71,6 +131,7 @@ class GTest(BinaryTest):
             raise subprocess.CalledProcessError('googletest command failed.',
                                                 cmd=command)
 
+        cases = []
         suite = ''
         for line in output.splitlines():
             # Can include comments for GetParam()
@@ -85,19 +146,48 @@ class GTest(BinaryTest):
                 suite = stripped[:-1]
             elif len(suite) != 0 and line.startswith(' '):
                 # Case identifier.
-                case = stripped
-                case_full = suite + '.' + case
+                cases.append((suite, stripped))
 
-                if case_full not in skipped_tests:
-                    yield cls(binary, suite, case, opts, meta, timeout)
+        if cache is not None:
+            cache.put(cls.get_name_framework(), binary, cases, stat)
+        return cases
 
-    def _run_gtest(self) -> None:
-        report_xml: Optional[JUnitXML] = None
-        # Suite timestamp
-        timestamp = datetime.datetime.now()
+    @classmethod
+    def _is_disabled(cls, name: str) -> bool:
+        """
+        Googletest disables suites and cases matching
+        DISABLED_*:*/DISABLED_*, so any part of a parameterized name may
+        disable it, e.g., Prefix/DISABLED_Suite or DISABLED_Case/0.
+        """
+        return any(part.startswith('DISABLED_') for part in name.split('/'))
+
+    def _run_filter(self, cases: List[Tuple[str, str]]) -> Tuple[
+            subprocess.CompletedProcess, Optional[JUnitXML]]:
+        """
+        Run the given cases in a single process.
 
-        case_full = self.suite + '.' + self.case
+        @return the completed process and the report of the run, or None in
+                place of the report if the process exited prematurely.
+        """
+        return self._run_process(':'.join(suite + '.' + case
+                                          for suite, case in cases),
+                                 num_cases=len(cases))
 
+    def _run_process(self, case_filter: str,
+                     extra_env: Optional[dict] = None,
+                     num_cases: int = 1) -> Tuple[
+                             subprocess.CompletedProcess, Optional[JUnitXML]]:
+        """
+        Run the binary once with a googletest filter.
+
+        @param case_filter: Value of --gtest_filter.
+        @param extra_env: Variables to add to the environment of the binary.
+        @param num_cases: Number of cases run. The timeout applies to each
+                          case, so the process is given the timeout of all of
+                          them.
+        @return the completed process and the report of the run, or None in
+                place of the report if the process exited prematurely.
+        """
         f, tmp_report = tempfile.mkstemp(suffix='.xml')
         os.close(f)
 
@@ -109,48 +199,74 @@ class GTest(BinaryTest):
         os.close(f)
         env = os.environ.copy()
         env['TEST_PREMATURE_EXIT_FILE'] = tmp_premature_exit
+        if extra_env is not None:
+            env.update(extra_env)
 
         command = (f'./{self.binary} '
                    f'--gtest_output="xml:{tmp_report}" '
-                   f'--gtest_filter="{case_full}" '
+                   f'--gtest_filter="{case_filter}" '
                    f'{self.opts}')
         self._info_cmd(command)
-        res = subprocess.run(
-                args=command,
+        res = self._execute(
+                command,
                 capture_output=True,
-                timeout=self.timeout,
-                check=False,
-                shell=True,
+                timeout=self.timeout * num_cases
+                if self.timeout is not None else None,
                 env=env,
         )
         self._info_result(command, res)
 
         if Path(tmp_premature_exit).exists():
-            end_timestamp = datetime.datetime.now()
-            duration = (end_timestamp - timestamp).total_seconds()
-            stderr = res.stderr.decode(errors='ignore')
-            logging.info('%s terminated with err %s.', self.binary,
-                         stderr)
-
-            report_xml = JUnitXML\
-                    .make_from_errored([ErroredSuite(self.suite,
-                                                     '',
-                                                     timestamp.isoformat(),
-                                                     [ErroredCase(self.case,
-                                                                  '',
-                                                                  str(duration),
-                                                                  '0',
-                                                                  stderr,
-                                                                  '')])])
-
             Path(tmp_premature_exit).unlink()
             Path(tmp_report).unlink(missing_ok=True)
-        else:
-            report_xml = JUnitXML(file=tmp_report)
+            return res, None
+
+        report_xml = JUnitXML(file=tmp_report)
+        Path(tmp_report).unlink()
+        return res, report_xml
+
+    def _run_cases(self, cases: List[Tuple[str, str]]) -> JUnitXML:
+        """
+        Run the given cases, bisecting the set on a premature exit until the
+        case responsible is isolated and reported as errored.
+        """
+        # Suite timestamp
+        timestamp = datetime.datetime.now()
+
+        res, report_xml = self._run_filter(cases)
+        if report_xml is not None:
+            return report_xml
+
+        if len(cases) > 1:
+            logging.info('%s exited prematurely running %d cases, bisecting.',
+                         self.binary, len(cases))
+            mid = len(cases) // 2
+            report_xml = self._run_cases(cases[:mid])
+            report_xml += self._run_cases(cases[mid:])
+            return report_xml
 
-            Path(tmp_report).unlink()
+        suite, case = cases[0]
+        end_timestamp = datetime.datetime.now()
+        duration = (end_timestamp - timestamp).total_seconds()
+        stderr = res.stderr.decode(errors='ignore')
+        logging.info('%s terminated with err %s.', self.binary,
+                     stderr)
 
-        return report_xml
+        return JUnitXML.make_from_errored([ErroredSuite(suite,
+                                                        '',
+                                                        timestamp.isoformat(),
+                                                        [ErroredCase(case,
+                                                                     '',
+                                                                     str(duration),
+                                                                     '0',
+                                                                     stderr,
+                                                                     '')])])
+
+    def _run_gtest(self) -> None:
+        return self._run_cases([(self.suite, self.case)])
+
+    def get_cases(self) -> List[Tuple[str, str]]:
+        return [(self.suite, self.case)]
 
     @classmethod
     def should_report_skipped_tests(cls) -> None:
@@ -161,3 +277,66 @@ class GTest(BinaryTest):
         return 'googletest'
 
     _run_impl = _run_gtest
+
+class GTestBatch(GTest):
+    """
+    Defines how to run and report several googletest cases of a binary in a
+    single process.
+    """
+    cases: List[Tuple[str, str]]
+
+    def __init__(self, binary: str, cases: List[Tuple[str, str]],
+                 opts: str, meta: TestMeta, timeout: Optional[int] = None):
+        super().__init__(binary, cases[0][0], cases[0][1], opts, meta, timeout)
+
+        self.cases = list(cases)
+
+    def _run_gtest_batch(self) -> JUnitXML:
+        return self._run_cases(self.cases)
+
+    def get_cases(self) -> List[Tuple[str, str]]:
+        return self.cases
+
+    _run_impl = _run_gtest_batch
+
+class GTestShard(GTestBatch):
+    """
+    Defines how to run and report one shard of a googletest binary, using
+    googletest's GTEST_TOTAL_SHARDS/GTEST_SHARD_INDEX protocol. See:
+    https://google.github.io/googletest/advanced.html#distributing-test-functions-to-multiple-machines
+    """
+    shard_index: int
+    total_shards: int
+    excluded: List[str]
+
+    def __init__(self, binary: str, shard_index: int, total_shards: int,
+                 cases: List[Tuple[str, str]], excluded: List[str],
+                 opts: str, meta: TestMeta, timeout: Optional[int] = None):
+        super().__init__(binary, cases, opts, meta, timeout)
+
+        self.shard_index = shard_index
+        self.total_shards = total_shards
+        self.excluded = excluded
+
+    def _run_gtest_shard(self) -> JUnitXML:
+        case_filter = '*'
+        if len(self.excluded) != 0:
+            case_filter += '-' + ':'.join(self.excluded)
+
+        _, report_xml = self._run_process(
+                case_filter,
+                {
+                    'GTEST_TOTAL_SHARDS': str(self.total_shards),
+                    'GTEST_SHARD_INDEX': str(self.shard_index),
+                },
+                len(self.cases))
+        if report_xml is not None:
+            return report_xml
+
+        # The shard crashed before writing its report. Rerun the cases
+        # assigned to it explicitly to find the one responsible.
+        logging.info('%s shard %d/%d exited prematurely.', self.binary,
+                     self.shard_index, self.total_shards)
+        return self._run_cases(self.cases)
+
+    _run_impl = _run_gtest_shard
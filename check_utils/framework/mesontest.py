@@ -92,20 +92,19 @@ class MesonTest(ProjectTest):
         command = (f'meson test {" ".join(run_tests)} -C {BUILD_DIR} -j '
                    f'{self.num_jobs} {self.opts}')
         self._info_cmd(command)
-        res = subprocess.run(
-                args=command,
+        res = self._execute(
+                command,
                 capture_output=True \
                         if logging.getLogger().isEnabledFor(logging.INFO) \
                         else False,
                 timeout=self.timeout,
-                check=False,
-                shell=True,
         )
         self._info_result(command, res)
 
         # Meson outputs as JUnit XML automatically.
         # FIXME: Not currently cleaning up test paths...
-        report_xml = JUnitXML(file=BUILD_DIR.joinpath(self.XML_TEST_LOG))
+        report_xml = JUnitXML(file=BUILD_DIR.joinpath(self.XML_TEST_LOG),
+                              max_text=self.meta.get_option('max_text', None))
         return report_xml
 
     @classmethod
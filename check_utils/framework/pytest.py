@@ -21,7 +21,6 @@ Provides definitions for running pytest tests.
 import logging
 import os
 from pathlib import Path
-import subprocess
 import tempfile
 from typing import List
 
@@ -50,14 +49,12 @@ class PyTest(ProjectTest):
             formatted_skipped = [f'not {case}' for case in case_names]
             command += '-k "' + ' and '.join(formatted_skipped) + '" '
         self._info_cmd(command)
-        res = subprocess.run(
-                args=command,
+        res = self._execute(
+                command,
                 capture_output=True \
                         if logging.getLogger().isEnabledFor(logging.INFO) \
                         else False,
                 timeout=self.timeout,
-                check=False,
-                shell=True,
         )
         self._info_result(command, res)
 
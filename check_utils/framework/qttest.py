@@ -21,7 +21,6 @@ Provides definitions for running catch2 tests.
 import logging
 import os
 from pathlib import Path
-import subprocess
 import tempfile
 from typing import List
 
@@ -50,14 +49,12 @@ class QtTest(BinaryTest):
                         f.write(f'\n[{case_name}]\nqnx\n')
 
         self._info_cmd(command)
-        res = subprocess.run(
-                args=command,
+        res = self._execute(
+                command,
                 capture_output=True \
                         if logging.getLogger().isEnabledFor(logging.INFO) \
                         else False,
                 timeout=self.timeout,
-                check=False,
-                shell=True,
         )
         self._info_result(command, res)
 
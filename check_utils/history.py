@@ -0,0 +1,176 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Provides a local database of test durations from previous runs.
+"""
+
+import datetime
+import math
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Final, List, NamedTuple, Optional, Tuple
+
+from .junitxml import JUnitXML
+
+class DurationStats(NamedTuple):
+    """
+    Duration statistics in seconds over the recorded runs.
+    """
+    count: int
+    mean: float
+    p95: float
+    last: float
+
+class TimingHistory:
+    """
+    Records the duration of every test case of a run in an SQLite database, so
+    that later runs can query how long a test is expected to take.
+
+    Durations are buffered by record() and written as a single run by
+    commit(). Only the latest max_runs runs are kept.
+    """
+    MAX_RUNS: Final[int] = 20
+
+    path: Path
+    max_runs: int
+
+    def __init__(self, path: str, max_runs: int = MAX_RUNS):
+        self.path = Path(path)
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, str, str, float]] = []
+        self._conn: Optional[sqlite3.Connection] = None
+
+    # --- PUBLIC ---
+    def record(self, report: JUnitXML, binary: str = '') -> None:
+        """
+        Buffer the durations of every executed test case in a report.
+
+        @param report: Report of the tests.
+        @param binary: Name of the binary or runner that produced the report.
+        """
+        rows = []
+        # Read without the tree property, which would drop the counts of the
+        # report in case the tree is changed.
+        for suite, _ in report.iter_suites_with_counts():
+            for case in suite.iter('testcase'):
+                if case.find('skipped') is not None:
+                    continue
+                try:
+                    time = float(case.get('time', ''))
+                except ValueError:
+                    continue
+                rows.append((binary,
+                             case.get('classname', suite.get('name', '')),
+                             case.get('name', ''),
+                             time))
+
+        with self._lock:
+            self._pending.extend(rows)
+
+    def commit(self) -> None:
+        """
+        Write the buffered durations to the database as a new run.
+        """
+        with self._lock:
+            rows, self._pending = self._pending, []
+            if len(rows) == 0:
+                return
+
+            conn = self._connect()
+            with conn:
+                run_id = conn.execute(
+                        'INSERT INTO runs (timestamp) VALUES (?)',
+                        (datetime.datetime.now().isoformat(),)).lastrowid
+                conn.executemany(
+                        'INSERT INTO durations (run_id, binary, suite, name, '
+                        'time) VALUES (?, ?, ?, ?, ?)',
+                        ((run_id, *row) for row in rows))
+                conn.execute(
+                        'DELETE FROM durations WHERE run_id <= ?',
+                        (run_id - self.max_runs,))
+                conn.execute(
+                        'DELETE FROM runs WHERE id <= ?',
+                        (run_id - self.max_runs,))
+
+    def get_case_stats(self, binary: str, suite: str,
+                       name: str) -> Optional[DurationStats]:
+        """
+        Returns the duration statistics of a test case, or None if it has
+        never been recorded.
+        """
+        return self._query_stats(
+                'SELECT time FROM durations '
+                'WHERE binary = ? AND suite = ? AND name = ? '
+                'ORDER BY run_id',
+                (binary, suite, name))
+
+    def get_binary_stats(self, binary: str) -> Optional[DurationStats]:
+        """
+        Returns the statistics of the total duration of the test cases of a
+        binary per run, or None if it has never been recorded.
+        """
+        return self._query_stats(
+                'SELECT SUM(time) FROM durations WHERE binary = ? '
+                'GROUP BY run_id ORDER BY run_id',
+                (binary,))
+
+    def is_empty(self) -> bool:
+        """
+        @return True if no run has been recorded, False otherwise.
+        """
+        with self._lock:
+            return self._connect().execute(
+                    'SELECT 1 FROM runs LIMIT 1').fetchone() is None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- PRIVATE ---
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                        'CREATE TABLE IF NOT EXISTS runs ('
+                        'id INTEGER PRIMARY KEY, timestamp TEXT)')
+                self._conn.execute(
+                        'CREATE TABLE IF NOT EXISTS durations ('
+                        'run_id INTEGER, binary TEXT, suite TEXT, name TEXT, '
+                        'time REAL)')
+                self._conn.execute(
+                        'CREATE INDEX IF NOT EXISTS durations_case '
+                        'ON durations (binary, suite, name)')
+        return self._conn
+
+    def _query_stats(self, query: str, args: tuple) -> Optional[DurationStats]:
+        with self._lock:
+            times = [row[0]
+                     for row in self._connect().execute(query, args)]
+        if len(times) == 0:
+            return None
+
+        ordered = sorted(times)
+        # Nearest-rank percentile.
+        p95 = ordered[max(math.ceil(0.95 * len(ordered)) - 1, 0)]
+        return DurationStats(len(times), sum(times) / len(times), p95,
+                             times[-1])
@@ -0,0 +1,149 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Provides a client for the GNU make jobserver, so that tests run from a
+parallel make share its job slots. See:
+https://www.gnu.org/software/make/manual/html_node/Job-Slots.html
+"""
+
+import logging
+import os
+import re
+import select
+import shlex
+from typing import Optional, Self
+
+class Jobserver:
+    """
+    Client of a GNU make jobserver.
+
+    Each token read from the jobserver allows one more job to run, and must be
+    written back once the job has finished. The process already holds an
+    implicit token for itself, which is not read from the jobserver.
+    """
+    read_fd: int
+    write_fd: int
+    owns_fds: bool
+
+    def __init__(self, read_fd: int, write_fd: int, owns_fds: bool = False):
+        """
+        @param read_fd: File descriptor to read tokens from.
+        @param write_fd: File descriptor to return tokens to.
+        @param owns_fds: Close the file descriptors on close().
+        """
+        self.read_fd = read_fd
+        self.write_fd = write_fd
+        self.owns_fds = owns_fds
+
+    # --- PUBLIC ---
+    @classmethod
+    def from_makeflags(cls, makeflags: Optional[str] = None) -> Optional[Self]:
+        """
+        Join the jobserver described by MAKEFLAGS, supporting both the
+        `--jobserver-auth=fifo:PATH` and `--jobserver-auth=R,W` (or older
+        `--jobserver-fds=R,W`) styles.
+
+        @param makeflags: Value of MAKEFLAGS. Read from the environment by
+                          default.
+        @return the jobserver, or None if there is no usable jobserver.
+        """
+        if makeflags is None:
+            makeflags = os.environ.get('MAKEFLAGS', '')
+
+        auth = None
+        try:
+            words = shlex.split(makeflags)
+        except ValueError:
+            words = makeflags.split()
+        for word in words:
+            # The last occurrence is the one that applies.
+            match = re.fullmatch(r'--jobserver-(?:auth|fds)=(.*)', word)
+            if match:
+                auth = match.group(1)
+
+        if auth is None:
+            return None
+
+        if auth.startswith('fifo:'):
+            path = auth[len('fifo:'):]
+            try:
+                read_fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+                write_fd = os.open(path, os.O_WRONLY)
+            except OSError as e:
+                logging.warning('Could not open jobserver fifo %s: %s', path, e)
+                return None
+            logging.debug('Joined jobserver fifo %s.', path)
+            return cls(read_fd, write_fd, owns_fds=True)
+
+        match = re.fullmatch(r'(-?[0-9]+),(-?[0-9]+)', auth)
+        if match is None:
+            logging.warning('Unrecognized jobserver %s.', auth)
+            return None
+
+        read_fd, write_fd = int(match.group(1)), int(match.group(2))
+        try:
+            # make only passes the descriptors to recipes it considers
+            # recursive.
+            os.fstat(read_fd)
+            os.fstat(write_fd)
+        except OSError:
+            logging.warning('Jobserver file descriptors %d,%d are not '
+                            'available. Was the recipe marked with `+`?',
+                            read_fd, write_fd)
+            return None
+        logging.debug('Joined jobserver file descriptors %d,%d.', read_fd,
+                      write_fd)
+        return cls(read_fd, write_fd)
+
+    def acquire(self) -> bytes:
+        """
+        Take a token, blocking until one is available.
+        """
+        while True:
+            token = self.try_acquire(None)
+            if token is not None:
+                return token
+
+    def try_acquire(self, timeout: Optional[float] = 0) -> Optional[bytes]:
+        """
+        Take a token if one becomes available within timeout seconds.
+
+        @return the token, or None if none was available.
+        """
+        readable, _, _ = select.select([self.read_fd], [], [], timeout)
+        if len(readable) == 0:
+            return None
+        try:
+            token = os.read(self.read_fd, 1)
+        except (BlockingIOError, InterruptedError):
+            # Another client took the token first.
+            return None
+        if len(token) == 0:
+            raise RuntimeError('The jobserver was closed.')
+        return token
+
+    def release(self, token: bytes) -> None:
+        """
+        Return a token taken from the jobserver.
+        """
+        os.write(self.write_fd, token)
+
+    def close(self) -> None:
+        if self.owns_fds:
+            os.close(self.read_fd)
+            os.close(self.write_fd)
+            self.owns_fds = False
@@ -20,22 +20,118 @@ Tools for parsing logs and creating/manipulating JUnitXML files.
 
 import copy
 import datetime
+import os
 from pathlib import Path
-from typing import List, Optional, Self
-import xml.etree.ElementTree as ET
+import shutil
+import threading
+from typing import (Dict, Final, Generator, List, Optional, Self, Set, Tuple,
+                    Union)
 
+from . import compression, xmlbackend
 from .definitions import IllegalArgumentError
 from .jtype.skipped import SkippedSuite
 from .jtype.failed import FailedSuite
 from .jtype.errored import ErroredSuite
 from .jtype.passed import PassedSuite
+from .xmlbackend import ET
+
+class _SuiteCounts:
+    """
+    Running totals of the test cases of a suite, or of a whole report.
+    """
+    __slots__ = ('tests', 'failures', 'errors', 'skipped', 'assertions',
+                 'time')
+
+    def __init__(self):
+        self.tests = 0
+        self.failures = 0
+        self.errors = 0
+        self.skipped = 0
+        self.assertions = 0
+        self.time = 0.0
+
+    def add_case(self, test_case: ET.Element) -> None:
+        self.tests += 1
+        self.failures += len(test_case.findall('.//failure'))
+        self.errors += len(test_case.findall('.//error'))
+        self.skipped += len(test_case.findall('.//skipped'))
+        a = test_case.get('assertions', '')
+        self.assertions += int(a if a.isnumeric() else 0)
+        t = test_case.get('time', '')
+        self.time += float(t if t.isnumeric() else 0.0)
+
+    def set_attributes(self, elem: ET.Element) -> None:
+        elem.set('tests', str(self.tests))
+        elem.set('failures', str(self.failures))
+        elem.set('errors', str(self.errors))
+        elem.set('skipped', str(self.skipped))
+        elem.set('assertions', str(self.assertions))
+        elem.set('time', str(self.time))
+
+    def to_dict(self) -> Dict[str, Union[int, float]]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __iadd__(self, other: Self) -> Self:
+        self.tests += other.tests
+        self.failures += other.failures
+        self.errors += other.errors
+        self.skipped += other.skipped
+        self.assertions += other.assertions
+        self.time += other.time
+        return self
+
+    def add_totals(self, totals: Dict[str, Union[int, float]]) -> None:
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + totals[name])
+
+class _ReportSnapshot:
+    """
+    Suites of a report as they were when it was added to a sum. The suites
+    are copied shallowly, so later merges into the report don't change the
+    sum.
+    """
+    __slots__ = ('attrib', 'suites')
+
+    def __init__(self, root: ET.Element):
+        self.attrib = dict(root.attrib) if root.tag == 'testsuites' else {}
+        suites = [root] if root.tag == 'testsuite' \
+                else root.findall('testsuite')
+        # (tag, attributes, text, tail, children) of every suite.
+        self.suites = [(suite.tag, dict(suite.attrib), suite.text, suite.tail,
+                        list(suite)) for suite in suites]
 
 class JUnitXML:
-    _tree: ET.ElementTree = None
+    ZERO_TIMESTAMP: Final[str] = '1970-01-01T00:00:00+00:00'
+    # Elements whose text and message can be truncated while loading.
+    TRUNCATED_TAGS: Final[Set[str]] = {'system-out', 'system-err', 'failure',
+                                       'error', 'skipped'}
+
+    _root_tree: Optional[ET.ElementTree] = None
+    # Snapshots of the operands of a sum which hasn't been merged yet, or
+    # None. Operands which are sums themselves are nested tuples.
+    _parts: Optional[Tuple] = None
+    # Maps suite names to the first suite of that name in the tree. Built
+    # lazily and dropped whenever the tree may have been changed from outside.
+    _suites: Optional[Dict[str, ET.Element]] = None
+    # Counts of the cases of each suite, or None if the tree may have been
+    # changed from outside and must be recounted.
+    _counts: Optional[Dict[ET.Element, _SuiteCounts]] = None
+    # Suites whose attributes are out of date.
+    _stale: Set[ET.Element]
+    _totals: _SuiteCounts
+    # Latest timestamp of the suites.
+    _timestamp: float
 
     def __init__(self,
                  file: Optional[str] = None,
-                 tree: Optional[ET.ElementTree] = None):
+                 tree: Optional[ET.ElementTree] = None,
+                 max_text: Optional[int] = None):
+        """
+        @param file: Report to load.
+        @param tree: Tree of the report, instead of a file.
+        @param max_text: Truncate output and messages longer than max_text
+                         characters while loading.
+        """
         if tree is not None:
             self._tree = tree
         elif file is None:
@@ -44,25 +140,27 @@ class JUnitXML:
             raise IllegalArgumentError('JUnitXML supplied invalid '
                                                    'file path.')
         else:
-            self._tree = ET.parse(file)
+            self._tree = JUnitXML._parse(file, max_text)
 
         if self._tree is not None:
             JUnitXML._standardize_tree(self._tree)
 
-    def load(self, file):
+    def load(self, file, max_text: Optional[int] = None):
         if not Path(file).exists() and Path(file).is_file():
             raise IllegalArgumentError('JUnitXML supplied invalid '
                                                    'file path.')
         else:
-            self._tree = ET.parse(file)
+            self._tree = JUnitXML._parse(file, max_text)
 
+        self._suites = None
+        self._counts = None
         if self._tree is not None:
             JUnitXML._standardize_tree(self._tree)
 
     # --- PUBLIC ---
     def write(self, file):
-        self._balance(self._tree.getroot())
-        self._tree.write(file)
+        self._balance()
+        xmlbackend.write(self._tree, file)
 
     def is_success(self) -> bool:
         """
@@ -71,19 +169,94 @@ class JUnitXML:
         @return True if there were no failures or errors,
                 False otherwise.
         """
-        root = self.tree.getroot()
-        return (root.get('failures', '0') == '0') \
-                and (root.get('errors', '0') == '0')
+        totals = self.get_totals()
+        return totals['failures'] == 0 and totals['errors'] == 0
+
+    def get_totals(self) -> Dict[str, Union[int, float]]:
+        """
+        Totals of the report, as written to the 'testsuites' element.
+
+        @return Number of tests, failures, errors, skipped and assertions, and
+                the time, by attribute name.
+        """
+        if self._counts is None:
+            self._recount()
+        return self._totals.to_dict()
+
+    def iter_suites_with_counts(self) -> Generator[
+            Tuple[ET.Element, Dict[str, Union[int, float]]], None, None]:
+        """
+        Generates every suite of the report with its totals, without
+        recounting the cases of suites which haven't changed. The suites must
+        not be changed.
+
+        @return Generator of each testsuite element and its number of tests,
+                failures, errors, skipped and assertions, and its time, by
+                attribute name.
+        """
+        for test_suite, counts in self._iter_suites():
+            yield test_suite, counts.to_dict()
 
     def get_tree(self) -> ET.ElementTree:
-        self._balance(self._tree.getroot())
+        self._balance()
+        # The caller may change the tree.
+        self._suites = None
+        self._counts = None
         return self._tree
 
     def set_tree(self, tree: ET.ElementTree) -> None:
         self._tree = tree
+        self._suites = None
+        self._counts = None
 
     tree = property(fget=get_tree, fset=set_tree)
 
+    def _get_own_tree(self) -> Optional[ET.ElementTree]:
+        if self._parts is not None:
+            self._materialize()
+        return self._root_tree
+
+    def _set_own_tree(self, tree: Optional[ET.ElementTree]) -> None:
+        self._parts = None
+        self._root_tree = tree
+
+    _tree = property(fget=_get_own_tree, fset=_set_own_tree)
+
+    @classmethod
+    def iter_suites(cls, file,
+                    max_text: Optional[int] = None) -> Generator[
+                            ET.Element, None, None]:
+        """
+        Parse a report incrementally, generating each testsuite as soon as it
+        has been read. Suites are dropped from the parsed tree once the
+        caller is done with them, so memory doesn't grow with the size of the
+        report.
+
+        @param file: Report to parse.
+        @param max_text: Truncate output and messages longer than max_text
+                         characters.
+        @return Generator of the testsuite elements of the report.
+        """
+        root = None
+        depth = 0
+        for event, elem in xmlbackend.iterparse(file, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+
+            depth -= 1
+            if elem.tag in cls.TRUNCATED_TAGS:
+                cls._truncate(elem, max_text)
+            if elem.tag == 'testsuite':
+                if depth == 0:
+                    # The root itself is a testsuite.
+                    yield elem
+                elif depth == 1 and root.tag == 'testsuites':
+                    yield elem
+                    root.remove(elem)
+
     @classmethod
     def make_from_skipped(cls, suites: List[SkippedSuite]) -> Self:
         suites_elem: ET.Element = JUnitXML.create_empty_testsuites()
@@ -99,7 +272,8 @@ class JUnitXML:
             for case in suite.get_cases():
                 skipped_elem = ET.Element('skipped',
                                           attrib={
-                                              'message': case.get_message()
+                                              'message': xmlbackend.safe_text(
+                                                  case.get_message())
                                               })
                 case_elem = JUnitXML.create_empty_testcase(case.get_name(),
                                                            suite.get_name(),
@@ -126,7 +300,8 @@ class JUnitXML:
             for case in suite.get_cases():
                 failed_elem = ET.Element('failure',
                                           attrib={
-                                              'message': case.get_message(),
+                                              'message': xmlbackend.safe_text(
+                                                  case.get_message()),
                                               'type': case.get_ftype()
                                               })
                 case_elem = JUnitXML.create_empty_testcase(case.get_name(),
@@ -157,7 +332,8 @@ class JUnitXML:
             for case in suite.get_cases():
                 errored_elem = ET.Element('error',
                                           attrib={
-                                              'message': case.get_message(),
+                                              'message': xmlbackend.safe_text(
+                                                  case.get_message()),
                                               'type': case.get_etype()
                                               })
                 case_elem = JUnitXML.create_empty_testcase(case.get_name(),
@@ -234,43 +410,142 @@ class JUnitXML:
                                   'file': file,
                                   'line': line})
 
+    def move_from(self, other: Self) -> Self:
+        """
+        Add another report to this one, as += does, but move its suites
+        rather than copying them. other is left empty.
+
+        @param other: Report which is no longer needed.
+        @return self.
+        """
+        self._merge(other, move=True)
+        other.set_tree(ET.ElementTree(JUnitXML.create_empty_testsuites()))
+        return self
+
     # --- OPPERATORS ---
     def __add__(self, other) -> Self:
         """
-        Add two JUnitXML objects. Avoid in favour of __iadd__ for better
-        performance.
+        Add two JUnitXML objects. The suites of the operands are recorded
+        now, but only merged, into a new tree, once the sum is written or
+        inspected, so that summing many reports takes time linear in their
+        size. Neither operand is modified, and later changes to the
+        operands don't change the sum. With the standard library, the sum
+        shares their test cases, which lxml copies.
         """
         if not isinstance(other, JUnitXML):
             raise NotImplementedError('Addition with invalid type.')
 
-        tree = copy.deepcopy(self._tree)
-        JUnitXML._iadd(tree.tree, other.tree)
-
-        return JUnitXML(tree=tree)
+        return JUnitXML._make_sum((self._snapshot(), other._snapshot()))
 
-    __radd__ = __add__
+    def __radd__(self, other) -> Self:
+        """
+        Add to 0, so that reports can be added with sum().
+        """
+        if isinstance(other, int) and other == 0:
+            return JUnitXML._make_sum((self._snapshot(),))
+        raise NotImplementedError('Addition with invalid type.')
 
     def __iadd__(self, other) -> Self:
         """
-        Add two JUnitXML objects and assign to self.
+        Add two JUnitXML objects and assign to self. other is left intact,
+        so lxml copies its test cases.
         """
         if not isinstance(other, JUnitXML):
             raise NotImplementedError('Addition with invalid type.')
 
-        JUnitXML._iadd(self._tree, other.tree)
+        return self._merge(other, move=False)
+
+    # --- PRIVATE ---
+    def _merge(self, other: Self, move: bool) -> Self:
+        """
+        Add the suites of other to self.
+
+        @param move: Move the elements of other rather than sharing them.
+        """
+        if self._tree.getroot().tag == 'testsuites' \
+                and other._tree.getroot().tag == 'testsuites':
+            if self._suites is None:
+                self._suites = JUnitXML._index_suites(self._tree.getroot())
+            if self._counts is None:
+                self._recount()
+            root = self._tree.getroot()
+            for suite2 in other._tree.getroot().findall('testsuite'):
+                counts = None
+                if other._counts is not None:
+                    counts = other._counts.get(suite2)
+                if counts is None:
+                    counts = JUnitXML._count_suite(suite2)
+                suite1 = JUnitXML._merge_suite(root, suite2, self._suites,
+                                               move)
+                self._add_counts(suite1, counts)
+        else:
+            JUnitXML._iadd(self._tree, other.tree, move)
+            self._suites = None
+            self._counts = None
 
         return self
 
-    # --- PRIVATE ---
+    @classmethod
+    def _make_sum(cls, parts: Tuple) -> Self:
+        report = cls.__new__(cls)
+        report._parts = parts
+        return report
+
+    def _snapshot(self) -> Union[_ReportSnapshot, Tuple]:
+        """
+        Record the suites of the report as an operand of a sum. The
+        operands of a sum which hasn't been merged yet are never changed,
+        so they are reused as they are.
+        """
+        if self._parts is not None:
+            return self._parts
+        return _ReportSnapshot(self._root_tree.getroot())
+
+    def _materialize(self) -> None:
+        """
+        Merge the operands of a sum into a tree of its own. Suites are
+        created anew, and their children shared where the XML backend allows
+        it, so that merging cases into them leaves the operands intact.
+        """
+        # Sums of sums are flattened without recursion, left to right.
+        snapshots: List[_ReportSnapshot] = []
+        stack = list(reversed(self._parts))
+        while len(stack) != 0:
+            part = stack.pop()
+            if isinstance(part, tuple):
+                stack.extend(reversed(part))
+            else:
+                snapshots.append(part)
+
+        root = ET.Element('testsuites', attrib=snapshots[0].attrib)
+        index: Dict[str, ET.Element] = {}
+        for snapshot in snapshots:
+            for tag, attrib, text, tail, children in snapshot.suites:
+                name = attrib.get('name', '')
+                suite1 = index.get(name)
+                if suite1 is None:
+                    suite1 = ET.SubElement(root, tag, attrib=attrib)
+                    suite1.text = text
+                    suite1.tail = tail
+                    index[name] = suite1
+                suite1.extend(xmlbackend.share(elem) for elem in children)
+
+        self._parts = None
+        self._root_tree = ET.ElementTree(root)
+        self._suites = index
+        self._counts = None
+
     @classmethod
     def _iadd(cls,
               tree1: ET.ElementTree,
-              tree2: ET.ElementTree) -> ET.ElementTree:
+              tree2: ET.ElementTree,
+              move: bool = False) -> ET.ElementTree:
         """
         Adds contents of tree2 to tree1.
 
         @param tree1: JUnitXML tree to add.
         @param tree2: JUnitXML tree to add.
+        @param move: Move the elements of tree2 rather than sharing them.
         @return Combined JUnitXML tree (tree1).
         """
         root1 = tree1.getroot()
@@ -282,15 +557,9 @@ class JUnitXML:
         if root1.tag == 'testsuites' \
                 and root2.tag == 'testsuites':
             # Add all testsuites that don't already exist from root2 to root1.
+            index = cls._index_suites(root1)
             for suite2 in root2.findall('testsuite'):
-                suite1 = root1.find("./testsuite"
-                                    f"[@name='{suite2.get('name', '')}']")
-                if suite1 is None:
-                    root1.append(suite2)
-                else:
-                    # Assume testcases don't already exist. There is no good way
-                    # to handle it if they do.
-                    suite1.extend(suite2)
+                cls._merge_suite(root1, suite2, index, move)
         elif root1.tag == 'testsuite' \
                 and root2.tag == 'testsuites':
             # We won't normally get here.
@@ -306,14 +575,14 @@ class JUnitXML:
         elif root1.tag == 'testsuites' \
                 and root2.tag == 'testsuite':
             # We only have one testsuite to add to the root1 report.
-            root1.append(root2)
+            root1.append(root2 if move else xmlbackend.share(root2))
         elif root1.tag == 'testsuite' \
                 and root2.tag == 'testsuite':
             # Create an empty test_suites element to be populated later.
             # We have no reliable way to decide on the "name" attribute.
             temp_root = ET.Element('testsuites')
             temp_root.append(root1)
-            temp_root.append(root2)
+            temp_root.append(root2 if move else xmlbackend.share(root2))
 
             root1 = temp_root
             tree1._setroot(root1)
@@ -323,82 +592,136 @@ class JUnitXML:
         return tree1
 
     @classmethod
-    def _balance(cls, test_suites: ET.Element) -> None:
+    def _index_suites(cls, root: ET.Element) -> Dict[str, ET.Element]:
+        """
+        Map the name of every testsuite under root to its first occurrence.
+        """
+        index: Dict[str, ET.Element] = {}
+        for suite in root.iterfind('testsuite'):
+            index.setdefault(suite.get('name', ''), suite)
+        return index
+
+    @classmethod
+    def _merge_suite(cls,
+                     root1: ET.Element,
+                     suite2: ET.Element,
+                     index: Dict[str, ET.Element],
+                     move: bool = False) -> ET.Element:
         """
-        Ensure all attributes of 'testsuites' element are accumulated from
-        test cases.
+        Adds a testsuite to root1, or its testcases to the testsuite of the
+        same name if there is one.
+
+        Unless it is moved, the report of suite2 is left intact, whichever the
+        XML backend.
+
+        @param root1: testsuites element to add to.
+        @param suite2: testsuite element to add.
+        @param index: Index of the suites of root1, which is kept up to date.
+        @param move: Move suite2 or its testcases rather than sharing them.
+        @return the suite of root1 which was added or extended.
+        """
+        name = suite2.get('name', '')
+        suite1 = index.get(name)
+        if suite1 is None:
+            suite1 = suite2 if move else xmlbackend.share(suite2)
+            root1.append(suite1)
+            index[name] = suite1
+            return suite1
+
+        # Assume testcases don't already exist. There is no good way to
+        # handle it if they do.
+        if move:
+            suite1.extend(list(suite2))
+        else:
+            suite1.extend(xmlbackend.share(elem) for elem in suite2)
+        return suite1
+
+    def _balance(self) -> None:
+        """
+        Ensure all attributes of the 'testsuites' element and of its
+        'testsuite' elements are accumulated from test cases.
+
+        The tree is only recounted if it may have been changed from outside.
+        Otherwise only the suites changed by merges are updated.
         """
+        if self._counts is None:
+            self._recount()
+
+        for suite in self._stale:
+            self._counts[suite].set_attributes(suite)
+        self._stale.clear()
+
         # Update root element to latest timestamp. Timestamp is in ISO 8601,
         # so it must be converted to a simpler format before comparison.
         # These only come from testsuite. No reason to update anything else.
-        zero_timestamp = '1970-01-01T00:00:00+00:00'
+        test_suites = self._tree.getroot()
         timestamp = JUnitXML._convert_iso_timestamp(
                 test_suites.get(
                     'timestamp',
-                    zero_timestamp
+                    JUnitXML.ZERO_TIMESTAMP
                     ))
-        for elem in test_suites.findall('./testsuite[@timestamp]'):
-            ts = elem.get('timestamp', zero_timestamp)
-            local_timestamp = JUnitXML._convert_iso_timestamp(
-                    ts if len(ts) != 0 else zero_timestamp)
-            if float(timestamp) < float(local_timestamp):
-                timestamp = local_timestamp
+        if float(timestamp) < float(self._timestamp):
+            timestamp = self._timestamp
 
-        test_cases = 0
-        failed = 0
-        errored = 0
-        skipped = 0
-        time = 0.0
-        assertions = 0
-        for test_suite in test_suites.findall('./testsuite'):
-            suite_test_cases = 0
-            suite_failed = 0
-            suite_errored = 0
-            suite_skipped = 0
-            suite_assertions = 0
-            suite_time = 0.0
-
-            suite_test_cases = len(test_suite.findall('./testcase'))
-
-            suite_failed = len(test_suite.findall(
-                './testcase//failure'))
-
-            suite_errored = len(test_suite.findall(
-                './testcase//error'))
-
-            suite_skipped = len(test_suite.findall(
-                './testcase//skipped'))
-
-            for test_case in test_suite.findall('./testcase'):
-                a = test_case.get('assertions', '')
-                suite_assertions += int(a if a.isnumeric() else 0)
-                t = test_case.get('time', '')
-                suite_time += float(t if t.isnumeric() else 0.0)
-
-            test_suite.set('tests', str(suite_test_cases))
-            test_suite.set('failures', str(suite_failed))
-            test_suite.set('errors', str(suite_errored))
-            test_suite.set('skipped', str(suite_skipped))
-            test_suite.set('assertions', str(suite_assertions))
-            test_suite.set('time', str(suite_time))
-            test_suite.set('assertions', str(suite_assertions))
-
-            time += suite_time
-            assertions += suite_assertions
-            test_cases += suite_test_cases
-            failed += suite_failed
-            errored += suite_errored
-            skipped += suite_skipped
-
-        test_suites.set('tests', str(test_cases))
-        test_suites.set('failures', str(failed))
-        test_suites.set('errors', str(errored))
-        test_suites.set('skipped', str(skipped))
-        test_suites.set('assertions', str(assertions))
-        test_suites.set('time', str(time))
+        self._totals.set_attributes(test_suites)
         test_suites.set('timestamp', str(datetime.datetime\
                 .fromtimestamp(timestamp).isoformat()))
 
+    def _iter_suites(self) -> Generator[Tuple[ET.Element, _SuiteCounts],
+                                        None, None]:
+        """
+        Generates every suite of the tree with its counts, after bringing
+        their attributes up to date.
+        """
+        self._balance()
+        for test_suite in self._tree.getroot().findall('./testsuite'):
+            yield test_suite, self._counts[test_suite]
+
+    def _recount(self) -> None:
+        """
+        Count the test cases of every suite of the tree.
+        """
+        test_suites = self._tree.getroot()
+        self._counts = {}
+        self._stale = set()
+        self._totals = _SuiteCounts()
+        self._timestamp = JUnitXML._convert_iso_timestamp(
+                JUnitXML.ZERO_TIMESTAMP)
+        for test_suite in test_suites.findall('./testsuite'):
+            self._add_counts(test_suite, JUnitXML._count_suite(test_suite))
+
+    def _add_counts(self, test_suite: ET.Element,
+                    counts: _SuiteCounts) -> None:
+        """
+        Account for a suite of the tree which is new or has new cases.
+        """
+        suite_counts = self._counts.get(test_suite)
+        if suite_counts is None:
+            self._counts[test_suite] = copy.copy(counts)
+            local_timestamp = JUnitXML._get_suite_timestamp(test_suite)
+            if float(self._timestamp) < float(local_timestamp):
+                self._timestamp = local_timestamp
+        else:
+            suite_counts += counts
+        self._totals += counts
+        self._stale.add(test_suite)
+
+    @classmethod
+    def _count_suite(cls, test_suite: ET.Element) -> _SuiteCounts:
+        counts = _SuiteCounts()
+        for test_case in test_suite.findall('./testcase'):
+            counts.add_case(test_case)
+        return counts
+
+    @classmethod
+    def _get_suite_timestamp(cls, test_suite: ET.Element) -> float:
+        ts = test_suite.get('timestamp')
+        if ts is None:
+            # Suites without a timestamp don't count.
+            return JUnitXML._convert_iso_timestamp(JUnitXML.ZERO_TIMESTAMP)
+        return JUnitXML._convert_iso_timestamp(
+                ts if len(ts) != 0 else JUnitXML.ZERO_TIMESTAMP)
+
     @classmethod
     def _convert_iso_timestamp(cls, iso: str):
         """
@@ -411,6 +734,38 @@ class JUnitXML:
         utc_ts = iso_date.replace(tzinfo=datetime.timezone.utc)
         return utc_ts.timestamp()
 
+    @classmethod
+    def _parse(cls, file, max_text: Optional[int] = None) -> ET.ElementTree:
+        """
+        Parse a report. When max_text is given, it is parsed incrementally,
+        truncating output and messages as soon as they are read so that large
+        bodies are never all held at once.
+        """
+        if max_text is None:
+            return xmlbackend.parse(file)
+
+        root = None
+        for _, elem in xmlbackend.iterparse(file, events=('end',)):
+            if elem.tag in cls.TRUNCATED_TAGS:
+                cls._truncate(elem, max_text)
+            root = elem
+        return ET.ElementTree(root)
+
+    @classmethod
+    def _truncate(cls, elem: ET.Element, max_text: Optional[int]) -> None:
+        if max_text is None:
+            return
+        if elem.text is not None and len(elem.text) > max_text:
+            elem.text = cls._truncate_text(elem.text, max_text)
+        message = elem.get('message')
+        if message is not None and len(message) > max_text:
+            elem.set('message', cls._truncate_text(message, max_text))
+
+    @classmethod
+    def _truncate_text(cls, text: str, max_text: int) -> str:
+        return (f'{text[:max_text]}\n'
+                f'[{len(text) - max_text} characters truncated]')
+
     @classmethod
     def _standardize_tree(cls, tree: ET.ElementTree):
         root = tree.getroot()
@@ -422,9 +777,129 @@ class JUnitXML:
             attrib = root.attrib
             attrib.pop('name', None)
             attrib.pop('file', None)
-            temp_root = ET.Element('testsuites', attrib=attrib)
+            temp_root = ET.Element('testsuites', attrib=dict(attrib))
 
             temp_root.append(root)
 
             root = temp_root
             tree._setroot(root)
+
+class JUnitXMLStream:
+    """
+    Writes a JUnitXML report incrementally. The suites of each report added
+    are appended to the file straight away, so that reports don't accumulate
+    in memory and finished tests are on disk if the run is interrupted.
+
+    Suites are written as they come, so suites of the same name from
+    different reports are not merged. The attributes of the 'testsuites'
+    element are written on close(), over a header of fixed size.
+
+    A compressed report can't be rewritten in place. Its suites are
+    compressed to file.part as they come, and on close() the header is
+    compressed to the report, followed by the suites as they are, which
+    decompress as a single report. Compressed suites are not flushed as
+    each report is added, so that they compress well.
+    """
+    HEADER_SIZE: Final[int] = 512
+
+    file: str
+
+    def __init__(self, file: str):
+        self.file = file
+        self._lock = threading.Lock()
+        self._totals = _SuiteCounts()
+        self._timestamp = JUnitXML._convert_iso_timestamp(
+                JUnitXML.ZERO_TIMESTAMP)
+        self._part = None
+        file_compression = compression.get_compression(file)
+        if file_compression is None:
+            self._f = open(file, 'wb')
+            self._f.write(self._make_header())
+            self._f.flush()
+        else:
+            self._part = os.fspath(file) + '.part'
+            self._f = compression.open_compressed(self._part, 'wb',
+                                                  file_compression)
+
+    # --- PUBLIC ---
+    def add(self, report: JUnitXML) -> None:
+        """
+        Append the suites of a report to the file.
+        """
+        chunks = []
+        totals = _SuiteCounts()
+        timestamp = self._timestamp
+        for test_suite, counts in report.iter_suites_with_counts():
+            chunks.append(xmlbackend.tostring(test_suite))
+            totals.add_totals(counts)
+            local_timestamp = JUnitXML._get_suite_timestamp(test_suite)
+            if float(timestamp) < float(local_timestamp):
+                timestamp = local_timestamp
+
+        with self._lock:
+            if self._f is None:
+                raise RuntimeError('JUnitXMLStream is closed.')
+            self._f.write(b''.join(chunks))
+            if self._part is None:
+                self._f.flush()
+            self._totals += totals
+            if float(self._timestamp) < float(timestamp):
+                self._timestamp = timestamp
+
+    def is_success(self) -> bool:
+        """
+        Check if testing succeeded based on the reports added so far.
+
+        @return True if there were no failures or errors,
+                False otherwise.
+        """
+        totals = self.get_totals()
+        return totals['failures'] == 0 and totals['errors'] == 0
+
+    def get_totals(self) -> Dict[str, Union[int, float]]:
+        """
+        Totals of the reports added so far, by attribute name.
+        """
+        with self._lock:
+            return self._totals.to_dict()
+
+    def close(self) -> None:
+        """
+        Finish the report, writing the totals of all suites.
+        """
+        with self._lock:
+            if self._f is None:
+                return
+            self._f.write(b'</testsuites>')
+            if self._part is None:
+                self._f.seek(0)
+                self._f.write(self._make_header())
+            self._f.close()
+            self._f = None
+
+            if self._part is not None:
+                with compression.open_compressed(self.file, 'wb') as dst:
+                    dst.write(self._make_header())
+                # The suites are already compressed.
+                with open(self._part, 'rb') as src, \
+                        open(self.file, 'ab') as dst:
+                    shutil.copyfileobj(src, dst)
+                Path(self._part).unlink()
+
+    # --- PRIVATE ---
+    def _make_header(self) -> bytes:
+        """
+        Make the start tag of the 'testsuites' element, padded to
+        HEADER_SIZE.
+        """
+        test_suites = JUnitXML.create_empty_testsuites()
+        self._totals.set_attributes(test_suites)
+        test_suites.set('timestamp', str(datetime.datetime\
+                .fromtimestamp(self._timestamp).isoformat()))
+
+        # Serialized as an empty element, <testsuites ... />.
+        start = xmlbackend.tostring(test_suites)[:-len(b' />')]
+        padding = self.HEADER_SIZE - len(start) - len(b'>')
+        if padding < 0:
+            raise RuntimeError('JUnitXMLStream header is too large.')
+        return start + b' ' * padding + b'>'
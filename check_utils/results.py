@@ -0,0 +1,272 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Provides a compact store of test results, converted to JUnitXML when written.
+"""
+
+from array import array
+from enum import IntEnum
+import io
+import math
+from typing import Dict, Generator, Iterable, List, Optional
+
+from .junitxml import JUnitXML, JUnitXMLStream
+from .jtype.jtype import Suite
+from .xmlbackend import ET, safe_text
+
+class CaseStatus(IntEnum):
+    PASSED = 0
+    FAILED = 1
+    ERRORED = 2
+    SKIPPED = 3
+
+class ResultStore:
+    """
+    Stores test cases in columns of arrays rather than as elements, with
+    strings interned and messages kept in a single buffer. Cases are grouped
+    into suites by name, and only converted to JUnitXML when written.
+
+    Times, assertions and lines which are unknown are written as empty
+    strings.
+    """
+    __slots__ = ('_strings', '_string_ids', '_status', '_suite', '_name',
+                 '_file', '_timestamp', '_type', '_line', '_time',
+                 '_assertions', '_message_start', '_message_end',
+                 '_messages', '_message_text', '_suite_rows')
+
+    def __init__(self):
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._status = array('B')
+        # Indices of interned strings.
+        self._suite = array('L')
+        self._name = array('L')
+        self._file = array('L')
+        self._timestamp = array('L')
+        self._type = array('L')
+        # -1 or NaN when unknown.
+        self._line = array('l')
+        self._time = array('d')
+        self._assertions = array('l')
+        # Offsets of the messages in the buffer, -1 if there is no message.
+        self._message_start = array('q')
+        self._message_end = array('q')
+        self._messages = io.StringIO()
+        self._message_text: Optional[str] = None
+        # Rows of the cases of each suite, by interned suite name.
+        self._suite_rows: Dict[int, array] = {}
+
+    # --- PUBLIC ---
+    def add(self,
+            status: CaseStatus,
+            suite: str,
+            name: str,
+            file: str = '',
+            timestamp: str = '',
+            line: Optional[int] = None,
+            time: Optional[float] = None,
+            assertions: Optional[int] = None,
+            message: Optional[str] = None,
+            type: str = '') -> None:
+        """
+        Add a test case.
+
+        @param status: Outcome of the case.
+        @param suite: Name of the suite of the case.
+        @param name: Name of the case.
+        @param file: Source file of the case.
+        @param timestamp: Time at which the suite ran, in ISO 8601.
+        @param line: Line of the case in the source file.
+        @param time: Duration of the case in seconds.
+        @param assertions: Number of assertions of the case.
+        @param message: Message of a case which failed, errored or was
+                        skipped.
+        @param type: Type of failure or error.
+        """
+        suite_id = self._intern(suite)
+        row = len(self._status)
+        self._suite_rows.setdefault(suite_id, array('L')).append(row)
+
+        self._status.append(status)
+        self._suite.append(suite_id)
+        self._name.append(self._intern(name))
+        self._file.append(self._intern(file))
+        self._timestamp.append(self._intern(timestamp))
+        self._type.append(self._intern(type))
+        self._line.append(line if line is not None else -1)
+        self._time.append(time if time is not None else math.nan)
+        self._assertions.append(assertions if assertions is not None else -1)
+        if message is None:
+            self._message_start.append(-1)
+            self._message_end.append(-1)
+        else:
+            start = self._messages.tell()
+            self._message_start.append(start)
+            self._message_end.append(start + self._messages.write(message))
+            self._message_text = None
+
+    def add_suites(self, status: CaseStatus, suites: Iterable[Suite]) -> None:
+        """
+        Add the cases of suites of passed, failed, errored or skipped tests.
+        """
+        for suite in suites:
+            for case in suite.get_cases():
+                message = None
+                type = ''
+                if status != CaseStatus.PASSED:
+                    message = case.get_message()
+                if status == CaseStatus.FAILED:
+                    type = case.get_ftype()
+                elif status == CaseStatus.ERRORED:
+                    type = case.get_etype()
+
+                time = None
+                assertions = None
+                if status != CaseStatus.SKIPPED:
+                    time = ResultStore._to_float(case.get_time())
+                    assertions = ResultStore._to_int(case.get_assertions())
+
+                self.add(status, suite.get_name(), case.get_name(),
+                         file=suite.get_file(),
+                         timestamp=suite.get_timestamp(),
+                         line=ResultStore._to_int(case.get_line()),
+                         time=time,
+                         assertions=assertions,
+                         message=message,
+                         type=type)
+
+    def count(self, status: CaseStatus) -> int:
+        return self._status.count(status)
+
+    def is_success(self) -> bool:
+        """
+        Check if testing succeeded based on the cases added.
+
+        @return True if there were no failures or errors,
+                False otherwise.
+        """
+        return self.count(CaseStatus.FAILED) == 0 \
+                and self.count(CaseStatus.ERRORED) == 0
+
+    def iter_junitxml(self) -> Generator[JUnitXML, None, None]:
+        """
+        Generates a report per suite, in the order in which the suites were
+        first added.
+        """
+        for suite_id, rows in self._suite_rows.items():
+            yield JUnitXML(tree=ET.ElementTree(self._make_suites(suite_id,
+                                                                 rows)))
+
+    def to_junitxml(self) -> JUnitXML:
+        """
+        Convert every case to a single report.
+        """
+        report = JUnitXML()
+        for suite_report in self.iter_junitxml():
+            report.move_from(suite_report)
+        return report
+
+    def write(self, file) -> None:
+        """
+        Write the cases as a JUnitXML report, converting one suite at a time.
+        """
+        stream = JUnitXMLStream(file)
+        try:
+            for suite_report in self.iter_junitxml():
+                stream.add(suite_report)
+        finally:
+            stream.close()
+
+    def __len__(self) -> int:
+        return len(self._status)
+
+    # --- PRIVATE ---
+    def _intern(self, s: str) -> int:
+        string_id = self._string_ids.get(s)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(s)
+            self._string_ids[s] = string_id
+        return string_id
+
+    def _get_message(self, row: int) -> str:
+        start = self._message_start[row]
+        if start < 0:
+            return ''
+        if self._message_text is None:
+            self._message_text = self._messages.getvalue()
+        return safe_text(self._message_text[start:self._message_end[row]])
+
+    def _make_suites(self, suite_id: int, rows: array) -> ET.Element:
+        """
+        Make a testsuites element holding the suite, as the make_from_*
+        methods of JUnitXML do.
+        """
+        strings = self._strings
+        first = rows[0]
+        suite_elem = JUnitXML.create_empty_testsuite(
+                strings[suite_id], strings[self._file[first]])
+        suite_elem.set('timestamp', strings[self._timestamp[first]])
+
+        for row in rows:
+            case_elem = JUnitXML.create_empty_testcase(
+                    strings[self._name[row]],
+                    strings[suite_id],
+                    strings[self._file[row]],
+                    ResultStore._format(self._line[row]))
+
+            status = self._status[row]
+            if status != CaseStatus.SKIPPED:
+                case_elem.set('time', ResultStore._format(self._time[row]))
+                case_elem.set('assertions',
+                              ResultStore._format(self._assertions[row]))
+
+            if status == CaseStatus.FAILED:
+                ET.SubElement(case_elem, 'failure', attrib={
+                    'message': self._get_message(row),
+                    'type': strings[self._type[row]]})
+            elif status == CaseStatus.ERRORED:
+                ET.SubElement(case_elem, 'error', attrib={
+                    'message': self._get_message(row),
+                    'type': strings[self._type[row]]})
+            elif status == CaseStatus.SKIPPED:
+                ET.SubElement(case_elem, 'skipped', attrib={
+                    'message': self._get_message(row)})
+
+            suite_elem.append(case_elem)
+
+        suites_elem = JUnitXML.create_empty_testsuites()
+        suites_elem.append(suite_elem)
+        return suites_elem
+
+    @classmethod
+    def _format(cls, value) -> str:
+        if (isinstance(value, float) and math.isnan(value)) \
+                or (isinstance(value, int) and value < 0):
+            return ''
+        return str(value)
+
+    @classmethod
+    def _to_float(cls, value: str) -> Optional[float]:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    @classmethod
+    def _to_int(cls, value: str) -> Optional[int]:
+        return int(value) if value.isdigit() else None
@@ -0,0 +1,87 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Provides scheduling of test jobs from their recorded durations.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .history import TimingHistory
+
+if TYPE_CHECKING:
+    from .test import GenericTest
+
+def estimate_duration(test: GenericTest,
+                      history: TimingHistory) -> Optional[float]:
+    """
+    Estimate how long a test will take from its recorded durations.
+
+    @param test: Test to estimate.
+    @param history: Recorded durations.
+    @return the expected duration in seconds, or None if any part of the test
+            has never been recorded.
+    """
+    cases = test.get_cases()
+    if cases is None:
+        stats = history.get_binary_stats(test.get_label())
+        return stats.mean if stats is not None else None
+
+    total = 0.0
+    for suite, case in cases:
+        stats = history.get_case_stats(test.get_label(), suite, case)
+        if stats is None:
+            return None
+        total += stats.mean
+    return total
+
+def predict_makespan(durations: Sequence[float], num_jobs: int) -> float:
+    """
+    Predict the time taken to run jobs in order on num_jobs workers, each job
+    starting on the first worker to become idle.
+    """
+    workers = [0.0] * max(num_jobs, 1)
+    for duration in durations:
+        heapq.heapreplace(workers, workers[0] + duration)
+    return max(workers)
+
+def schedule_longest_first(tests: Sequence[GenericTest],
+                           history: TimingHistory,
+                           num_jobs: int) -> Tuple[List[int], float]:
+    """
+    Order tests longest-expected-first (LPT), which keeps long tests from
+    starting last and leaving the other workers idle at the end of the run.
+
+    Tests that have never been recorded are expected to take as long as the
+    average recorded test. Ties keep their original order.
+
+    @param tests: Tests to order.
+    @param history: Recorded durations.
+    @param num_jobs: Number of workers the tests will run on.
+    @return the indices of the tests in the order to run them, and the
+            predicted makespan in seconds.
+    """
+    estimates = [estimate_duration(test, history) for test in tests]
+    known = [estimate for estimate in estimates if estimate is not None]
+    fallback = sum(known) / len(known) if len(known) != 0 else 0.0
+    estimates = [estimate if estimate is not None else fallback
+                 for estimate in estimates]
+
+    order = sorted(range(len(tests)), key=lambda i: -estimates[i])
+    return order, predict_makespan([estimates[i] for i in order], num_jobs)
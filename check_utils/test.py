@@ -20,19 +20,35 @@ Provides common base class definitions for creating test runner objects.
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from functools import cache
+from collections import deque
+from contextlib import contextmanager
+from functools import cache, partial
 import glob
+from itertools import islice
 import logging
 from multiprocessing.pool import ThreadPool
 import os
 from pathlib import Path
+import queue
 import re
+import shlex
 import subprocess
-from typing import List, Optional, Generator, Set
-
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Final, Iterable, List, Optional, Generator,\
+        Set, Tuple, Union
+
+from .cache import DiscoveryCache
+from .checkpoint import Checkpoint
 from .config import Config
-from .junitxml import JUnitXML
+from .engine import AsyncEngine
+from .events import EventSink
+from .history import TimingHistory
+from .jobserver import Jobserver
+from .junitxml import JUnitXML, JUnitXMLStream
 from .jtype.skipped import Skipped, SkippedSuite
+from .schedule import schedule_longest_first
 from .system_spec import SystemSpec
 
 class GenericTest(ABC):
@@ -44,6 +60,13 @@ class GenericTest(ABC):
             "on_failure": "bold red",
             "on_stderr": "red"
         }
+    # Characters with a meaning to the shell outside quotes, and within double
+    # quotes.
+    SHELL_CHARS: Final[str] = '|&;<>()$`\\*?[]{}~!#\n'
+    SHELL_QUOTED_CHARS: Final[str] = '$`\\'
+    # Variable assignment ahead of a command.
+    SHELL_ASSIGNMENT: Final[re.Pattern] = re.compile(
+            r'[A-Za-z_][A-Za-z0-9_]*=')
 
     def __init__(self):
         pass
@@ -92,6 +115,44 @@ class GenericTest(ABC):
                          cls.__name__, cls._preprocess(cmd),
                          cls._preprocess(res.stdout.decode(errors='ignore')))
 
+    def _execute(self, command: str, **kwargs) -> subprocess.CompletedProcess:
+        """
+        Run a test command to completion, accepting the keyword arguments of
+        subprocess.run(). Uses the asyncio engine if one is set, and a shell
+        otherwise or if the command needs one.
+        """
+        engine = self.get_engine()
+        if engine is not None and not GenericTest._needs_shell(command):
+            return engine.run(shlex.split(command), **kwargs)
+        return subprocess.run(args=command, check=False, shell=True, **kwargs)
+
+    @classmethod
+    def _needs_shell(cls, command: str) -> bool:
+        """
+        Check if a command needs a shell rather than being split into words:
+        if it expands variables, commands or globs, pipes or redirects, or
+        assigns variables. Errs on the side of the shell.
+
+        @return True if the command must be run by a shell,
+                False otherwise.
+        """
+        quote = None
+        for c in command:
+            if quote == "'":
+                if c == "'":
+                    quote = None
+            elif quote == '"':
+                if c == '"':
+                    quote = None
+                elif c in cls.SHELL_QUOTED_CHARS:
+                    return True
+            elif c in '\'"':
+                quote = c
+            elif c in cls.SHELL_CHARS:
+                return True
+        return quote is not None \
+                or cls.SHELL_ASSIGNMENT.match(command.lstrip()) is not None
+
     # --- PUBLIC ---
     def run(self) -> JUnitXML:
         """
@@ -105,6 +166,26 @@ class GenericTest(ABC):
         """
         pass
 
+    def get_label(self) -> str:
+        """
+        Name of the binary or runner executed by the test, identifying it
+        across runs.
+        """
+        return type(self).__name__
+
+    def get_cases(self) -> Optional[List[Tuple[str, str]]]:
+        """
+        The (suite, case) pairs run by the test, or None if the test runs
+        every case of its binary or runner.
+        """
+        return None
+
+    def get_engine(self) -> Optional[AsyncEngine]:
+        """
+        The engine running the commands of the test, if any.
+        """
+        return None
+
     @classmethod
     def log_support(cls) -> None:
         """
@@ -117,6 +198,9 @@ class TestMeta:
     __test__ = False
     not_run: Set[str]
     skipped: List[SkippedSuite]
+    options: dict
+    discovery_cache: Optional[DiscoveryCache] = None
+    engine: Optional[AsyncEngine] = None
 
     """
     Metadata for a set of test jobs.
@@ -125,10 +209,12 @@ class TestMeta:
     """
     def __init__(self, test_cls: type[GenericTest],
                  not_run: Set[str] = set(),
-                 skipped: List[SkippedSuite] = []):
+                 skipped: List[SkippedSuite] = [],
+                 options: Optional[dict] = None):
         self.test_cls = test_cls
         self.not_run = not_run
         self.skipped = skipped
+        self.options = options if options is not None else {}
 
     # --- PUBLIC ---
     def get_skipped(self) -> List[SkippedSuite]:
@@ -159,6 +245,24 @@ class TestMeta:
     def should_report_skipped_tests(self) -> bool:
         return self.test_cls.should_report_skipped_tests()
 
+    def get_option(self, key: str, default=None):
+        """
+        Returns a value from the framework's configuration section.
+        """
+        return self.options.get(key, default)
+
+    def get_discovery_cache(self) -> Optional[DiscoveryCache]:
+        return self.discovery_cache
+
+    def set_discovery_cache(self, cache: Optional[DiscoveryCache]) -> None:
+        self.discovery_cache = cache
+
+    def get_engine(self) -> Optional[AsyncEngine]:
+        return self.engine
+
+    def set_engine(self, engine: Optional[AsyncEngine]) -> None:
+        self.engine = engine
+
     # --- PRIVATE ---
     # Avoid iterating list when possible
     @cache
@@ -168,9 +272,118 @@ class TestMeta:
                 return suite_iter
         return None
 
+class JobSlots:
+    """
+    Token pool governing how many test processes run at the same time.
+
+    Every runner takes a slot before starting a process and returns it when
+    the process exits, so that the total never exceeds the configured number
+    of jobs, even when several jobsets run at once.
+
+    When joined to a make jobserver, every slot beyond the first also holds a
+    jobserver token, so that the jobs are shared with the rest of the build.
+    """
+    num_jobs: int
+    jobserver: Optional[Jobserver]
+
+    def __init__(self, num_jobs: int, jobserver: Optional[Jobserver] = None):
+        self.num_jobs = max(num_jobs, 1)
+        self.jobserver = jobserver
+        self._available = self.num_jobs
+        self._cond = threading.Condition()
+        # Slots are backed by the implicit token of this process, or by a
+        # token taken from the jobserver.
+        self._implicit_taken = False
+        self._tokens: List[bytes] = []
+
+    # --- PUBLIC ---
+    def acquire(self) -> None:
+        """
+        Take a slot, blocking until one is available.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._available > 0)
+            self._available -= 1
+            if self.jobserver is None or not self._implicit_taken:
+                self._implicit_taken = True
+                return
+
+        # Wait for the jobserver without holding up other slots.
+        try:
+            token = self.jobserver.acquire()
+        except BaseException:
+            with self._cond:
+                self._available += 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._tokens.append(token)
+
+    def try_acquire(self, count: int) -> int:
+        """
+        Take up to count slots without blocking.
+
+        @return the number of slots taken.
+        """
+        with self._cond:
+            taken = min(max(count, 0), self._available)
+            self._available -= taken
+            if self.jobserver is None:
+                return taken
+
+            backed = 0
+            if taken > 0 and not self._implicit_taken:
+                self._implicit_taken = True
+                backed += 1
+
+        # Reading a token may still block, if another client of an inherited
+        # blocking pipe takes it first, so other slots aren't held up
+        # meanwhile.
+        tokens = []
+        try:
+            while backed + len(tokens) < taken:
+                token = self.jobserver.try_acquire()
+                if token is None:
+                    break
+                tokens.append(token)
+        finally:
+            with self._cond:
+                self._tokens.extend(tokens)
+                # Give back the slots the jobserver had no tokens for.
+                unbacked = taken - backed - len(tokens)
+                self._available += unbacked
+                self._cond.notify(unbacked)
+        return backed + len(tokens)
+
+    def release(self, count: int = 1) -> None:
+        with self._cond:
+            for _ in range(count):
+                if len(self._tokens) != 0:
+                    self.jobserver.release(self._tokens.pop())
+                else:
+                    self._implicit_taken = False
+            self._available += count
+            self._cond.notify(count)
+
+    @contextmanager
+    def slot(self) -> Generator[None, None, None]:
+        """
+        Hold a single slot for the duration of the context.
+        """
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
 class TestJobset(ABC):
     meta: TestMeta
     tests: List[GenericTest]
+    history: Optional[TimingHistory] = None
+    job_slots: Optional[JobSlots] = None
+    report_sink: Optional[JUnitXMLStream] = None
+    event_sink: Optional[EventSink] = None
+    checkpoint: Optional[Checkpoint] = None
 
     def __init__(self, meta: TestMeta, tests: List[GenericTest] = []):
         self.meta = meta
@@ -180,44 +393,327 @@ class TestJobset(ABC):
     def run(self, num_jobs) -> JUnitXML:
         raise NotImplementedError('run() not implemented!')
 
+    def set_history(self, history: Optional[TimingHistory]) -> None:
+        """
+        Record the durations of the tests in history.
+        """
+        self.history = history
+
+    def set_job_slots(self, job_slots: Optional[JobSlots]) -> None:
+        """
+        Take the slots of running tests from a pool shared with other
+        jobsets. By default, each run has a pool of its own.
+        """
+        self.job_slots = job_slots
+
+    def set_engine(self, engine: Optional[AsyncEngine]) -> None:
+        """
+        Run the commands of the tests with an asyncio engine rather than a
+        shell.
+        """
+        self.meta.set_engine(engine)
+
+    def set_report_sink(self, report_sink: Optional[JUnitXMLStream]) -> None:
+        """
+        Write the reports of the tests to report_sink as they finish. run()
+        then only returns an empty report.
+        """
+        self.report_sink = report_sink
+
+    def set_event_sink(self, event_sink: Optional[EventSink]) -> None:
+        """
+        Write an event to event_sink when each test starts and finishes.
+        """
+        self.event_sink = event_sink
+
+    def set_checkpoint(self, checkpoint: Optional[Checkpoint]) -> None:
+        """
+        Record the report of each test in checkpoint as it finishes, and skip
+        the tests it holds from a run being resumed.
+        """
+        self.checkpoint = checkpoint
+
+    # --- PRIVATE ---
+    def _get_job_slots(self, num_jobs: int) -> JobSlots:
+        if self.job_slots is not None:
+            return self.job_slots
+        return JobSlots(num_jobs)
+
+    def _run_with_events(self, test: GenericTest) -> JUnitXML:
+        """
+        Run a test, writing its events as it starts and finishes.
+        """
+        if self.event_sink is None:
+            return test.run()
+
+        self.event_sink.start(test)
+        started = time.monotonic()
+        report = None
+        try:
+            report = test.run()
+        finally:
+            self.event_sink.finish(test, report, time.monotonic() - started)
+        return report
+
+    def _collect(self, combined_xml: JUnitXML, test: GenericTest,
+                 report: JUnitXML) -> None:
+        """
+        Add the report of a finished test to the combined report.
+        """
+        self._record(test, report)
+        self._emit(combined_xml, report)
+
+    def _record(self, test: GenericTest, report: JUnitXML) -> None:
+        if self.history is not None:
+            self.history.record(report, test.get_label())
+        if self.checkpoint is not None:
+            self.checkpoint.add(test, report)
+
+    def _filter_done(self, tests: Iterable[GenericTest]) -> List[GenericTest]:
+        """
+        @return the tests which didn't finish in the run being resumed.
+        """
+        if self.checkpoint is None:
+            return list(tests)
+        return [test for test in tests if not self.checkpoint.is_done(test)]
+
+    def _emit(self, combined_xml: JUnitXML, report: JUnitXML) -> None:
+        """
+        Write a report to the sink, or add it to the combined report.
+        """
+        if self.report_sink is not None:
+            self.report_sink.add(report)
+        else:
+            # The report has been recorded, and is no longer needed.
+            combined_xml.move_from(report)
+
 class BinaryTestJobset(TestJobset):
-    def __init__(self, meta: TestMeta, tests: List[BinaryTest] = []):
+    # Reports of finished tests held while earlier tests are still running,
+    # beyond which they are kept on disk instead.
+    MAX_BUFFERED: Final[int] = 64
+
+    sources: List[Callable[[], Iterable[BinaryTest]]]
+    # Predicted and actual time to run the tests when they are scheduled.
+    predicted_makespan: Optional[float] = None
+    actual_makespan: Optional[float] = None
+    # Slots held by the listings and tests of the current run.
+    _slots: Optional[JobSlots] = None
+    # When the scheduled tests started to be submitted.
+    _started: Optional[float] = None
+
+    def __init__(self, meta: TestMeta, tests: List[BinaryTest] = [],
+                 sources: Optional[List[Callable[[], Iterable[BinaryTest]]]] = None):
+        """
+        @param tests: Tests to run.
+        @param sources: Callables which discover further tests to run, usually
+                        one per binary. They are called from the job pool.
+        """
         super().__init__(meta, tests)
+        self.sources = sources if sources is not None else []
 
     def run(self, num_jobs) -> JUnitXML:
         combined_xml = JUnitXML.make_from_passed([])
+        self._slots = self._get_job_slots(num_jobs)
 
         if num_jobs > 1:
+            # Reports of finished tests, as (index of the test, report,
+            # exception), in the order they finish.
+            done = queue.SimpleQueue()
+            tests: List[BinaryTest] = []
             with ThreadPool(processes=num_jobs) as pool:
-                results = []
-                for test in self.tests:
-                    results.append(pool.apply_async(test.run))
-
-                # Block until all threads terminate...
-                for result in results:
-                    combined_xml += result.get()
+                if self._should_schedule():
+                    submit = partial(self._submit_longest_first, pool,
+                                     num_jobs, done, tests)
+                else:
+                    submit = partial(self._submit_pipelined, pool,
+                                     num_jobs, done, tests)
+                # Tests finish while others are still being discovered, so
+                # they are collected while they are submitted.
+                threading.Thread(target=self._submit_all,
+                                 args=(submit, done),
+                                 daemon=True).start()
+
+                self._collect_in_order(combined_xml, tests, done)
+
+                if self.predicted_makespan is not None:
+                    self.actual_makespan = time.monotonic() - self._started
+                    logging.info('%s jobs finished in %.1fs, predicted '
+                                 '%.1fs.', self.meta.test_cls.__name__,
+                                 self.actual_makespan,
+                                 self.predicted_makespan)
         else:
-            for test in self.tests:
-                combined_xml += test.run()
+            for test in self._filter_done(self.tests):
+                self._collect(combined_xml, test, self._run_test(test))
+            for source in self.sources:
+                for test in self._discover(source):
+                    self._collect(combined_xml, test, self._run_test(test))
 
         if self.meta.should_report_skipped_tests():
-            combined_xml += JUnitXML.make_from_skipped(self.meta.get_skipped())
+            self._emit(combined_xml,
+                       JUnitXML.make_from_skipped(self.meta.get_skipped()))
 
         return combined_xml
 
+    # --- PRIVATE ---
+    def _discover(self, source: Callable[[], Iterable[BinaryTest]]) -> List[
+            BinaryTest]:
+        # Listing a binary runs it, so it needs a slot like any test.
+        with self._slots.slot():
+            return self._filter_done(source())
+
+    def _run_test(self, test: BinaryTest) -> JUnitXML:
+        with self._slots.slot():
+            return self._run_with_events(test)
+
+    def _submit(self, pool: ThreadPool, done: queue.SimpleQueue, index: int,
+                test: BinaryTest) -> None:
+        pool.apply_async(self._run_test, (test,),
+                         callback=lambda report: done.put((index, report,
+                                                           None)),
+                         error_callback=lambda e: done.put((index, None, e)))
+
+    def _submit_all(self, submit: Callable[[], None],
+                    done: queue.SimpleQueue) -> None:
+        """
+        Queue every test, then mark the end of the tests with an index of
+        None.
+        """
+        try:
+            submit()
+            done.put((None, None, None))
+        except Exception as e:
+            done.put((None, None, e))
+
+    def _collect_in_order(self, combined_xml: JUnitXML,
+                          tests: List[BinaryTest],
+                          done: queue.SimpleQueue) -> None:
+        """
+        Collect the reports of the tests as they finish. Durations are
+        recorded straight away, but reports are added in the order of tests,
+        as soon as every earlier test has finished, so that the combined
+        report doesn't depend on which tests finished first.
+
+        Reports waiting on earlier tests are written to disk past
+        max_buffered of them.
+        """
+        max_buffered = int(self.meta.get_option('max_buffered',
+                                                self.MAX_BUFFERED))
+        # Reports waiting on earlier tests, or the files they were written
+        # to, by index of their test.
+        pending: Dict[int, Union[JUnitXML, Path]] = {}
+        num_buffered = 0
+        next_index = 0
+        submitted = False
+        with tempfile.TemporaryDirectory() as spill_dir:
+            while not submitted or next_index < len(tests):
+                index, report, e = done.get()
+                if e is not None:
+                    raise e
+                if index is None:
+                    submitted = True
+                    continue
+                self._record(tests[index], report)
+
+                if index != next_index and num_buffered >= max_buffered:
+                    path = Path(spill_dir).joinpath(f'{index}.xml')
+                    report.write(path)
+                    pending[index] = path
+                else:
+                    pending[index] = report
+                    num_buffered += 1
+
+                while next_index in pending:
+                    report = pending.pop(next_index)
+                    if isinstance(report, Path):
+                        path = report
+                        report = JUnitXML(file=path)
+                        path.unlink()
+                    else:
+                        num_buffered -= 1
+                    self._emit(combined_xml, report)
+                    next_index += 1
+
+    def _should_schedule(self) -> bool:
+        """
+        Ordering the tests means waiting for every binary to be listed before
+        any test runs. It is only worth it if there are durations to order
+        them by, otherwise tests are run as they are listed.
+        """
+        return self.history is not None \
+                and self.meta.get_option('schedule', 'lpt') == 'lpt' \
+                and not self.history.is_empty()
+
+    def _submit_pipelined(self, pool: ThreadPool, num_jobs: int,
+                          done: queue.SimpleQueue,
+                          tests: List[BinaryTest]) -> None:
+        """
+        Queue tests in discovery order.
+
+        @param tests: Filled with the tests, in discovery order.
+        """
+        for test in self._filter_done(self.tests):
+            tests.append(test)
+            self._submit(pool, done, len(tests) - 1, test)
+
+        # List up to num_jobs binaries ahead. The tests of a binary are queued
+        # as soon as it has been listed, and only then is the next binary
+        # queued for listing, so tests start running while later binaries are
+        # still being listed without the listings crowding them out.
+        sources = iter(self.sources)
+        discoveries = deque(pool.apply_async(self._discover, (source,))
+                            for source in islice(sources, num_jobs))
+        while len(discoveries) != 0:
+            for test in discoveries.popleft().get():
+                tests.append(test)
+                self._submit(pool, done, len(tests) - 1, test)
+            source = next(sources, None)
+            if source is not None:
+                discoveries.append(pool.apply_async(self._discover,
+                                                    (source,)))
+
+    def _submit_longest_first(self, pool: ThreadPool, num_jobs: int,
+                              done: queue.SimpleQueue,
+                              tests: List[BinaryTest]) -> None:
+        """
+        Queue tests longest-expected-first. Every binary must be listed before
+        the tests can be ordered, so the listings are only run concurrently.
+
+        @param tests: Filled with the tests, in discovery order.
+        """
+        tests.extend(self._filter_done(self.tests))
+        for discovered in pool.map(self._discover, self.sources, chunksize=1):
+            tests.extend(discovered)
+
+        order, self.predicted_makespan = schedule_longest_first(
+                tests, self.history, num_jobs)
+        self._started = time.monotonic()
+
+        for i in order:
+            self._submit(pool, done, i, tests[i])
+
 class ProjectTestJobset(TestJobset):
     def __init__(self, meta: TestMeta, tests: List[ProjectTest] = []):
         super().__init__(meta, tests)
 
     def run(self, num_jobs) -> JUnitXML:
         combined_xml = JUnitXML.make_from_passed([])
-
-        for test in self.tests:
-            test.set_num_jobs(num_jobs)
-            combined_xml += test.run()
+        slots = self._get_job_slots(num_jobs)
+
+        for test in self._filter_done(self.tests):
+            # Project runners parallelize internally. Give them whatever
+            # share of the jobs isn't in use, but at least one job.
+            slots.acquire()
+            extra = slots.try_acquire(num_jobs - 1)
+            try:
+                test.set_num_jobs(1 + extra)
+                self._collect(combined_xml, test,
+                              self._run_with_events(test))
+            finally:
+                slots.release(1 + extra)
 
         if self.meta.should_report_skipped_tests():
-            combined_xml += JUnitXML.make_from_skipped(self.meta.get_skipped())
+            self._emit(combined_xml,
+                       JUnitXML.make_from_skipped(self.meta.get_skipped()))
 
         return combined_xml
 
@@ -272,6 +768,12 @@ class BinaryTest(GenericTest, TestGenerator, ABC):
         self.timeout = timeout
 
     # --- PUBLIC ---
+    def get_label(self) -> str:
+        return self.binary
+
+    def get_engine(self) -> Optional[AsyncEngine]:
+        return self.meta.get_engine()
+
     @classmethod
     def make_test_jobset(
             cls,
@@ -280,7 +782,7 @@ class BinaryTest(GenericTest, TestGenerator, ABC):
             ) -> Optional[TestJobset]:
         logging.debug('Generating binary test list for %s.',
                       cls.get_name_framework())
-        tests: List[GenericTest] = []
+        sources: List[Callable[[], Iterable[BinaryTest]]] = []
 
         framework_config = config.get(cls.get_name_framework(), None)
         if framework_config is not None:
@@ -290,7 +792,12 @@ class BinaryTest(GenericTest, TestGenerator, ABC):
             for path in framework_config.get('path', '').splitlines():
                 binaries.extend(p for p in glob.glob(path) if p not in binaries)
 
-            meta = TestMeta(cls)
+            meta = TestMeta(cls, options=framework_config)
+            if framework_config.get('discovery_cache', True) \
+                    and config.get('out_dir', None) is not None:
+                meta.set_discovery_cache(DiscoveryCache(
+                    Path(config['out_dir']).joinpath('.cache', 'discovery'),
+                    framework_config.get('discovery_hash', False)))
             for skip_iter in framework_config.get('skipped', []):
                 skip_obj: Skipped = Skipped.make_from_dict(skip_iter)
                 if skip_obj is not None:
@@ -317,10 +824,10 @@ class BinaryTest(GenericTest, TestGenerator, ABC):
                         binary_opts = opt_iter['opt']
                 opts = f'{common_opts} {binary_opts}'
 
-                tests.extend(cls._generate_test_list(binary, opts,
-                                                   meta,
-                                                   config.get('timeout', None)))
-            return BinaryTestJobset(meta, tests)
+                # Tests are listed lazily, when the jobset is run.
+                sources.append(partial(cls._generate_test_list, binary, opts,
+                                       meta, config.get('timeout', None)))
+            return BinaryTestJobset(meta, sources=sources)
         else:
             logging.debug('Could not find configuration for framework %s.',
                           cls.get_name_framework())
@@ -359,6 +866,12 @@ class ProjectTest(GenericTest, TestGenerator, ABC):
         self.num_jobs = 1
 
     # --- PUBLIC ---
+    def get_label(self) -> str:
+        return self.get_name_framework()
+
+    def get_engine(self) -> Optional[AsyncEngine]:
+        return self.meta.get_engine()
+
     @classmethod
     def make_test_jobset(
             cls,
@@ -374,7 +887,7 @@ class ProjectTest(GenericTest, TestGenerator, ABC):
             cls.log_support()
 
             path = framework_config.get('path', '')
-            meta = TestMeta(cls)
+            meta = TestMeta(cls, options=framework_config)
 
             skipped = framework_config.get('skipped', None)
             if skipped is not None:
@@ -0,0 +1,205 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Provides the XML implementation used for reports: lxml if it is installed,
+the standard library otherwise. Set CHECK_UTILS_XML_BACKEND to "stdlib" or
+"lxml" to choose one.
+
+Reports are written identically by both.
+"""
+
+import copy
+import os
+import re
+from typing import Final
+import xml.etree.ElementTree as _stdlib_ET
+from xml.sax.saxutils import escape
+
+from . import compression
+
+_lxml_ET = None
+if os.environ.get('CHECK_UTILS_XML_BACKEND', 'lxml') == 'lxml':
+    try:
+        from lxml import etree as _lxml_ET
+    except ImportError:
+        pass
+
+ET = _lxml_ET if _lxml_ET is not None else _stdlib_ET
+BACKEND: Final[str] = 'lxml' if _lxml_ET is not None else 'stdlib'
+
+# Start and end tags, and carriage returns, in the output of lxml.
+_LXML_MARKUP = re.compile(b'<[^>]*>|&#13;')
+
+# Characters which are not allowed in XML.
+_INVALID_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+# --- PUBLIC ---
+def iterparse(file, events=('end',)):
+    """
+    Parse a file incrementally, as ElementTree.iterparse() does. Compressed
+    files are decompressed as they are parsed.
+    """
+    if compression.detect_compression(file) is not None:
+        with compression.open_compressed(file, 'rb') as f:
+            yield from _iterparse(f, events)
+    else:
+        yield from _iterparse(file, events)
+
+def parse(file):
+    """
+    Parse a whole file, as ElementTree.parse() does. Compressed files are
+    decompressed as they are parsed.
+    """
+    if compression.detect_compression(file) is not None:
+        with compression.open_compressed(file, 'rb') as f:
+            return _parse(f)
+    return _parse(file)
+
+def fromstring(data: bytes):
+    """
+    Parse an element serialized by tostring().
+    """
+    if _lxml_ET is not None:
+        return _lxml_ET.fromstring(data, parser=_make_lxml_parser())
+    return _stdlib_ET.fromstring(data)
+
+def tostring(elem) -> bytes:
+    """
+    Serialize an element and its tail as the standard library does with
+    ElementTree.tostring(elem, encoding='us-ascii').
+    """
+    if _lxml_ET is None:
+        return _stdlib_ET.tostring(elem, encoding='us-ascii')
+
+    data = _to_stdlib(_lxml_ET.tostring(elem, encoding='us-ascii',
+                                        with_tail=False))
+    if elem.tail:
+        data += escape(elem.tail).encode('us-ascii', 'xmlcharrefreplace')
+    return data
+
+def write(tree, file) -> None:
+    """
+    Write a tree as the standard library does with ElementTree.write(file).
+    Files are compressed according to their extension. The tree is
+    serialized as it is written, so the document is never held in memory.
+    """
+    if hasattr(file, 'write'):
+        _write(tree, file)
+    else:
+        with compression.open_compressed(file, 'wb') as f:
+            _write(tree, f)
+
+def share(elem):
+    """
+    Returns an element which can be added to another parent while elem stays
+    where it is. The standard library allows an element to have several
+    parents, but lxml needs a copy.
+    """
+    if _lxml_ET is not None:
+        return copy.deepcopy(elem)
+    return elem
+
+def safe_text(s: str) -> str:
+    """
+    Returns s without the characters which are not allowed in XML. lxml
+    refuses them, and the standard library writes them as they are, which
+    makes a report that can't be read back.
+    """
+    return _INVALID_CHARS.sub('', s)
+
+# --- PRIVATE ---
+def _make_lxml_parser():
+    # Like the standard library, ignore comments and processing
+    # instructions, and never resolve entities.
+    return _lxml_ET.XMLParser(remove_comments=True,
+                              remove_pis=True,
+                              resolve_entities=False,
+                              huge_tree=True)
+
+def _to_stdlib(data: bytes) -> bytes:
+    """
+    Convert complete tags and text serialized by lxml to the output of the
+    standard library. They only differ in these, which are never written as
+    part of text or attributes otherwise.
+    """
+    return _LXML_MARKUP.sub(_markup_to_stdlib, data)
+
+def _markup_to_stdlib(match: re.Match) -> bytes:
+    markup = match.group()
+    if markup == b'&#13;':
+        # The standard library writes carriage returns in text as they are.
+        # Attributes are within tags, where both escape them.
+        return b'\r'
+    if markup.endswith(b'/>'):
+        markup = markup[:-2] + b' />'
+    return markup.replace(b'&#9;', b'&#09;')
+
+class _StdlibWriter:
+    """
+    File which converts what lxml writes to it to the output of the standard
+    library. Tags and character references split across writes are held
+    back until they are complete.
+    """
+    def __init__(self, f):
+        self._f = f
+        self._pending = b''
+
+    def write(self, data: bytes) -> None:
+        data = self._pending + data
+        end = len(data)
+        start_tag = data.rfind(b'<')
+        if start_tag > data.rfind(b'>'):
+            end = start_tag
+        reference = data.rfind(b'&', 0, end)
+        if reference >= 0 and data.find(b';', reference, end) < 0:
+            end = reference
+        self._pending = data[end:]
+        self._f.write(_to_stdlib(data[:end]))
+
+    def flush(self) -> None:
+        self._f.write(_to_stdlib(self._pending))
+        self._pending = b''
+
+def _write(tree, f) -> None:
+    root = tree.getroot()
+    if _lxml_ET is None:
+        _stdlib_ET.ElementTree(root).write(f)
+        return
+
+    writer = _StdlibWriter(f)
+    _lxml_ET.ElementTree(root).write(writer, encoding='us-ascii')
+    writer.flush()
+
+def _parse(source):
+    if _lxml_ET is not None:
+        return _lxml_ET.parse(source if hasattr(source, 'read')
+                              else os.fspath(source),
+                              parser=_make_lxml_parser())
+    return _stdlib_ET.parse(source)
+
+def _iterparse(source, events):
+    if _lxml_ET is not None:
+        # Like the standard library, ignore comments and processing
+        # instructions, and never resolve entities.
+        return _lxml_ET.iterparse(source if hasattr(source, 'read')
+                                  else os.fspath(source),
+                                  events=events,
+                                  remove_comments=True,
+                                  remove_pis=True,
+                                  resolve_entities=False,
+                                  huge_tree=True)
+    return _stdlib_ET.iterparse(source, events=events)
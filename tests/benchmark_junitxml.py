@@ -0,0 +1,76 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Compares the XML backends of JUnitXML on loading per-test reports, merging
+them and writing the combined report.
+
+Usage: python tests/benchmark_junitxml.py [NUM_REPORTS]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+def _generate(path: str, num_reports: int) -> None:
+    for i in range(num_reports):
+        with open(f'{path}/{i}.xml', 'w') as f:
+            f.write(f'<testsuites><testsuite name="Suite{i % 50}" tests="1">'
+                    f'<testcase name="case{i}" classname="Suite{i % 50}" '
+                    f'time="0.01"><system-out>{"output " * 100}'
+                    '</system-out></testcase></testsuite></testsuites>')
+
+def _run(path: str, num_reports: int) -> None:
+    from check_utils import JUnitXML, xmlbackend
+
+    start = time.perf_counter()
+    reports = [JUnitXML(file=f'{path}/{i}.xml') for i in range(num_reports)]
+    loaded = time.perf_counter()
+    combined = JUnitXML()
+    for report in reports:
+        combined += report
+    merged = time.perf_counter()
+    combined.write(f'{path}/{xmlbackend.BACKEND}.xml')
+    written = time.perf_counter()
+
+    print(f'{xmlbackend.BACKEND:8} load {loaded - start:7.3f}s  '
+          f'merge {merged - loaded:7.3f}s  write {written - merged:7.3f}s')
+
+def main():
+    if len(sys.argv) > 2:
+        _run(sys.argv[1], int(sys.argv[2]))
+        return
+
+    num_reports = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as path:
+        _generate(path, num_reports)
+        print(f'{num_reports} reports:')
+        for backend in ['stdlib', 'lxml']:
+            env = dict(os.environ)
+            env['CHECK_UTILS_XML_BACKEND'] = backend
+            subprocess.run([sys.executable, __file__, path, str(num_reports)],
+                           check=True, env=env)
+
+        with open(f'{path}/stdlib.xml', 'rb') as f:
+            stdlib = f.read()
+        if os.path.exists(f'{path}/lxml.xml'):
+            with open(f'{path}/lxml.xml', 'rb') as f:
+                print('Identical output:', stdlib == f.read())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for cache.py
+"""
+
+import os
+import pytest
+
+from check_utils import DiscoveryCache, GTest, TestMeta
+import common
+
+LISTING = [['Foo', 'Test1'], ['Bar', 'Test2']]
+
+@pytest.fixture()
+def binary(tmp_path):
+    path = tmp_path.joinpath('bin')
+    path.write_bytes(b'binary contents')
+    # Age the binary so that it isn't considered racy.
+    os.utime(path, (1000000000, 1000000000))
+    return str(path)
+
+@pytest.mark.parametrize('use_hash', [False, True])
+def test_get_put(tmp_path, binary, use_hash):
+    cache = DiscoveryCache(tmp_path.joinpath('cache'), use_hash)
+
+    assert cache.get('googletest', binary) is None
+
+    cache.put('googletest', binary, LISTING, os.stat(binary))
+
+    assert cache.get('googletest', binary) == LISTING
+    assert cache.get('catch2', binary) is None
+
+def test_get_invalidated_by_mtime(tmp_path, binary):
+    cache = DiscoveryCache(tmp_path.joinpath('cache'))
+    cache.put('googletest', binary, LISTING, os.stat(binary))
+
+    os.utime(binary, (2000000000, 2000000000))
+
+    assert cache.get('googletest', binary) is None
+
+@pytest.mark.parametrize('use_hash', [False, True])
+def test_get_invalidated_by_rebuild(tmp_path, binary, use_hash):
+    cache = DiscoveryCache(tmp_path.joinpath('cache'), use_hash)
+    cache.put('googletest', binary, LISTING, os.stat(binary))
+
+    # Rebuild with the same size and mtime.
+    with open(binary, 'wb') as f:
+        f.write(b'BINARY CONTENTS')
+    os.utime(binary, (1000000000, 1000000000))
+
+    assert (cache.get('googletest', binary) is None) == use_hash
+
+def test_put_racy(tmp_path, binary):
+    cache = DiscoveryCache(tmp_path.joinpath('cache'))
+    os.utime(binary)
+
+    cache.put('googletest', binary, LISTING, os.stat(binary))
+
+    assert cache.get('googletest', binary) is None
+
+def test_put_modified_while_listing(tmp_path, binary):
+    cache = DiscoveryCache(tmp_path.joinpath('cache'))
+    stat = os.stat(binary)
+    os.utime(binary, (2000000000, 2000000000))
+
+    cache.put('googletest', binary, LISTING, stat)
+
+    assert cache.get('googletest', binary) is None
+
+def test_get_corrupt(tmp_path, binary):
+    cache = DiscoveryCache(tmp_path.joinpath('cache'))
+    cache.put('googletest', binary, LISTING, os.stat(binary))
+    for entry in tmp_path.joinpath('cache').iterdir():
+        entry.write_text('{')
+
+    assert cache.get('googletest', binary) is None
+
+def test_gtest_list_tests_cached(mocker, tmp_path, binary):
+    getstatusoutput_mock = mocker.patch('subprocess.getstatusoutput')
+    getstatusoutput_mock.return_value = (0,
+                                         'Foo.\n'
+                                         ' Test1\n'
+                                         'Bar.\n'
+                                         ' Test2')
+
+    meta = TestMeta(GTest)
+    meta.set_discovery_cache(DiscoveryCache(tmp_path.joinpath('cache')))
+
+    first = [(gtest.suite, gtest.case)
+             for gtest in GTest._generate_test_list(binary, '', meta)]
+    second = [(gtest.suite, gtest.case)
+              for gtest in GTest._generate_test_list(binary, '', meta)]
+
+    assert first == second == [('Foo', 'Test1'), ('Bar', 'Test2')]
+    getstatusoutput_mock.assert_called_once()
@@ -0,0 +1,106 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for check.py
+"""
+
+import logging
+import threading
+import pytest
+
+from check_utils import BinaryTestJobset, CheckExit, Checkpoint, JUnitXML,\
+        TestMeta
+from check_utils.entry.check import Main
+import common
+from common import FakeTest
+
+@pytest.fixture()
+def main():
+    # Main configures the root logger.
+    level = logging.getLogger().level
+    yield Main(f'{common.TEST_DIR}/data/test.toml',
+               f'{common.TEST_DIR}/data/test.toml', 1, False)
+    logging.getLogger().setLevel(level)
+
+def test__run_concurrently(main):
+    meta = TestMeta(FakeTest)
+    started = threading.Event()
+
+    class WaitingTest(FakeTest):
+        def _run_fake(self):
+            # Only finishes once the other framework has started.
+            assert started.wait(timeout=10)
+            return super()._run_fake()
+
+        _run_impl = _run_fake
+
+    jobsets = [
+        BinaryTestJobset(meta, [WaitingTest('bin1', 'case1', meta)]),
+        BinaryTestJobset(meta, [FakeTest('bin2', 'case1', meta, started)]),
+        ]
+
+    reports = main._run_concurrently(jobsets, 2)
+
+    assert [[case.get('classname')
+             for case in report.tree.getroot().iter('testcase')]
+            for report in reports] == [['bin1'], ['bin2']]
+
+@pytest.mark.parametrize('stream_report', [False, True])
+def test_main_does_not_read_report(main, mocker, tmp_path, caplog,
+                                   stream_report):
+    main.config_obj['out_dir'] = str(tmp_path)
+    main.config_obj['stream_report'] = stream_report
+    meta = TestMeta(FakeTest)
+    mocker.patch.object(main, '_generate_test_jobsets', return_value=[
+        BinaryTestJobset(meta, [FakeTest('bin1', 'case1', meta),
+                                FakeTest('bin2', 'case1', meta)])])
+    parse_mock = mocker.spy(JUnitXML, '_parse')
+
+    with caplog.at_level(logging.INFO):
+        assert main.main() == CheckExit.EXIT_SUCCESS
+
+    # The exit code and summary come from the counts kept in memory.
+    assert parse_mock.call_count == 0
+    assert '2 tests, 0 failures, 0 errors, 0 skipped' in caplog.text
+    assert JUnitXML(file=tmp_path.joinpath('foo.xml')).get_totals()['tests'] \
+            == 2
+    assert main.is_success()
+    assert main.is_success(str(tmp_path.joinpath('foo.xml')))
+
+def test_is_success_reads_report(main, tmp_path):
+    main.config_obj['out_dir'] = str(tmp_path)
+    meta = TestMeta(FakeTest)
+    report = BinaryTestJobset(meta, [FakeTest('bin1', 'case1', meta)]).run(1)
+    report.write(str(tmp_path.joinpath('foo.xml')))
+
+    # Nothing ran in this process, so the report of the package is read.
+    assert main.totals is None
+    assert main.is_success()
+
+@pytest.mark.parametrize('checkpoint', [False, True])
+def test_checkpoint_opt_in(main, mocker, tmp_path, checkpoint):
+    main.config_obj['out_dir'] = str(tmp_path)
+    if checkpoint:
+        main.config_obj['checkpoint'] = True
+    meta = TestMeta(FakeTest)
+    mocker.patch.object(main, '_generate_test_jobsets', return_value=[
+        BinaryTestJobset(meta, [FakeTest('bin1', 'case1', meta)])])
+    add_mock = mocker.spy(Checkpoint, 'add')
+
+    assert main.main() == CheckExit.EXIT_SUCCESS
+
+    assert add_mock.call_count == (1 if checkpoint else 0)
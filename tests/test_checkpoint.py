@@ -0,0 +1,125 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for checkpoint.py
+"""
+
+import logging
+import pytest
+
+from check_utils import BinaryTestJobset, CheckExit, Checkpoint, JUnitXML,\
+        TestMeta
+from check_utils.entry.check import Main
+import common
+from common import FakeTest
+
+def _case_names(report: JUnitXML):
+    return [(case.get('classname'), case.get('name'))
+            for case in report.tree.getroot().iter('testcase')]
+
+class CountingTest(FakeTest):
+    runs = []
+
+    def _run_counting(self):
+        CountingTest.runs.append((self.binary, self.case))
+        return super()._run_fake()
+
+    _run_impl = _run_counting
+
+@pytest.fixture(autouse=True)
+def runs():
+    CountingTest.runs = []
+    yield CountingTest.runs
+
+def test_resume(tmp_path):
+    path = tmp_path.joinpath('checkpoint.ndjson')
+    meta = TestMeta(FakeTest)
+    checkpoint = Checkpoint(path)
+    checkpoint.add(FakeTest('bin1', 'case1', meta),
+                   FakeTest('bin1', 'case1', meta).run())
+    checkpoint.close()
+    # Interrupted while writing a line.
+    with open(path, 'ab') as f:
+        f.write(b'{"key": ["fake", "bin2"')
+
+    checkpoint = Checkpoint(path, resume=True)
+
+    assert checkpoint.get_num_done() == 1
+    assert checkpoint.is_done(FakeTest('bin1', 'case1', meta))
+    assert not checkpoint.is_done(FakeTest('bin2', 'case1', meta))
+    checkpoint.add(FakeTest('bin2', 'case1', meta),
+                   FakeTest('bin2', 'case1', meta).run())
+    # Only the tests of the interrupted run.
+    assert [_case_names(report) for report in checkpoint.get_reports()] \
+            == [[('bin1', 'case1')]]
+    checkpoint.close()
+
+    assert Checkpoint(path, resume=True).get_num_done() == 2
+    assert Checkpoint(path).get_num_done() == 0
+
+@pytest.mark.parametrize('num_jobs', [1, 2])
+def test_jobset_skips_done(tmp_path, runs, num_jobs):
+    path = tmp_path.joinpath('checkpoint.ndjson')
+    meta = TestMeta(FakeTest)
+    checkpoint = Checkpoint(path)
+    jobset = BinaryTestJobset(meta, [CountingTest('bin1', 'case1', meta)])
+    jobset.set_checkpoint(checkpoint)
+    jobset.run(num_jobs)
+    checkpoint.close()
+
+    checkpoint = Checkpoint(path, resume=True)
+    jobset = BinaryTestJobset(meta, [CountingTest('bin1', 'case1', meta)],
+                              sources=[lambda: [
+                                  CountingTest('bin1', 'case1', meta),
+                                  CountingTest('bin2', 'case1', meta)]])
+    jobset.set_checkpoint(checkpoint)
+
+    assert _case_names(jobset.run(num_jobs)) == [('bin2', 'case1')]
+    assert runs == [('bin1', 'case1'), ('bin2', 'case1')]
+
+def test_main_resume(tmp_path, mocker, runs):
+    level = logging.getLogger().level
+    meta = TestMeta(FakeTest)
+
+    class InterruptedTest(FakeTest):
+        def _run_interrupted(self):
+            raise KeyboardInterrupt()
+
+        _run_impl = _run_interrupted
+
+    def make_main(tests, resume):
+        main = Main(f'{common.TEST_DIR}/data/test.toml',
+                    f'{common.TEST_DIR}/data/test.toml', 1, False, resume)
+        main.config_obj['out_dir'] = str(tmp_path)
+        main.config_obj['checkpoint'] = True
+        mocker.patch.object(main, '_generate_test_jobsets', return_value=[
+            BinaryTestJobset(meta, tests)])
+        return main
+
+    with pytest.raises(KeyboardInterrupt):
+        make_main([CountingTest('bin1', 'case1', meta),
+                   InterruptedTest('bin2', 'case1', meta)], False).main()
+    assert make_main([CountingTest('bin1', 'case1', meta),
+                      CountingTest('bin2', 'case1', meta)],
+                     True).main() == CheckExit.EXIT_SUCCESS
+    logging.getLogger().setLevel(level)
+
+    assert runs == [('bin1', 'case1'), ('bin2', 'case1')]
+    assert _case_names(JUnitXML(file=tmp_path.joinpath('foo.xml'))) \
+            == [('bin1', 'case1'), ('bin2', 'case1')]
+    # Nothing is left to resume.
+    assert not tmp_path.joinpath('.cache', 'checkpoint.ndjson').exists()
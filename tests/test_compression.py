@@ -0,0 +1,144 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for compression.py
+"""
+
+import copy
+import gzip
+import os
+import pytest
+import subprocess
+
+from check_utils import CaseStatus, IllegalArgumentError, JUnitXML,\
+        JUnitXMLStream, PassedCase, PassedSuite, ResultStore,\
+        get_compression, open_compressed, with_compression
+from check_utils.compression import detect_compression
+import common
+
+def _compressions():
+    compressions = ['none', 'gzip']
+    try:
+        import zstandard
+        compressions.append('zstd')
+    except ImportError:
+        pass
+    return compressions
+
+def _report() -> JUnitXML:
+    return JUnitXML.make_from_passed([
+        PassedSuite('A', '', '2025-01-01T00:00:00', [
+            PassedCase('a1', '', '1', '0')])])
+
+def test_with_compression():
+    assert with_compression('foo.xml', None) == 'foo.xml'
+    assert with_compression('foo.xml', 'none') == 'foo.xml'
+    assert with_compression('foo.xml', 'gzip') == 'foo.xml.gz'
+    assert with_compression('foo.txt', 'zstd') == 'foo.txt.zst'
+    assert get_compression('foo.txt.zst') == 'zstd'
+    assert get_compression('foo.xml') is None
+    with pytest.raises(IllegalArgumentError):
+        with_compression('foo.xml', 'bz2')
+
+@pytest.mark.parametrize('compression', _compressions())
+def test_open_compressed(tmp_path, compression):
+    path = tmp_path.joinpath(with_compression('foo.txt', compression))
+    with open_compressed(path, 'wt') as f:
+        f.write('line\n' * 1000)
+
+    with open_compressed(path, 'rt') as f:
+        assert f.read() == 'line\n' * 1000
+    if compression != 'none':
+        assert path.stat().st_size < 1000
+
+@pytest.mark.parametrize('compression', _compressions())
+def test_report_round_trip(tmp_path, compression):
+    plain = tmp_path.joinpath('plain.xml')
+    _report().write(plain)
+
+    written = tmp_path.joinpath(with_compression('written.xml', compression))
+    _report().write(written)
+    streamed = tmp_path.joinpath(with_compression('streamed.xml',
+                                                  compression))
+    stream = JUnitXMLStream(streamed)
+    stream.add(_report())
+    stream.close()
+    store = ResultStore()
+    store.add(CaseStatus.PASSED, 'A', 'a1')
+    stored = tmp_path.joinpath(with_compression('stored.xml', compression))
+    store.write(stored)
+
+    with open_compressed(written, 'rb') as f:
+        assert f.read() == plain.read_bytes()
+    assert not tmp_path.joinpath(streamed.name + '.part').exists()
+    for path in [written, streamed, stored]:
+        report = JUnitXML(file=path)
+        assert report.get_totals()['tests'] == 1
+    assert [suite.get('name')
+            for suite in JUnitXML.iter_suites(streamed)] == ['A']
+
+@pytest.mark.parametrize('compression', _compressions()[1:])
+def test_stream_compressed(tmp_path, compression):
+    plain = tmp_path.joinpath('plain.xml')
+    streamed = tmp_path.joinpath(with_compression('streamed.xml',
+                                                  compression))
+    plain_stream = JUnitXMLStream(plain)
+    stream = JUnitXMLStream(streamed)
+    for _ in range(1000):
+        plain_stream.add(_report())
+        stream.add(_report())
+    plain_stream.close()
+
+    # Never written uncompressed.
+    part = tmp_path.joinpath(streamed.name + '.part')
+    stream._f.flush()
+    assert detect_compression(part) == compression
+    assert part.stat().st_size < plain.stat().st_size // 10
+    stream.close()
+
+    with open_compressed(streamed, 'rb') as f:
+        assert f.read() == plain.read_bytes()
+    assert not part.exists()
+
+def test_load_detects_compression(tmp_path):
+    # Loading goes by contents rather than by extension.
+    path = tmp_path.joinpath('foo.xml')
+    with gzip.open(path, 'wb') as f:
+        f.write(b'<testsuites><testsuite name="A"><testcase name="a1" />'
+                b'</testsuite></testsuites>')
+
+    assert JUnitXML(file=path).get_totals()['tests'] == 1
+
+def test_parse_tap_compressed(tmp_path):
+    with open(f'{common.TEST_DIR}/data/test.toml') as f:
+        config = f.read()
+    tmp_path.joinpath('test.toml').write_text(config
+                                              + 'compression = "gzip"\n')
+    env = copy.copy(os.environ)
+    env['START_DIR'] = str(tmp_path)
+
+    subprocess.run([f'cat {common.TEST_DIR}/data/tap_pass_001.txt | parse_tap.sh'],
+                   check=True,
+                   shell=True,
+                   env=env)
+
+    with open(f'{common.TEST_DIR}/data/tap_pass_001.txt') as f:
+        with open_compressed(tmp_path.joinpath('test-out', 'foo.txt.gz'),
+                             'rt') as out:
+            assert out.read() == f.read()
+    assert JUnitXML(file=tmp_path.joinpath('test-out',
+                                           'foo.xml.gz')).is_success()
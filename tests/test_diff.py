@@ -0,0 +1,125 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for diff.py
+"""
+
+import pytest
+import sys
+
+from check_utils import CaseStatus, CheckExit, ReportDiff, ResultStore
+from check_utils.entry import diff
+import common
+
+def _store(cases) -> ResultStore:
+    store = ResultStore()
+    for status, suite, name, time in cases:
+        store.add(status, suite, name, time=time,
+                  message='' if status != CaseStatus.PASSED else None)
+    return store
+
+OLD = [
+    (CaseStatus.PASSED, 'A', 'fails', 1.0),
+    (CaseStatus.FAILED, 'A', 'passes', 1.0),
+    (CaseStatus.PASSED, 'A', 'errors', 1.0),
+    (CaseStatus.PASSED, 'B', 'skips', 1.0),
+    (CaseStatus.PASSED, 'B', 'slower', 1.0),
+    (CaseStatus.PASSED, 'B', 'faster', 5.0),
+    (CaseStatus.PASSED, 'B', 'gone', 1.0),
+    ]
+NEW = [
+    (CaseStatus.FAILED, 'A', 'fails', 1.0),
+    (CaseStatus.PASSED, 'A', 'passes', 1.5),
+    (CaseStatus.ERRORED, 'A', 'errors', 1.0),
+    (CaseStatus.SKIPPED, 'B', 'skips', None),
+    (CaseStatus.PASSED, 'B', 'slower', 4.0),
+    (CaseStatus.PASSED, 'B', 'faster', 1.0),
+    (CaseStatus.PASSED, 'C', 'new', 1.0),
+    ]
+
+def _check(report_diff: ReportDiff):
+    assert report_diff.get_newly(CaseStatus.FAILED) == [('A', 'fails')]
+    assert report_diff.get_newly(CaseStatus.PASSED) == [('A', 'passes')]
+    assert report_diff.get_newly(CaseStatus.ERRORED) == [('A', 'errors')]
+    assert report_diff.get_newly(CaseStatus.SKIPPED) == [('B', 'skips')]
+    assert report_diff.appeared == [('C', 'new')]
+    assert report_diff.disappeared == [('B', 'gone')]
+    assert report_diff.durations == [(('B', 'faster'), 5.0, 1.0),
+                                     (('B', 'slower'), 1.0, 4.0)]
+    assert report_diff.is_regression()
+
+def test_make_from_reports():
+    _check(ReportDiff.make_from_reports(_store(OLD).to_junitxml(),
+                                        _store(NEW).to_junitxml(),
+                                        num_durations=2))
+
+def test_make_from_files(tmp_path):
+    _store(OLD).write(tmp_path.joinpath('old.xml'))
+    _store(NEW).write(tmp_path.joinpath('new.xml.gz'))
+
+    _check(ReportDiff.make_from_files(tmp_path.joinpath('old.xml'),
+                                      tmp_path.joinpath('new.xml.gz'),
+                                      num_durations=2))
+
+def test_no_regression(tmp_path):
+    _store(OLD).write(tmp_path.joinpath('old.xml'))
+
+    report_diff = ReportDiff.make_from_files(tmp_path.joinpath('old.xml'),
+                                             tmp_path.joinpath('old.xml'))
+
+    assert not report_diff.is_regression()
+    assert report_diff.appeared == []
+    assert report_diff.disappeared == []
+
+def test_main(tmp_path, monkeypatch, capsys):
+    _store(OLD).write(tmp_path.joinpath('old.xml'))
+    _store(NEW).write(tmp_path.joinpath('new.xml'))
+    monkeypatch.setattr(sys, 'argv', ['cudiff',
+                                      str(tmp_path.joinpath('old.xml')),
+                                      str(tmp_path.joinpath('new.xml'))])
+
+    with pytest.raises(SystemExit) as e:
+        diff.main()
+
+    assert e.value.code == CheckExit.EXIT_FAILURE
+    out = capsys.readouterr().out
+    assert 'Newly failing (1):\n  A.fails\n' in out
+    assert '-4.000s (5.000s -> 1.000s) B.faster' in out
+
+def test_no_durations():
+    report_diff = ReportDiff.make_from_reports(_store(OLD).to_junitxml(),
+                                               _store(NEW).to_junitxml(),
+                                               num_durations=0)
+
+    assert report_diff.durations == []
+
+def test_duplicate_cases():
+    old = [(CaseStatus.PASSED, 'A', 'dup', 1.0),
+           (CaseStatus.FAILED, 'A', 'dup', 1.0),
+           (CaseStatus.PASSED, 'B', 'dup', 1.0),
+           (CaseStatus.PASSED, 'B', 'dup', 1.0)]
+    new = [(CaseStatus.PASSED, 'A', 'dup', 1.0),
+           (CaseStatus.PASSED, 'A', 'dup', 1.0),
+           (CaseStatus.PASSED, 'A', 'dup', 1.0),
+           (CaseStatus.PASSED, 'B', 'dup', 1.0)]
+
+    report_diff = ReportDiff.make_from_reports(_store(old).to_junitxml(),
+                                               _store(new).to_junitxml())
+
+    assert report_diff.get_newly(CaseStatus.PASSED) == [('A', 'dup')]
+    assert report_diff.appeared == [('A', 'dup')]
+    assert report_diff.disappeared == [('B', 'dup')]
@@ -0,0 +1,113 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for engine.py
+"""
+
+from multiprocessing.pool import ThreadPool
+import subprocess
+import time
+import pytest
+
+from check_utils import AsyncEngine, GenericTest, TestMeta
+import common
+from common import FakeTest
+
+@pytest.fixture
+def engine():
+    engine = AsyncEngine()
+    yield engine
+    engine.close()
+
+def test_run_capture(engine):
+    res = engine.run(['sh', '-c', 'echo out; echo err >&2; exit 3'],
+                     capture_output=True)
+    assert res.returncode == 3
+    assert res.stdout == b'out\n'
+    assert res.stderr == b'err\n'
+
+def test_run_no_capture(engine):
+    res = engine.run(['true'])
+    assert res.returncode == 0
+    assert res.stdout is None
+    assert res.stderr is None
+
+def test_run_env_cwd(engine, tmp_path):
+    res = engine.run(['sh', '-c', 'echo $FOO; pwd'], capture_output=True,
+                     env={'FOO': 'bar'}, cwd=str(tmp_path))
+    assert res.stdout.decode().splitlines() == ['bar', str(tmp_path)]
+
+def test_run_timeout(engine):
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        engine.run(['sleep', '10'], timeout=0.2)
+    assert time.monotonic() - start < 5
+
+def test_run_concurrently(engine):
+    # Every process is supervised by the same event loop.
+    start = time.monotonic()
+    with ThreadPool(processes=16) as pool:
+        results = pool.map(lambda i: engine.run(['sh', '-c',
+                                                 f'sleep 0.5; echo {i}'],
+                                                capture_output=True),
+                           range(16))
+    assert time.monotonic() - start < 5
+    assert [res.stdout for res in results] == [f'{i}\n'.encode()
+                                               for i in range(16)]
+
+def test_execute(mocker, engine):
+    meta = TestMeta(FakeTest)
+    test = FakeTest('foo', 'bar', meta)
+
+    run_mock = mocker.patch('subprocess.run')
+    run_mock.return_value = subprocess.CompletedProcess([], 0, b'', b'')
+    test._execute('echo "a  b"', capture_output=True, timeout=None)
+    run_mock.assert_called_once_with(args='echo "a  b"', capture_output=True,
+                                     timeout=None, check=False, shell=True)
+    run_mock.reset_mock()
+
+    meta.set_engine(engine)
+    res = test._execute('echo "a  b"', capture_output=True, timeout=None)
+    run_mock.assert_not_called()
+    assert res.stdout == b'a  b\n'
+
+@pytest.mark.parametrize('command, needs_shell', [
+    ('./foo --gtest_filter="A.b" --gtest_output="xml:/tmp/x.xml"', False),
+    ("./foo --gtest_filter='A.*'", False),
+    ('./foo --gtest_filter=A.*', True),
+    ('./foo --out="$TMPDIR/x.xml"', True),
+    ('./foo > log', True),
+    ('./foo | tee log', True),
+    ("./foo 'a | b'", False),
+    ('ASAN_OPTIONS=x ./foo', True),
+    ('./foo --opt=x', False),
+    ('./foo "unterminated', True),
+    ])
+def test_needs_shell(command, needs_shell):
+    assert GenericTest._needs_shell(command) == needs_shell
+
+def test_execute_needs_shell(mocker, engine):
+    meta = TestMeta(FakeTest)
+    meta.set_engine(engine)
+    test = FakeTest('foo', 'bar', meta)
+    engine_mock = mocker.spy(engine, 'run')
+
+    res = test._execute('echo a | tr a b', capture_output=True,
+                        timeout=None)
+
+    engine_mock.assert_not_called()
+    assert res.stdout == b'b\n'
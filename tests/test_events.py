@@ -0,0 +1,177 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for events.py
+"""
+
+import json
+import os
+import socket
+import threading
+import pytest
+
+from check_utils import BinaryTestJobset, EventSink, FailedCase, FailedSuite,\
+        JUnitXML, TestMeta
+import common
+from common import FakeTest
+
+class FailingTest(FakeTest):
+    def _run_failing(self):
+        return JUnitXML.make_from_failed([
+            FailedSuite(self.binary, '', '', [
+                FailedCase(self.case, '', '0.0', '0', 'msg', 'type')])])
+
+    _run_impl = _run_failing
+
+class RaisingTest(FakeTest):
+    def _run_raising(self):
+        raise RuntimeError('crashed')
+
+    _run_impl = _run_raising
+
+def _read_events(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+def test_file(tmp_path):
+    path = tmp_path.joinpath('events.ndjson')
+    sink = EventSink(str(path))
+    meta = TestMeta(FakeTest)
+    jobset = BinaryTestJobset(meta, [FakeTest('bin1', 'case1', meta),
+                                     FailingTest('bin2', 'case1', meta)])
+    jobset.set_event_sink(sink)
+
+    jobset.run(1)
+    sink.close()
+
+    events = _read_events(path)
+    assert [(e['event'], e['binary']) for e in events] \
+            == [('start', 'bin1'), ('finish', 'bin1'),
+                ('start', 'bin2'), ('finish', 'bin2')]
+    assert events[1]['status'] == 'passed'
+    assert events[3]['status'] == 'failed'
+    assert events[3]['tests'] == 1
+    assert events[3]['failures'] == 1
+    assert events[3]['duration'] >= 0
+    assert events[3]['framework'] == 'fake'
+
+def test_completion_order(tmp_path):
+    path = tmp_path.joinpath('events.ndjson')
+    sink = EventSink(str(path))
+    meta = TestMeta(FakeTest)
+    finished = threading.Event()
+
+    class WaitingTest(FakeTest):
+        def _run_waiting(self):
+            # Only finishes once the other test has finished.
+            assert finished.wait(timeout=10)
+            return super()._run_fake()
+
+        _run_impl = _run_waiting
+
+    class SignallingTest(FakeTest):
+        def _run_signalling(self):
+            report = super()._run_fake()
+            threading.Timer(0.1, finished.set).start()
+            return report
+
+        _run_impl = _run_signalling
+
+    jobset = BinaryTestJobset(meta, [WaitingTest('bin1', 'case1', meta),
+                                     SignallingTest('bin2', 'case1', meta)])
+    jobset.set_event_sink(sink)
+
+    jobset.run(2)
+    sink.close()
+
+    assert [e['binary'] for e in _read_events(path)
+            if e['event'] == 'finish'] == ['bin2', 'bin1']
+
+def test_raising(tmp_path):
+    path = tmp_path.joinpath('events.ndjson')
+    sink = EventSink(str(path))
+    meta = TestMeta(FakeTest)
+    jobset = BinaryTestJobset(meta, [RaisingTest('bin1', 'case1', meta)])
+    jobset.set_event_sink(sink)
+
+    with pytest.raises(RuntimeError):
+        jobset.run(1)
+    sink.close()
+
+    assert _read_events(path)[-1]['status'] == 'errored'
+
+def test_fifo(tmp_path):
+    path = tmp_path.joinpath('events')
+    # No reader, no events, but the run goes on.
+    os.mkfifo(path)
+    sink = EventSink(str(path))
+    sink.start(FakeTest('bin1', 'case1', TestMeta(FakeTest)))
+    sink.close()
+
+    fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    sink = EventSink(str(path))
+    sink.start(FakeTest('bin1', 'case1', TestMeta(FakeTest)))
+    sink.close()
+    with os.fdopen(fd) as f:
+        lines = f.readlines()
+
+    assert [json.loads(line)['event'] for line in lines] == ['start']
+
+def test_fifo_stalled_reader(tmp_path, mocker):
+    path = tmp_path.joinpath('events')
+    os.mkfifo(path)
+    # A reader which never reads.
+    fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    mocker.patch.object(EventSink, 'MAX_PENDING', 4096)
+    sink = EventSink(str(path))
+    test = FakeTest('bin1', 'case1', TestMeta(FakeTest))
+
+    thread = threading.Thread(target=lambda: [sink.start(test)
+                                              for _ in range(2000)])
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive()
+    sink.close()
+
+    data = b''
+    try:
+        while chunk := os.read(fd, 1 << 16):
+            data += chunk
+    except BlockingIOError:
+        pass
+    os.close(fd)
+    # Events were dropped whole, and the last may be cut short by close().
+    lines = data.split(b'\n')[:-1]
+    assert all(json.loads(line)['event'] == 'start' for line in lines)
+    assert sink.num_dropped > 0
+    assert len(lines) + sink.num_dropped == 2000
+
+def test_socket(tmp_path):
+    path = str(tmp_path.joinpath('events.sock'))
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+
+    sink = EventSink(path)
+    conn, _ = server.accept()
+    sink.start(FakeTest('bin1', 'case1', TestMeta(FakeTest)))
+    sink.close()
+
+    with conn.makefile('r') as f:
+        assert json.loads(f.readline())['binary'] == 'bin1'
+    conn.close()
+    server.close()
@@ -21,12 +21,14 @@ Unit tests for gtest.py
 import os
 from pathlib import Path
 import pytest
+import re
 import subprocess
 import tempfile
 from typing import Final
 from unittest.mock import ANY, patch
 
-from check_utils import GTest, Skipped, JUnitXML, TestMeta
+from check_utils import GTest, GTestBatch, GTestShard, Skipped, JUnitXML, TestMeta,\
+        PassedCase, PassedSuite
 import common
 
 MKSTEMP_REPORT_FILE: Final[str] = f'./tmp_mkstemp_{Path(__file__).stem}.xml'
@@ -334,3 +336,143 @@ def test_get_name_framework():
 
 def test__run_impl():
     assert GTest._run_impl == GTest._run_gtest
+
+def test__run_gtest_batch(mocker, tmp_path):
+    getstatusoutput_mock = mocker.patch('subprocess.getstatusoutput')
+    getstatusoutput_mock.return_value = (0,
+                                         'Foo.\n'
+                                         ' Test1\n'
+                                         ' Test2\n'
+                                         'Bar.\n'
+                                         ' 3tseT\n'
+                                         ' Ttse4\n'
+                                         ' Crash5')
+
+    meta = TestMeta(GTest, options={'batch_size': 4})
+    gtest_tests = list(GTest._generate_test_list('bin', '', meta, 10))
+
+    assert [type(gtest) for gtest in gtest_tests] == [GTestBatch, GTestBatch]
+    assert gtest_tests[0].cases == [('Foo', 'Test1'), ('Foo', 'Test2'),
+                                    ('Bar', '3tseT'), ('Bar', 'Ttse4')]
+    assert gtest_tests[1].cases == [('Bar', 'Crash5')]
+
+    # Spoof a binary in which Bar.Ttse4 crashes.
+    def run_mock(args, env, **kwargs):
+        report = re.search(r'xml:([^"]+)', args).group(1)
+        cases = re.search(r'--gtest_filter="([^"]*)"', args).group(1).split(':')
+        if 'Bar.Ttse4' in cases:
+            return subprocess.CompletedProcess(args, 1, b'', b'crashed')
+
+        Path(env['TEST_PREMATURE_EXIT_FILE']).unlink()
+        JUnitXML.make_from_passed([
+            PassedSuite(case.split('.')[0], '', '', [
+                PassedCase(case.split('.')[1], '', '0.0', '0')])
+            for case in cases]).write(report)
+        return subprocess.CompletedProcess(args, 0, b'', b'')
+
+    mkstemp = tempfile.mkstemp
+    mocker.patch('tempfile.mkstemp',
+                 side_effect=lambda suffix='': mkstemp(suffix=suffix,
+                                                       dir=tmp_path))
+    run = mocker.patch('subprocess.run', side_effect=run_mock)
+
+    report = gtest_tests[0]._run_gtest_batch()
+
+    # The batch, its two halves and the two cases of the crashing half, each
+    # given the timeout of all of its cases.
+    assert run.call_count == 5
+    assert [c.kwargs['timeout'] for c in run.call_args_list] \
+            == [40, 20, 20, 10, 10]
+    root = report.tree.getroot()
+    assert root.get('tests') == '4'
+    assert root.get('errors') == '1'
+    errored = root.find("./testsuite[@name='Bar']/testcase[@name='Ttse4']/error")
+    assert errored is not None
+    assert errored.get('message') == 'crashed'
+    assert list(tmp_path.iterdir()) == []
+
+def test__run_gtest_shard(mocker, tmp_path):
+    getstatusoutput_mock = mocker.patch('subprocess.getstatusoutput')
+    getstatusoutput_mock.return_value = (0,
+                                         'Foo.\n'
+                                         ' Test1\n'
+                                         ' DISABLED_Test2\n'
+                                         'Bar.\n'
+                                         ' 3tseT\n'
+                                         ' Ttse4\n'
+                                         ' Test5')
+
+    skipped = Skipped.make_from_dict({
+        'name': 'bin',
+        'suites': [{'name': 'Bar', 'cases': [{'name': 'Ttse4'}]}]})
+    meta = TestMeta(GTest, skipped=skipped.get_suites(),
+                    options={'shards': 2})
+    gtest_tests = list(GTest._generate_test_list('bin', '', meta, None))
+
+    assert [type(gtest) for gtest in gtest_tests] == [GTestShard, GTestShard]
+    assert gtest_tests[0].cases == [('Foo', 'Test1'), ('Bar', 'Test5')]
+    assert gtest_tests[1].cases == [('Bar', '3tseT')]
+
+    # Spoof a binary in which shard 1 crashes.
+    def run_mock(args, env, **kwargs):
+        report = re.search(r'xml:([^"]+)', args).group(1)
+        case_filter = re.search(r'--gtest_filter="([^"]*)"', args).group(1)
+        if env.get('GTEST_SHARD_INDEX') == '1':
+            return subprocess.CompletedProcess(args, 1, b'', b'crashed')
+
+        if 'GTEST_SHARD_INDEX' in env:
+            assert case_filter == '*-Bar.Ttse4'
+            assert env['GTEST_TOTAL_SHARDS'] == '2'
+            cases = [case.split('.') for case in ('Foo.Test1', 'Bar.Test5')]
+        else:
+            cases = [case.split('.') for case in case_filter.split(':')]
+
+        Path(env['TEST_PREMATURE_EXIT_FILE']).unlink()
+        JUnitXML.make_from_passed([
+            PassedSuite(suite, '', '', [PassedCase(case, '', '0.0', '0')])
+            for suite, case in cases]).write(report)
+        return subprocess.CompletedProcess(args, 0, b'', b'')
+
+    mkstemp = tempfile.mkstemp
+    mocker.patch('tempfile.mkstemp',
+                 side_effect=lambda suffix='': mkstemp(suffix=suffix,
+                                                       dir=tmp_path))
+    run = mocker.patch('subprocess.run', side_effect=run_mock)
+
+    report = JUnitXML.make_from_passed([])
+    for gtest in gtest_tests:
+        report += gtest.run()
+
+    # Both shards, then the explicit rerun of the crashed shard.
+    assert run.call_count == 3
+    root = report.tree.getroot()
+    assert root.get('tests') == '3'
+    assert root.get('errors') == '0'
+    assert root.find("./testsuite[@name='Bar']/testcase[@name='3tseT']") is not None
+    assert list(tmp_path.iterdir()) == []
+
+def test__generate_test_list_shards_disabled(mocker):
+    getstatusoutput_mock = mocker.patch('subprocess.getstatusoutput')
+    getstatusoutput_mock.return_value = (0,
+                                         'Prefix/Foo.\n'
+                                         '  Test/0  # GetParam() = 1\n'
+                                         '  DISABLED_Test/1  # GetParam() = 2\n'
+                                         'Prefix/DISABLED_Foo.\n'
+                                         '  Test/0  # GetParam() = 1\n'
+                                         'Bar/0.  # TypeParam = int\n'
+                                         '  Test\n'
+                                         '  Test_DISABLED_\n'
+                                         'Baz.\n'
+                                         '  Test\n')
+
+    meta = TestMeta(GTest, options={'shards': 2})
+    gtest_tests = list(GTest._generate_test_list('bin', '', meta, None))
+
+    # Disabled cases take no turn in the round-robin.
+    assert [gtest.cases for gtest in gtest_tests] == [
+            [('Prefix/Foo', 'Test/0'), ('Bar/0', 'Test_DISABLED_')],
+            [('Bar/0', 'Test'), ('Baz', 'Test')]]
+
+    gtest_tests = list(GTest._generate_test_list(
+            'bin', '--gtest_also_run_disabled_tests', meta, None))
+    assert sum(len(gtest.cases) for gtest in gtest_tests) == 6
@@ -0,0 +1,114 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for history.py
+"""
+
+import pytest
+
+from check_utils import BinaryTestJobset, DurationStats, JUnitXML,\
+        PassedCase, PassedSuite, SkippedCase, SkippedSuite, TestMeta,\
+        TimingHistory
+import common
+from common import FakeTest
+
+def _report(times):
+    return JUnitXML.make_from_passed([
+        PassedSuite('suite', '', '', [
+            PassedCase(name, '', time, '0')
+            for name, time in times.items()])])
+
+@pytest.fixture()
+def history(tmp_path):
+    history = TimingHistory(tmp_path.joinpath('history.db'), max_runs=3)
+    yield history
+    history.close()
+
+def test_stats_empty(history):
+    assert history.get_case_stats('bin', 'suite', 'case1') is None
+    assert history.get_binary_stats('bin') is None
+    assert history.is_empty()
+
+def test_stats(history):
+    for time1, time2 in (('1.0', '2.0'), ('3.0', '4.0'), ('20.0', '1.5')):
+        history.record(_report({'case1': time1, 'case2': time2}), 'bin')
+        history.commit()
+
+    assert not history.is_empty()
+    assert history.get_case_stats('bin', 'suite', 'case1') \
+            == DurationStats(3, 8.0, 20.0, 20.0)
+    assert history.get_case_stats('bin', 'suite', 'case2') \
+            == DurationStats(3, 2.5, 4.0, 1.5)
+    assert history.get_binary_stats('bin') \
+            == DurationStats(3, 10.5, 21.5, 21.5)
+    assert history.get_binary_stats('other') is None
+
+def test_max_runs(history):
+    for time in ('1.0', '2.0', '3.0', '4.0'):
+        history.record(_report({'case1': time}), 'bin')
+        history.commit()
+
+    assert history.get_case_stats('bin', 'suite', 'case1') \
+            == DurationStats(3, 3.0, 4.0, 4.0)
+
+def test_persistent(tmp_path):
+    history = TimingHistory(tmp_path.joinpath('history.db'))
+    history.record(_report({'case1': '1.0'}), 'bin')
+    history.commit()
+    history.close()
+
+    history = TimingHistory(tmp_path.joinpath('history.db'))
+    assert history.get_case_stats('bin', 'suite', 'case1').last == 1.0
+    history.close()
+
+def test_record_ignores_skipped(history):
+    report = _report({'case1': '1.0', 'case2': 'bad'})
+    report += JUnitXML.make_from_skipped([
+        SkippedSuite('suite', '', '', [SkippedCase('case3', '', [], [], [])])])
+    history.record(report, 'bin')
+    history.commit()
+
+    assert history.get_case_stats('bin', 'suite', 'case1').count == 1
+    assert history.get_case_stats('bin', 'suite', 'case2') is None
+    assert history.get_case_stats('bin', 'suite', 'case3') is None
+
+def test_record_keeps_counts(history, mocker):
+    report = _report({'case1': '1.0'})
+    report += _report({'case2': '2.0'})
+    recount = mocker.spy(JUnitXML, '_recount')
+
+    history.record(report, 'bin')
+
+    # The counts kept while merging are still used.
+    assert report.get_totals()['tests'] == 2
+    recount.assert_not_called()
+
+@pytest.mark.parametrize('num_jobs', [1, 2])
+def test_jobset_records(history, num_jobs):
+    meta = TestMeta(FakeTest)
+    jobset = BinaryTestJobset(meta, sources=[
+        lambda: [FakeTest('bin1', 'case1', meta),
+                 FakeTest('bin1', 'case2', meta)],
+        lambda: [FakeTest('bin2', 'case1', meta)],
+        ])
+    jobset.set_history(history)
+
+    jobset.run(num_jobs)
+    history.commit()
+
+    assert history.get_case_stats('bin1', 'bin1', 'case2').count == 1
+    assert history.get_binary_stats('bin2').count == 1
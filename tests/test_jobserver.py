@@ -0,0 +1,172 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for jobserver.py
+"""
+
+import os
+import threading
+import time
+import pytest
+
+from check_utils import BinaryTestJobset, JobSlots, Jobserver, TestMeta
+import common
+from common import FakeTest
+
+class StubJobserver:
+    """
+    Stands in for make, holding the jobserver and its tokens.
+    """
+    def __init__(self, style: str, tmp_path, tokens: int):
+        if style == 'fifo':
+            self.path = str(tmp_path.joinpath('jobserver'))
+            os.mkfifo(self.path)
+            self.read_fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+            self.write_fd = os.open(self.path, os.O_WRONLY)
+            self.makeflags = f' -j{tokens + 1} --jobserver-auth=fifo:{self.path}'
+        else:
+            self.read_fd, self.write_fd = os.pipe()
+            self.makeflags = (f'j --jobserver-auth={self.read_fd},'
+                              f'{self.write_fd} -- FOO=bar')
+        os.write(self.write_fd, b'+' * tokens)
+
+    def count_tokens(self) -> int:
+        count = 0
+        try:
+            while len(os.read(self.read_fd, 1)) != 0:
+                count += 1
+        except BlockingIOError:
+            pass
+        return count
+
+    def close(self):
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+@pytest.fixture(params=['fifo', 'pipe'])
+def stub(request, tmp_path):
+    stub = StubJobserver(request.param, tmp_path, 2)
+    yield stub
+    stub.close()
+
+@pytest.mark.parametrize('makeflags', [
+    '',
+    ' -j4',
+    '--jobserver-auth=fifo:/nonexistent/fifo',
+    '--jobserver-auth=1000,1001',
+    '--jobserver-auth=unknown',
+    ])
+def test_from_makeflags_none(makeflags):
+    assert Jobserver.from_makeflags(makeflags) is None
+
+def test_from_makeflags(stub):
+    jobserver = Jobserver.from_makeflags(stub.makeflags)
+
+    assert jobserver is not None
+    assert jobserver.try_acquire() == b'+'
+    assert jobserver.try_acquire() == b'+'
+    assert jobserver.try_acquire() is None
+
+    jobserver.release(b'+')
+    assert jobserver.acquire() == b'+'
+    jobserver.release(b'+')
+    jobserver.release(b'+')
+    jobserver.close()
+
+    os.set_blocking(stub.read_fd, False)
+    assert stub.count_tokens() == 2
+
+def test_job_slots(stub):
+    jobserver = Jobserver.from_makeflags(stub.makeflags)
+    slots = JobSlots(8, jobserver)
+
+    # One implicit slot, and one per token.
+    assert slots.try_acquire(8) == 3
+    assert slots.try_acquire(1) == 0
+    slots.release(3)
+
+    slots.acquire()
+    assert slots.try_acquire(1) == 1
+    slots.release(2)
+    jobserver.close()
+
+    os.set_blocking(stub.read_fd, False)
+    assert stub.count_tokens() == 2
+
+def test_job_slots_blocked_jobserver(mocker):
+    # A token seen by select() but taken by another client first leaves the
+    # read of a blocking pipe waiting.
+    jobserver = mocker.Mock()
+    reading = threading.Event()
+    unblock = threading.Event()
+
+    def try_acquire():
+        reading.set()
+        unblock.wait()
+        return None
+
+    jobserver.try_acquire.side_effect = try_acquire
+    slots = JobSlots(4, jobserver)
+    slots.acquire()
+    thread = threading.Thread(target=slots.try_acquire, args=(2,))
+    thread.start()
+    reading.wait()
+
+    # Other slots are taken and released meanwhile.
+    released = threading.Thread(target=slots.release)
+    released.start()
+    released.join(5)
+    assert not released.is_alive()
+    slots.acquire()
+
+    unblock.set()
+    thread.join(5)
+    assert not thread.is_alive()
+    # Neither slot of try_acquire() was backed by a token.
+    assert slots.try_acquire(4) == 0
+    slots.release()
+
+def test_jobset_run(stub):
+    jobserver = Jobserver.from_makeflags(stub.makeflags)
+    slots = JobSlots(8, jobserver)
+    lock = threading.Lock()
+    running = [0, 0]
+
+    class CountingTest(FakeTest):
+        def _run_fake(self):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return super()._run_fake()
+
+        _run_impl = _run_fake
+
+    meta = TestMeta(CountingTest)
+    jobset = BinaryTestJobset(meta, [
+        CountingTest('bin', f'case{i}', meta) for i in range(20)])
+    jobset.set_job_slots(slots)
+
+    report = jobset.run(8)
+    jobserver.close()
+
+    assert report.tree.getroot().get('tests') == '20'
+    assert 0 < running[1] <= 3
+    os.set_blocking(stub.read_fd, False)
+    assert stub.count_tokens() == 2
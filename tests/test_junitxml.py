@@ -0,0 +1,330 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for junitxml.py
+"""
+
+import pytest
+
+from check_utils import FailedCase, FailedSuite, JUnitXML, JUnitXMLStream,\
+        PassedCase, PassedSuite, xmlbackend
+from check_utils.xmlbackend import ET
+import common
+
+def _passed(suite: str, *cases: str) -> JUnitXML:
+    return JUnitXML.make_from_passed([
+        PassedSuite(suite, '', '', [PassedCase(case, '', '0.0', '0')
+                                    for case in cases])])
+
+def _suites(report: JUnitXML):
+    return [(suite.get('name'),
+             [case.get('name') for case in suite.iter('testcase')])
+            for suite in report.tree.getroot().iter('testsuite')]
+
+def test_iadd_merges_suites():
+    report = JUnitXML.make_from_passed([])
+    report += _passed('A', 'a1')
+    report += _passed('B', 'b1')
+    report += _passed('A', 'a2')
+    report += _passed("It's \"quoted\"", 'q1')
+    report += _passed("It's \"quoted\"", 'q2')
+
+    assert _suites(report) == [('A', ['a1', 'a2']),
+                               ('B', ['b1']),
+                               ("It's \"quoted\"", ['q1', 'q2'])]
+    assert report.tree.getroot().get('tests') == '5'
+
+def test_iadd_after_tree_access():
+    report = _passed('A', 'a1')
+    report += _passed('B', 'b1')
+
+    # Suites added or renamed through the tree are found by later merges.
+    root = report.tree.getroot()
+    root.find('testsuite').set('name', 'C')
+    root.append(_passed('D', 'd1').tree.getroot().find('testsuite'))
+    report += _passed('C', 'c1')
+    report += _passed('D', 'd2')
+    report += _passed('A', 'a2')
+
+    assert _suites(report) == [('C', ['a1', 'c1']),
+                               ('B', ['b1']),
+                               ('D', ['d1', 'd2']),
+                               ('A', ['a2'])]
+
+def test_iadd_after_load(tmp_path):
+    path = tmp_path.joinpath('report.xml')
+    _passed('A', 'a1').write(path)
+
+    report = _passed('B', 'b1')
+    report += _passed('B', 'b2')
+    report.load(path)
+    report += _passed('A', 'a2')
+    report += _passed('B', 'b3')
+
+    assert _suites(report) == [('A', ['a1', 'a2']), ('B', ['b3'])]
+
+def test_iadd_duplicate_suites_in_file(tmp_path):
+    # Merges into the first of several suites of the same name.
+    path = tmp_path.joinpath('report.xml')
+    root = ET.Element('testsuites')
+    for case in ['a1', 'a2']:
+        root.extend(_passed('A', case).tree.getroot())
+    ET.ElementTree(root).write(path)
+
+    report = JUnitXML(file=path)
+    report += _passed('A', 'a3')
+
+    assert _suites(report) == [('A', ['a1', 'a3']), ('A', ['a2'])]
+
+def test_iadd_failed():
+    report = _passed('A', 'a1')
+    report += JUnitXML.make_from_failed([
+        FailedSuite('A', '', '', [FailedCase('a2', '', '0.0', '0', 'msg',
+                                             'type')])])
+
+    assert _suites(report) == [('A', ['a1', 'a2'])]
+    assert not report.is_success()
+
+def _mixed(suite: str, index: int) -> JUnitXML:
+    report = JUnitXML.make_from_passed([
+        PassedSuite(suite, '', f'2025-01-0{index % 9 + 1}T00:00:00', [
+            PassedCase(f'p{index}', '', str(index), '2')])])
+    report += JUnitXML.make_from_failed([
+        FailedSuite(suite, '', '', [FailedCase(f'f{index}', '', '0.5', 'x',
+                                               'msg', 'type')])])
+    return report
+
+def test_incremental_counts_match_recount(tmp_path):
+    report = JUnitXML.make_from_passed([])
+    for i in range(20):
+        report += _mixed(f'S{i % 3}', i)
+        if i == 10:
+            # Handing out the tree forces a recount.
+            report.tree.getroot().find('testsuite').append(
+                    ET.Element('testcase', attrib={'name': 'extra',
+                                                   'time': '7'}))
+    incremental = tmp_path.joinpath('incremental.xml')
+    report.write(incremental)
+
+    report.set_tree(report.tree)
+    recounted = tmp_path.joinpath('recounted.xml')
+    report.write(recounted)
+
+    assert incremental.read_bytes() == recounted.read_bytes()
+    root = ET.parse(incremental).getroot()
+    assert root.get('tests') == '41'
+    assert root.get('failures') == '20'
+    assert root.get('time') == str(float(sum(range(20)) + 7))
+    assert [suite.get('tests') for suite in root.iter('testsuite')] \
+            == ['15', '14', '12']
+
+def test_counts_skip_recount(mocker):
+    report = JUnitXML.make_from_passed([])
+    report += _mixed('A', 1)
+    report.is_success()
+
+    merged = _mixed('A', 2)
+    passed = _passed('B', 'b1')
+
+    count_mock = mocker.spy(JUnitXML, '_count_suite')
+    report += merged
+    report += passed
+    assert not report.is_success()
+
+    # Only the suite of the report which was never counted was counted.
+    assert count_mock.call_count == 1
+
+def test_stream(tmp_path):
+    reports = [_mixed('A', 1), _passed('B', 'b1'), _mixed('A', 2)]
+
+    path = tmp_path.joinpath('stream.xml')
+    stream = JUnitXMLStream(str(path))
+    # The report is readable before it is finished.
+    assert path.read_bytes().startswith(b'<testsuites tests="0"')
+    for report in reports:
+        stream.add(report)
+    assert not stream.is_success()
+    stream.close()
+
+    streamed = JUnitXML(file=path)
+    root = ET.parse(path).getroot()
+    assert [suite.get('name') for suite in root.iter('testsuite')] \
+            == ['A', 'B', 'A']
+    for attr in ['tests', 'failures', 'errors', 'skipped', 'assertions',
+                 'time', 'timestamp']:
+        assert root.get(attr) == streamed.tree.getroot().get(attr)
+    assert root.get('tests') == '5'
+    assert root.get('failures') == '2'
+    assert root.get('time') == '3.0'
+    assert len(path.read_bytes().split(b'>', 1)[0]) + 1 \
+            == JUnitXMLStream.HEADER_SIZE
+
+def test_get_totals(tmp_path):
+    report = JUnitXML.make_from_passed([])
+    stream = JUnitXMLStream(str(tmp_path.joinpath('stream.xml')))
+    for i in range(3):
+        report += _mixed('A', i)
+        stream.add(_mixed('A', i))
+    stream.close()
+
+    path = tmp_path.joinpath('report.xml')
+    report.write(path)
+    root = ET.parse(path).getroot()
+    totals = report.get_totals()
+    assert {name: str(value) for name, value in totals.items()} \
+            == {name: root.get(name) for name in totals}
+    assert totals['tests'] == 6
+    assert totals['failures'] == 3
+    assert stream.get_totals() == totals
+
+def test_stream_empty(tmp_path):
+    path = tmp_path.joinpath('stream.xml')
+    stream = JUnitXMLStream(str(path))
+    stream.close()
+
+    report = JUnitXML(file=path)
+    assert report.is_success()
+    assert report.tree.getroot().get('tests') == '0'
+
+def _write_large(path, root_tag: str = 'testsuites'):
+    with open(path, 'w') as f:
+        if root_tag == 'testsuites':
+            f.write('<testsuites>')
+        for i in range(3):
+            f.write(f'<testsuite name="S{i}"><testcase name="c" classname="S{i}">'
+                    f'<failure message="{"m" * 100}">{"t" * 100}</failure>'
+                    f'<system-out>{"o" * 100}</system-out>'
+                    f'<system-err>short</system-err>'
+                    '</testcase></testsuite>')
+            if root_tag == 'testsuite':
+                break
+        if root_tag == 'testsuites':
+            f.write('</testsuites>')
+
+def test_load_truncated(tmp_path):
+    path = tmp_path.joinpath('report.xml')
+    _write_large(path)
+
+    report = JUnitXML(file=path, max_text=10)
+    root = report.tree.getroot()
+    failure = root.find('testsuite/testcase/failure')
+    assert failure.get('message') == 'm' * 10 + '\n[90 characters truncated]'
+    assert failure.text == 't' * 10 + '\n[90 characters truncated]'
+    assert root.find('testsuite/testcase/system-out').text \
+            == 'o' * 10 + '\n[90 characters truncated]'
+    assert root.find('testsuite/testcase/system-err').text == 'short'
+    assert root.get('failures') == '3'
+
+    report.load(path)
+    assert report.tree.getroot().find(
+            'testsuite/testcase/system-out').text == 'o' * 100
+
+@pytest.mark.parametrize('name', ['report.xml', 'report.xml.gz'])
+def test_load_whole(tmp_path, mocker, name):
+    path = tmp_path.joinpath(name)
+    _passed('A', 'a1', 'a2').write(str(path))
+    iterparse_mock = mocker.spy(xmlbackend, 'iterparse')
+
+    report = JUnitXML(file=path)
+
+    # Only truncation needs the report to be parsed incrementally.
+    assert iterparse_mock.call_count == 0
+    assert _suites(report) == [('A', ['a1', 'a2'])]
+
+@pytest.mark.parametrize('root_tag', ['testsuites', 'testsuite'])
+def test_iter_suites(tmp_path, root_tag):
+    path = tmp_path.joinpath('report.xml')
+    _write_large(path, root_tag)
+
+    names = []
+    for suite in JUnitXML.iter_suites(path, max_text=10):
+        names.append(suite.get('name'))
+        assert suite.find('testcase/system-out').text.startswith(
+                'o' * 10 + '\n')
+    assert names == ['S0', 'S1', 'S2'] if root_tag == 'testsuites' \
+            else ['S0']
+
+def test_move_from():
+    report = _passed('A', 'a1')
+    a2 = _passed('A', 'a2')
+    b = _passed('B', 'b1') + _passed('B', 'b2')
+
+    assert report.move_from(a2).move_from(b) is report
+    assert _suites(report) == [('A', ['a1', 'a2']), ('B', ['b1', 'b2'])]
+    assert report.tree.getroot().get('tests') == '4'
+    # The operands are left empty.
+    assert _suites(a2) == []
+    assert b.get_totals()['tests'] == 0
+
+def test_iter_suites_with_counts():
+    report = _passed('A', 'a1', 'a2') + _passed('B', 'b1')
+
+    assert [(suite.get('name'), counts['tests'])
+            for suite, counts in report.iter_suites_with_counts()] \
+            == [('A', 2), ('B', 1)]
+    assert report.tree.getroot().find('testsuite').get('tests') == '2'
+
+def test_add():
+    a = _passed('A', 'a1')
+    b = _passed('A', 'a2')
+    c = _passed('B', 'b1')
+
+    ab = a + b
+    abc = ab + c
+    abb = ab + b
+    assert _suites(abc) == [('A', ['a1', 'a2']), ('B', ['b1'])]
+    assert _suites(abb) == [('A', ['a1', 'a2', 'a2'])]
+    assert _suites(ab) == [('A', ['a1', 'a2'])]
+    assert abc.tree.getroot().get('tests') == '3'
+
+    # The operands are left intact.
+    assert _suites(a) == [('A', ['a1'])]
+    assert _suites(b) == [('A', ['a2'])]
+
+    abc += _passed('B', 'b2')
+    assert _suites(abc) == [('A', ['a1', 'a2']), ('B', ['b1', 'b2'])]
+    assert _suites(c) == [('B', ['b1'])]
+
+def test_add_then_change_operands():
+    a = _passed('A', 'a1')
+    b = _passed('B', 'b1')
+    f = JUnitXML.make_from_failed([FailedSuite('A', '', '', [
+        FailedCase('a2', '', '', '', 'message', 'assert')])])
+
+    c = a + b
+    a += f
+    b.tree.getroot().find('testsuite').set('name', 'C')
+    d = c + a
+    a += _passed('A', 'a3')
+
+    assert _suites(c) == [('A', ['a1']), ('B', ['b1'])]
+    assert c.get_totals()['tests'] == 2
+    assert c.get_totals()['failures'] == 0
+    assert _suites(d) == [('A', ['a1', 'a1', 'a2']), ('B', ['b1'])]
+    assert d.get_totals()['failures'] == 1
+
+def test_sum():
+    reports = [_passed(f'S{i % 3}', f'c{i}') for i in range(5000)]
+
+    total = sum(reports)
+    assert total.tree.getroot().get('tests') == '5000'
+    assert [suite.get('tests') for suite in total.tree.getroot()] \
+            == ['1667', '1667', '1666']
+    assert _suites(sum(reports[:1])) == [('S0', ['c0'])]
+
+    with pytest.raises(NotImplementedError):
+        1 + reports[0]
@@ -0,0 +1,106 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for merge.py
+"""
+
+import pytest
+import sys
+
+from check_utils import FailedCase, FailedSuite, JUnitXML, PassedCase,\
+        PassedSuite
+from check_utils.entry import merge
+
+def _write_reports(tmp_path, num_reports: int):
+    files = []
+    for i in range(num_reports):
+        report = JUnitXML.make_from_passed([
+            PassedSuite(f'S{i % 4}', '', f'2025-01-{i % 28 + 1:02}T00:00:00', [
+                PassedCase(f'p{i}', '', str(i), '1')])])
+        if i % 5 == 0:
+            report += JUnitXML.make_from_failed([
+                FailedSuite(f'F{i}', '', '', [
+                    FailedCase(f'f{i}', '', '1', '1', 'msg', 'type')])])
+        path = tmp_path.joinpath(f'{i}.xml')
+        report.write(path)
+        files.append(str(path))
+    return files
+
+def _sequential(files, path) -> bytes:
+    report = JUnitXML()
+    for file in files:
+        report += JUnitXML(file=file)
+    report.write(path)
+    return path.read_bytes()
+
+@pytest.mark.parametrize('num_jobs', [1, 3])
+def test_merge_reports(tmp_path, num_jobs):
+    files = _write_reports(tmp_path, 30)
+    output = tmp_path.joinpath('merged.xml')
+
+    totals = merge.merge_reports(files, output, num_jobs)
+
+    assert output.read_bytes() == _sequential(
+            files, tmp_path.joinpath('sequential.xml'))
+    assert totals == JUnitXML(file=output).get_totals()
+    # Only the merged report is left.
+    assert sorted(path.name for path in tmp_path.iterdir()
+                  if not path.name[0].isdigit()) \
+            == ['merged.xml', 'sequential.xml']
+
+def test_merge_reports_unmerged_suites(tmp_path):
+    files = _write_reports(tmp_path, 30)
+    output = tmp_path.joinpath('merged.xml')
+
+    totals = merge.merge_reports(files, output, 2, merge_suites=False)
+
+    names = [suite.get('name') for suite in JUnitXML.iter_suites(output)]
+    assert names.count('S0') > 1
+    assert totals['tests'] == 36
+    assert JUnitXML(file=output).get_totals() == totals
+
+def test_merge_reports_empty(tmp_path):
+    output = tmp_path.joinpath('merged.xml')
+
+    assert merge.merge_reports([], output, 2)['tests'] == 0
+    assert output.read_bytes() == _sequential(
+            [], tmp_path.joinpath('sequential.xml'))
+
+def test__make_shards(tmp_path):
+    files = []
+    for i, size in enumerate([400, 100, 100, 100, 100, 400, 200, 200]):
+        tmp_path.joinpath(str(i)).write_bytes(b' ' * size)
+        files.append(str(tmp_path.joinpath(str(i))))
+
+    shards = merge._make_shards(files, 4)
+
+    # Consecutive shards of about a quarter of the total size each.
+    assert shards == [files[0:1], files[1:5], files[5:6], files[6:8]]
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_main(tmp_path, monkeypatch, stream):
+    files = _write_reports(tmp_path, 10)
+    output = tmp_path.joinpath('merged.xml.gz')
+    monkeypatch.setattr(sys, 'argv', ['cumerge', '-j', '2', '-o',
+                                      str(output)] + files
+                                     + (['--stream'] if stream else []))
+
+    merge.main()
+
+    totals = JUnitXML(file=output).get_totals()
+    assert totals['tests'] == 12
+    assert totals['failures'] == 2
@@ -0,0 +1,67 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for report.py
+"""
+
+import pytest
+import sys
+
+from check_utils import CaseStatus, JUnitXML, ResultStore
+from check_utils.entry import report
+import common
+
+@pytest.fixture()
+def report_file(tmp_path):
+    store = ResultStore()
+    store.add(CaseStatus.PASSED, 'A', 'a1', time=0.5)
+    store.add(CaseStatus.FAILED, 'A', 'a2', time=3.0,
+              message='Expected 1\nActual 2')
+    store.add(CaseStatus.ERRORED, 'B', 'b1', time=1.0, message='Segfault')
+    store.add(CaseStatus.SKIPPED, 'B', 'b2')
+    store.add(CaseStatus.PASSED, 'C', 'c1', time=2.0)
+    path = tmp_path.joinpath('report.xml.gz')
+    store.write(path)
+    return str(path)
+
+def test_print_failures(report_file, capsys):
+    assert report.print_failures(JUnitXML.iter_suites(report_file)) == 2
+
+    assert capsys.readouterr().out == ('[FAILURE] A.a2\n'
+                                       '  Expected 1\n'
+                                       '  Actual 2\n'
+                                       '[ERROR] B.b1\n'
+                                       '  Segfault\n')
+
+def test_get_slowest(report_file):
+    assert report.get_slowest(JUnitXML.iter_suites(report_file), 2) \
+            == [(3.0, 'A', 'a2'), (2.0, 'C', 'c1')]
+    assert report.get_slowest(JUnitXML.iter_suites(report_file), 0) == []
+
+def test_count_suites(report_file):
+    assert report.count_suites(JUnitXML.iter_suites(report_file)) \
+            == [('A', 2, 1, 0, 0), ('B', 2, 0, 1, 1), ('C', 1, 0, 0, 0)]
+
+def test_main(report_file, monkeypatch, capsys, mocker):
+    monkeypatch.setattr(sys, 'argv', ['cureport', '-n', '1', report_file])
+    parse_mock = mocker.spy(JUnitXML, '_parse')
+
+    report.main()
+
+    # The report is only read one suite at a time.
+    assert parse_mock.call_count == 0
+    assert capsys.readouterr().out == '     3.000s A.a2\n'
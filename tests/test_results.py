@@ -0,0 +1,99 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for results.py
+"""
+
+from check_utils import CaseStatus, ErroredCase, ErroredSuite, FailedCase,\
+        FailedSuite, JUnitXML, PassedCase, PassedSuite, ResultStore,\
+        SkippedCase, SkippedSuite
+from check_utils.xmlbackend import ET
+import common
+
+def _dump(root: ET.Element):
+    return [ET.tostring(suite) for suite in root.iter('testsuite')]
+
+def test_store_matches_make_from():
+    passed = [PassedSuite('A', 'a.cc', '2025-01-01T00:00:00', [
+        PassedCase('a1', '10', '0.5', '3'),
+        PassedCase('a2', '', '', '')])]
+    failed = [FailedSuite('A', 'a.cc', '2025-01-01T00:00:00', [
+        FailedCase('a3', '12', '1', '1', 'Expected <1>', 'assert')])]
+    errored = [ErroredSuite('B', '', '', [
+        ErroredCase('b1', '', '', '', 'Segfault', 'crash')])]
+    skipped = [SkippedSuite('C', 'c.cc', '', [
+        SkippedCase('c1', '4', ['8.0.0'], [], [])])]
+
+    expected = JUnitXML.make_from_passed(passed)
+    expected += JUnitXML.make_from_failed(failed)
+    expected += JUnitXML.make_from_errored(errored)
+    expected += JUnitXML.make_from_skipped(skipped)
+
+    store = ResultStore()
+    store.add_suites(CaseStatus.PASSED, passed)
+    store.add_suites(CaseStatus.FAILED, failed)
+    store.add_suites(CaseStatus.ERRORED, errored)
+    store.add_suites(CaseStatus.SKIPPED, skipped)
+
+    assert len(store) == 5
+    assert store.count(CaseStatus.FAILED) == 1
+    assert not store.is_success()
+    # Integral times are written as floats.
+    expected.tree.getroot().find('testsuite/testcase[@name="a3"]')\
+            .set('time', '1.0')
+    assert _dump(store.to_junitxml().tree.getroot()) \
+            == _dump(expected.tree.getroot())
+
+def test_store_write(tmp_path):
+    store = ResultStore()
+    for i in range(100):
+        store.add(CaseStatus.PASSED, f'S{i % 3}', f'c{i}', time=0.25)
+    store.add(CaseStatus.SKIPPED, 'S1', 'skipped', message='Not today')
+    assert store.is_success()
+
+    path = tmp_path.joinpath('report.xml')
+    store.write(str(path))
+
+    root = JUnitXML(file=path).tree.getroot()
+    assert [(suite.get('name'), suite.get('tests'))
+            for suite in root.iter('testsuite')] \
+            == [('S0', '34'), ('S1', '34'), ('S2', '33')]
+    assert root.get('skipped') == '1'
+    assert root.find('testsuite[@name="S1"]/testcase/skipped')\
+            .get('message') == 'Not today'
+    assert root.find('testsuite/testcase').get('time') == '0.25'
+
+def test_store_messages():
+    store = ResultStore()
+    store.add(CaseStatus.FAILED, 'A', 'a1', message='first')
+    store.add(CaseStatus.PASSED, 'A', 'a2')
+    store.add(CaseStatus.ERRORED, 'A', 'a3', message='')
+    store.add(CaseStatus.FAILED, 'A', 'a4', message='second')
+
+    root = store.to_junitxml().tree.getroot()
+    assert [elem.get('message') for elem in root.iter()
+            if elem.tag in ('failure', 'error')] == ['first', '', 'second']
+
+def test_store_case_files():
+    store = ResultStore()
+    store.add(CaseStatus.PASSED, 'A', 'a1', file='a.cc')
+    store.add(CaseStatus.PASSED, 'A', 'a2', file='b.cc')
+
+    root = store.to_junitxml().tree.getroot()
+    assert root.find('testsuite').get('file') == 'a.cc'
+    assert [case.get('file') for case in root.iter('testcase')] \
+            == ['a.cc', 'b.cc']
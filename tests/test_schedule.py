@@ -0,0 +1,114 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for schedule.py
+"""
+
+import pytest
+
+from check_utils import BinaryTestJobset, GTest, GTestBatch, JUnitXML,\
+        PassedCase, PassedSuite, TestMeta, TimingHistory
+from check_utils.schedule import estimate_duration, predict_makespan,\
+        schedule_longest_first
+import common
+from common import FakeTest
+
+@pytest.fixture()
+def history(tmp_path):
+    history = TimingHistory(tmp_path.joinpath('history.db'))
+    for binary, times in (('bin1', {'a': '1.0', 'b': '2.0'}),
+                          ('bin2', {'a': '10.0'}),
+                          ('bin3', {'a': '4.0'})):
+        history.record(JUnitXML.make_from_passed([
+            PassedSuite('suite', '', '', [
+                PassedCase(name, '', time, '0')
+                for name, time in times.items()])]), binary)
+    history.commit()
+    yield history
+    history.close()
+
+def test_estimate_duration(history):
+    meta = TestMeta(GTest)
+
+    assert estimate_duration(FakeTest('bin1', 'a', meta), history) == 3.0
+    assert estimate_duration(FakeTest('bin4', 'a', meta), history) is None
+    assert estimate_duration(GTest('bin1', 'suite', 'b', '', meta),
+                             history) == 2.0
+    assert estimate_duration(GTestBatch('bin1', [('suite', 'a'),
+                                                 ('suite', 'b')], '', meta),
+                             history) == 3.0
+    assert estimate_duration(GTestBatch('bin1', [('suite', 'a'),
+                                                 ('suite', 'c')], '', meta),
+                             history) is None
+
+@pytest.mark.parametrize('durations,num_jobs,makespan', [
+    ([], 2, 0.0),
+    ([3.0, 3.0, 2.0, 2.0, 2.0], 2, 7.0),
+    ([1.0, 1.0, 4.0], 2, 5.0),
+    ([4.0, 1.0, 1.0], 2, 4.0),
+    ([5.0, 1.0], 1, 6.0),
+    ])
+def test_predict_makespan(durations, num_jobs, makespan):
+    assert predict_makespan(durations, num_jobs) == makespan
+
+def test_schedule_longest_first(history):
+    meta = TestMeta(FakeTest)
+    tests = [FakeTest(binary, 'a', meta)
+             for binary in ('bin1', 'bin4', 'bin2', 'bin5', 'bin3')]
+
+    order, makespan = schedule_longest_first(tests, history, 2)
+
+    # Unknown binaries are expected to take as long as the average.
+    assert order == [2, 1, 3, 4, 0]
+    assert makespan == pytest.approx(2 * 17.0 / 3 + 3.0)
+
+def test_jobset_run_longest_first(history):
+    meta = TestMeta(FakeTest)
+    jobset = BinaryTestJobset(meta, sources=[
+        lambda: [FakeTest('bin1', 'a', meta)],
+        lambda: [FakeTest('bin2', 'a', meta), FakeTest('bin3', 'a', meta)],
+        ])
+    jobset.set_history(history)
+
+    report = jobset.run(2)
+
+    # Merged in discovery order regardless of the order they ran in.
+    assert [case.get('classname')
+            for case in report.tree.getroot().iter('testcase')] \
+                    == ['bin1', 'bin2', 'bin3']
+    assert jobset.predicted_makespan == 10.0
+    assert jobset.actual_makespan is not None
+
+def test_jobset_run_without_history(tmp_path, mocker):
+    meta = TestMeta(FakeTest)
+    jobset = BinaryTestJobset(meta, sources=[
+        lambda: [FakeTest('bin1', 'a', meta)],
+        lambda: [FakeTest('bin2', 'a', meta)],
+        ])
+    history = TimingHistory(tmp_path.joinpath('history.db'))
+    jobset.set_history(history)
+    pipelined = mocker.spy(jobset, '_submit_pipelined')
+
+    report = jobset.run(2)
+    history.close()
+
+    # Nothing to order the tests by, so they aren't held up by listing.
+    pipelined.assert_called_once()
+    assert jobset.predicted_makespan is None
+    assert [case.get('classname')
+            for case in report.tree.getroot().iter('testcase')] \
+                    == ['bin1', 'bin2']
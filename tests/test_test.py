@@ -0,0 +1,234 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for test.py
+"""
+
+import threading
+import time
+import pytest
+
+from check_utils import BinaryTestJobset, JobSlots, JUnitXML,\
+        JUnitXMLStream, ProjectTest, ProjectTestJobset, TestMeta
+import common
+from common import FakeTest
+
+def _case_names(report: JUnitXML):
+    return [(case.get('classname'), case.get('name'))
+            for case in report.tree.getroot().iter('testcase')]
+
+@pytest.mark.parametrize('num_jobs', [1, 2, 4])
+def test_binary_jobset_run_sources(num_jobs):
+    meta = TestMeta(FakeTest)
+    jobset = BinaryTestJobset(meta, sources=[
+        lambda: [FakeTest('bin1', 'case1', meta),
+                 FakeTest('bin1', 'case2', meta)],
+        lambda: [FakeTest('bin2', 'case1', meta)],
+        ])
+
+    report = jobset.run(num_jobs)
+
+    assert _case_names(report) == [('bin1', 'case1'), ('bin1', 'case2'),
+                                   ('bin2', 'case1')]
+
+@pytest.mark.parametrize('num_jobs', [1, 4])
+def test_binary_jobset_report_sink(num_jobs, tmp_path):
+    meta = TestMeta(FakeTest)
+    jobset = BinaryTestJobset(meta, sources=[
+        lambda: [FakeTest('bin1', 'case1', meta),
+                 FakeTest('bin1', 'case2', meta)],
+        ])
+    path = tmp_path.joinpath('report.xml')
+    sink = JUnitXMLStream(str(path))
+    jobset.set_report_sink(sink)
+
+    report = jobset.run(num_jobs)
+    sink.close()
+
+    assert _case_names(report) == []
+    assert _case_names(JUnitXML(file=path)) == [('bin1', 'case1'),
+                                                ('bin1', 'case2')]
+
+def test_binary_jobset_run_pipelined():
+    meta = TestMeta(FakeTest)
+    started = threading.Event()
+
+    def slow_source():
+        # Only finishes listing once a test of the first binary has run.
+        assert started.wait(timeout=10)
+        return [FakeTest('bin2', 'case1', meta)]
+
+    jobset = BinaryTestJobset(meta, sources=[
+        lambda: [FakeTest('bin1', 'case1', meta, started)],
+        slow_source,
+        ])
+
+    report = jobset.run(2)
+
+    assert _case_names(report) == [('bin1', 'case1'), ('bin2', 'case1')]
+
+def test_binary_jobset_bounds_listings(mocker):
+    meta = TestMeta(FakeTest)
+    events = []
+
+    def make_source(i):
+        def source():
+            events.append(('list', i))
+            return [FakeTest(f'bin{i}', 'case1', meta)]
+        return source
+
+    jobset = BinaryTestJobset(meta, sources=[make_source(i)
+                                             for i in range(6)])
+    submit = jobset._submit
+
+    def record_submit(pool, done, index, test):
+        events.append(('submit', int(test.get_label()[len('bin'):])))
+        submit(pool, done, index, test)
+
+    mocker.patch.object(jobset, '_submit', side_effect=record_submit)
+
+    report = jobset.run(2)
+
+    assert len(_case_names(report)) == 6
+    # Binary k + 2 is only listed once the tests of binary k are queued.
+    for i in range(2, 6):
+        assert events.index(('list', i)) > events.index(('submit', i - 2))
+
+@pytest.mark.parametrize('max_buffered', [0, 64])
+def test_binary_jobset_completion_order(max_buffered, mocker):
+    meta = TestMeta(FakeTest, options={'max_buffered': max_buffered})
+    finished = threading.Event()
+
+    class WaitingTest(FakeTest):
+        def _run_waiting(self):
+            # Only finishes once every other test has finished.
+            assert finished.wait(timeout=10)
+            return super()._run_fake()
+
+        _run_impl = _run_waiting
+
+    class CountingTest(FakeTest):
+        def _run_counting(self):
+            report = super()._run_fake()
+            if self.case == 'case3':
+                threading.Timer(0.1, finished.set).start()
+            return report
+
+        _run_impl = _run_counting
+
+    jobset = BinaryTestJobset(meta, [
+        WaitingTest('bin1', 'case1', meta),
+        CountingTest('bin2', 'case1', meta),
+        CountingTest('bin2', 'case2', meta),
+        CountingTest('bin2', 'case3', meta),
+        ])
+    history = mocker.Mock()
+    jobset.set_history(history)
+    mocker.patch.object(jobset, '_should_schedule', return_value=False)
+
+    report = jobset.run(2)
+
+    # Durations are recorded as tests finish...
+    assert [c.args[1] for c in history.record.call_args_list] \
+            == ['bin2', 'bin2', 'bin2', 'bin1']
+    # ...but reports are merged in the order of tests, whether they waited
+    # in memory or on disk.
+    assert _case_names(report) == [('bin1', 'case1'), ('bin2', 'case1'),
+                                   ('bin2', 'case2'), ('bin2', 'case3')]
+
+def test_binary_jobset_error():
+    meta = TestMeta(FakeTest)
+
+    class RaisingTest(FakeTest):
+        def _run_raising(self):
+            raise RuntimeError('crashed')
+
+        _run_impl = _run_raising
+
+    jobset = BinaryTestJobset(meta, [FakeTest('bin1', 'case1', meta),
+                                     RaisingTest('bin2', 'case1', meta)])
+
+    with pytest.raises(RuntimeError):
+        jobset.run(2)
+
+def test_job_slots():
+    slots = JobSlots(3)
+
+    slots.acquire()
+    assert slots.try_acquire(5) == 2
+    assert slots.try_acquire(1) == 0
+
+    slots.release(2)
+    with slots.slot():
+        assert slots.try_acquire(5) == 1
+
+def test_job_slots_shared():
+    slots = JobSlots(3)
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def track(jobs: int):
+        with lock:
+            running[0] += jobs
+            running[1] = max(running)
+        time.sleep(0.01)
+        with lock:
+            running[0] -= jobs
+
+    class CountingTest(FakeTest):
+        def _run_fake(self):
+            track(1)
+            return super()._run_fake()
+
+        _run_impl = _run_fake
+
+    class CountingProjectTest(ProjectTest):
+        def _run_fake_project(self):
+            track(self.num_jobs)
+            return JUnitXML.make_from_passed([])
+
+        @classmethod
+        def should_report_skipped_tests(cls) -> bool:
+            return False
+
+        @classmethod
+        def get_name_framework(cls) -> str:
+            return 'fake-project'
+
+        _run_impl = _run_fake_project
+
+    binary_meta = TestMeta(CountingTest)
+    binary_jobset = BinaryTestJobset(binary_meta, [
+        CountingTest('bin', f'case{i}', binary_meta) for i in range(20)])
+    project_meta = TestMeta(CountingProjectTest)
+    project_jobsets = [
+            ProjectTestJobset(project_meta, [
+                CountingProjectTest('', '', project_meta)])
+            for _ in range(5)]
+
+    jobsets = [binary_jobset, *project_jobsets]
+    for jobset in jobsets:
+        jobset.set_job_slots(slots)
+    threads = [threading.Thread(target=jobset.run, args=(3,))
+               for jobset in jobsets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 0 < running[1] <= 3
+    assert slots.try_acquire(3) == 3
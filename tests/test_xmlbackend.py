@@ -0,0 +1,132 @@
+#
+# Copyright (c) 2025, BlackBerry Limited. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Unit tests for xmlbackend.py
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+import common
+
+# Writes the same reports with whichever backend is selected.
+SCRIPT = '''
+import sys
+from check_utils import ErroredCase, ErroredSuite, FailedCase, FailedSuite,\\
+        JUnitXML, JUnitXMLStream, PassedCase, PassedSuite, xmlbackend
+
+print(xmlbackend.BACKEND)
+out_dir = sys.argv[1]
+
+with open(f'{out_dir}/input.xml', 'w') as f:
+    f.write("""<?xml version="1.0" encoding="UTF-8"?>
+<!-- A comment -->
+<testsuites name="AllTests">
+  <testsuite name="A" timestamp="2025-01-01T00:00:00">
+    <testcase name="a1" classname="A" time="1">
+      <system-out><![CDATA[line 1
+\tline 2 <&> é]]></system-out>
+      <failure message="Expected: &quot;x&quot;&#10;&#13;&#9;'y'"/>
+    </testcase>
+  </testsuite>
+</testsuites>
+""")
+
+report = JUnitXML(file=f'{out_dir}/input.xml')
+report += JUnitXML.make_from_passed([PassedSuite('A', 'a.cc', '', [
+        PassedCase('a2', '3', '0.5', '2')])])
+report += JUnitXML.make_from_failed([FailedSuite('B', '', '', [
+        FailedCase('bé1', '', '', '', 'tab\\there\\nnewline "q" <&>',
+                   'assert')])])
+report += JUnitXML.make_from_errored([ErroredSuite('C', '', '', [
+        ErroredCase('c1', '', '', '', 'colour \\x1b[31m\\rcarriage', '')])])
+report.tree.getroot().find('testsuite').text = 'text\\rwith carriage'
+report.write(f'{out_dir}/report.xml')
+
+# Written in many chunks, with escapes across their boundaries.
+large = JUnitXML.make_from_failed([FailedSuite(f'L{i}', '', '', [
+        FailedCase(f'l{j}', '', '', '', 'tab\\there\\rcarriage', 'assert')
+        for j in range(50)]) for i in range(50)])
+for suite in large.tree.getroot():
+    suite.text = 'text\\rwith carriage'
+large.write(f'{out_dir}/large.xml')
+
+stream = JUnitXMLStream(f'{out_dir}/stream.xml')
+stream.add(JUnitXML(file=f'{out_dir}/input.xml'))
+stream.add(report)
+stream.close()
+'''
+
+# Checks the operands of merges are left intact.
+OPERANDS_SCRIPT = '''
+from check_utils import JUnitXML, PassedCase, PassedSuite, xmlbackend
+
+print(xmlbackend.BACKEND)
+
+def passed(suite, case):
+    return JUnitXML.make_from_passed([PassedSuite(suite, '', '', [
+            PassedCase(case, '', '0.0', '0')])])
+
+a = passed('A', 'a1')
+b = passed('A', 'a2')
+c = passed('C', 'c1')
+b.get_totals()
+a += b
+a += c
+a.write('/dev/null')
+for report, name, case in [(b, 'A', 'a2'), (c, 'C', 'c1')]:
+    assert report.get_totals()['tests'] == 1
+    suites = report.tree.getroot().findall('testsuite')
+    assert [suite.get('name') for suite in suites] == [name]
+    assert [elem.get('name') for elem in suites[0]] == [case]
+assert a.get_totals()['tests'] == 3
+'''
+
+def _run(script: str, backend: str, *args: str) -> None:
+    env = dict(os.environ)
+    env['CHECK_UTILS_XML_BACKEND'] = backend
+    res = subprocess.run([sys.executable, '-c', script, *args],
+                         capture_output=True, check=True, env=env)
+    assert res.stdout.decode().strip() == backend
+
+def _write_reports(tmp_path, backend: str) -> dict:
+    out_dir = tmp_path.joinpath(backend)
+    out_dir.mkdir()
+    _run(SCRIPT, backend, str(out_dir))
+    return {name: out_dir.joinpath(name).read_bytes()
+            for name in ['report.xml', 'large.xml', 'stream.xml']}
+
+def test_identical_output(tmp_path):
+    pytest.importorskip('lxml')
+
+    stdlib = _write_reports(tmp_path, 'stdlib')
+    lxml = _write_reports(tmp_path, 'lxml')
+
+    assert b'\t' in stdlib['report.xml']
+    assert stdlib['report.xml'] == lxml['report.xml']
+    assert stdlib['stream.xml'] == lxml['stream.xml']
+    assert b'\r' in stdlib['large.xml']
+    assert stdlib['large.xml'] == lxml['large.xml']
+
+@pytest.mark.parametrize('backend', ['stdlib', 'lxml'])
+def test_merge_leaves_operands(backend):
+    if backend == 'lxml':
+        pytest.importorskip('lxml')
+
+    _run(OPERANDS_SCRIPT, backend)